@@ -0,0 +1,351 @@
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from conversion import (
+    ARRAY_FIELD_DATASET_NS,
+    BUILTIN_FORMAT_NAMES,
+    BUILTIN_FORMAT_SPECS,
+    DEFAULT_FORMULA_MODE,
+    FORMULA_MODES,
+    apply_item_schema,
+    build_builtin_format_frame,
+    build_custom_format_frame,
+    compile_custom_format_plan,
+    convert_and_export_task,
+    convert_xml_file_chunked,
+    default_batch_worker_count,
+    export_dataframe_to_excel,
+    filter_item_rows,
+    peak_rss_bytes,
+    read_xml_items,
+)
+
+CUSTOM_FORMAT_NAME = "Custom"
+BENCHMARK_CUSTOM_FORMAT = {
+    "name": CUSTOM_FORMAT_NAME,
+    "columns": [
+        {"col": "A", "type": "data", "value": "0", "width": 17.73, "labelKey": "clock"},
+        {"col": "B", "type": "data", "value": "1", "width": 17.27, "labelKey": "edis_status"},
+        {"col": "C", "type": "data", "value": "2", "width": 16.27, "labelKey": "last_avg_demand"},
+        {"col": "D", "type": "formula", "value": "=C{r}*280", "width": 16.27, "labelKey": "demand"},
+        {"col": "E", "type": "data", "value": "3", "width": 16.27, "labelKey": "active_import"},
+        {"col": "F", "type": "formula", "value": "=(E{r}-E{r-1})*280/1000", "width": 16.27, "labelKey": "kwh"},
+        {"col": "G", "type": "empty", "value": "", "width": 10, "labelKey": ""},
+        {"col": "H", "type": "data", "value": "5", "width": 16.27, "labelKey": "custom:Export"},
+    ],
+}
+STATUS_CODES = ("00000000", "00000008", "0000A001")
+DEFAULT_COLUMN_COUNT = max(spec["source_cols"] for spec in BUILTIN_FORMAT_SPECS.values()) + 2
+
+
+def generate_array_field_xml(path, rows, columns=DEFAULT_COLUMN_COUNT, irregular=0.1, seed=1):
+    rnd = random.Random(seed)
+    register_count = max(0, int(columns) - 3)
+    registers = [rnd.randint(1000, 100000) for _ in range(register_count)]
+    clock = datetime.datetime(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write('<?xml version="1.0" standalone="yes"?>\n')
+        fp.write(f'<ArrayFieldDataSet xmlns="{ARRAY_FIELD_DATASET_NS}">\n')
+        fp.write("  <Items>\n    <Name>/ArrayFieldDataSet/Items</Name>\n    <Clock>Clock</Clock>\n  </Items>\n")
+        for i in range(int(rows)):
+            clock += datetime.timedelta(minutes=15)
+            stamp = clock
+            if rnd.random() < irregular:
+                stamp = clock + datetime.timedelta(seconds=rnd.randint(1, 59))
+            parts = [
+                "  <Items>\n",
+                f"    <Name>Item{i}</Name>\n",
+                f"    <Clock>{stamp.strftime('%Y-%m-%d %H:%M:%S')}</Clock>\n",
+                f"    <Status>{rnd.choice(STATUS_CODES)}</Status>\n",
+                f"    <Demand>{rnd.uniform(0, 5):.3f}</Demand>\n",
+            ]
+            for c in range(register_count):
+                registers[c] += rnd.randint(0, 50)
+                parts.append(f"    <R{c}>{registers[c]}</R{c}>\n")
+            parts.append("  </Items>\n")
+            fp.write("".join(parts))
+        fp.write("</ArrayFieldDataSet>\n")
+    return path
+
+
+def children_peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _rate(rows, seconds):
+    return round(rows / seconds, 1) if seconds > 0 else None
+
+
+def _format_args(xml_type):
+    if xml_type == CUSTOM_FORMAT_NAME:
+        return BENCHMARK_CUSTOM_FORMAT, compile_custom_format_plan(BENCHMARK_CUSTOM_FORMAT)
+    return None, None
+
+
+def run_chunked_stage_case(xml_file, xml_type, save_path, chunk_rows, formula_mode=DEFAULT_FORMULA_MODE):
+    definition, plan = _format_args(xml_type)
+    metrics = {}
+    t0 = time.perf_counter()
+    convert_xml_file_chunked(xml_file, xml_type, save_path, definition, plan, chunk_rows, formula_mode=formula_mode, metrics=metrics)
+    elapsed = time.perf_counter() - t0
+    rows = metrics["rows"]
+    stages = {
+        stage: {"seconds": metrics[key], "rows_per_sec": _rate(rows, metrics[key])}
+        for stage, key in (("read", "parse_seconds"), ("build", "build_seconds"), ("export", "write_seconds"))
+    }
+    return {
+        "format": xml_type,
+        "rows": rows,
+        "stages": stages,
+        "total_seconds": round(elapsed, 4),
+        "rows_per_sec": _rate(rows, elapsed),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "output_bytes": metrics["output_bytes"],
+    }
+
+
+def run_stage_case(xml_file, xml_type, save_path, low_memory=False, formula_mode=DEFAULT_FORMULA_MODE, chunk_rows=0):
+    if chunk_rows:
+        return run_chunked_stage_case(xml_file, xml_type, save_path, chunk_rows, formula_mode)
+    _, plan = _format_args(xml_type)
+    t0 = time.perf_counter()
+    df_xml = read_xml_items(xml_file)
+    t1 = time.perf_counter()
+    df_filtered = apply_item_schema(filter_item_rows(df_xml))
+    if plan is None:
+        final_df = build_builtin_format_frame(df_filtered, xml_type)
+    else:
+        final_df = build_custom_format_frame(df_filtered, plan)
+    t2 = time.perf_counter()
+    export_dataframe_to_excel(final_df, xml_type, save_path, xml_file, low_memory=low_memory, formula_mode=formula_mode)
+    t3 = time.perf_counter()
+    rows = len(df_filtered)
+    stages = {
+        "read": {"seconds": round(t1 - t0, 4), "rows_per_sec": _rate(rows, t1 - t0)},
+        "build": {"seconds": round(t2 - t1, 4), "rows_per_sec": _rate(rows, t2 - t1)},
+        "export": {"seconds": round(t3 - t2, 4), "rows_per_sec": _rate(rows, t3 - t2)},
+    }
+    return {
+        "format": xml_type,
+        "rows": rows,
+        "stages": stages,
+        "total_seconds": round(t3 - t0, 4),
+        "rows_per_sec": _rate(rows, t3 - t0),
+        "peak_rss_bytes": peak_rss_bytes(),
+        "output_bytes": os.path.getsize(save_path),
+    }
+
+
+def run_batch_case(xml_files, xml_type, output_dir, jobs, low_memory=False, formula_mode=DEFAULT_FORMULA_MODE, chunk_rows=0):
+    definition, plan = _format_args(xml_type)
+    task_args = [
+        (xml_file, xml_type, definition, plan, os.path.join(output_dir, f"batch_{i}.xlsx"), low_memory, None, formula_mode, chunk_rows)
+        for i, xml_file in enumerate(xml_files)
+    ]
+    t0 = time.perf_counter()
+    if jobs == 1:
+        results = [convert_and_export_task(*task) for task in task_args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(convert_and_export_task, *zip(*task_args)))
+    elapsed = time.perf_counter() - t0
+    failures = [r.get("error") for r in results if r.get("status") != "Done"]
+    output_bytes = sum(os.path.getsize(task[4]) for task in task_args if os.path.exists(task[4]))
+    peaks = [peak for peak in (peak_rss_bytes(), children_peak_rss_bytes()) if peak is not None]
+    return {
+        "format": xml_type,
+        "files": len(xml_files),
+        "jobs": jobs,
+        "total_seconds": round(elapsed, 4),
+        "files_per_sec": _rate(len(xml_files), elapsed),
+        "peak_rss_bytes": max(peaks) if peaks else None,
+        "output_bytes": output_bytes,
+        "failures": failures,
+    }
+
+
+def _isolated(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def _environment():
+    versions = {}
+    for name in ("pandas", "numpy", "xlsxwriter"):
+        try:
+            versions[name] = __import__(name).__version__
+        except Exception:
+            versions[name] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def run_benchmarks(args, workdir):
+    results = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "settings": {
+            "rows": args.rows,
+            "columns": args.columns,
+            "irregular": args.irregular,
+            "formats": args.formats,
+            "batch_files": args.batch_files,
+            "jobs": args.jobs,
+            "repeat": args.repeat,
+            "low_memory": args.low_memory,
+            "formula_mode": args.formula_mode,
+            "chunk_rows": args.chunk_rows,
+            "seed": args.seed,
+        },
+        "stages": [],
+        "batches": [],
+    }
+    for rows in args.rows:
+        xml_file = generate_array_field_xml(os.path.join(workdir, f"items_{rows}.xml"), rows, args.columns, args.irregular, args.seed)
+        input_bytes = os.path.getsize(xml_file)
+        for xml_type in args.formats:
+            for attempt in range(args.repeat):
+                save_path = os.path.join(workdir, f"{xml_type}_{rows}.xlsx")
+                case = _isolated(run_stage_case, xml_file, xml_type, save_path, args.low_memory, args.formula_mode, args.chunk_rows)
+                case.update({"input_rows": rows, "input_bytes": input_bytes, "attempt": attempt + 1})
+                results["stages"].append(case)
+                _print_stage_case(case)
+
+    if args.batch_files > 0:
+        rows = args.batch_rows or args.rows[0]
+        batch_files = [
+            generate_array_field_xml(os.path.join(workdir, f"batch_{i}.xml"), rows, args.columns, args.irregular, args.seed + i)
+            for i in range(args.batch_files)
+        ]
+        batch_dir = os.path.join(workdir, "batch_out")
+        os.makedirs(batch_dir, exist_ok=True)
+        jobs = max(1, min(int(args.jobs), len(batch_files)))
+        for xml_type in args.formats:
+            for attempt in range(args.repeat):
+                case = _isolated(run_batch_case, batch_files, xml_type, batch_dir, jobs, args.low_memory, args.formula_mode, args.chunk_rows)
+                case.update({"rows_per_file": rows, "attempt": attempt + 1})
+                results["batches"].append(case)
+                _print_batch_case(case)
+    return results
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.1f}MB" if value is not None else "n/a"
+
+
+def _print_stage_case(case):
+    stages = case["stages"]
+    print(
+        f"{case['format']:<10} {case['rows']:>8} rows  "
+        f"read {stages['read']['seconds']:.3f}s  build {stages['build']['seconds']:.3f}s  "
+        f"export {stages['export']['seconds']:.3f}s  {case['rows_per_sec']} rows/s  "
+        f"peak {_mb(case['peak_rss_bytes'])}  out {_mb(case['output_bytes'])}"
+    )
+
+
+def _print_batch_case(case):
+    print(
+        f"{case['format']:<10} batch {case['files']} x {case['rows_per_file']} rows, {case['jobs']} job(s)  "
+        f"{case['total_seconds']:.3f}s  {case['files_per_sec']} files/s  "
+        f"peak {_mb(case['peak_rss_bytes'])}  failed {len(case['failures'])}"
+    )
+
+
+def _case_key(case):
+    if "stages" in case:
+        return ("stage", case["format"], case["rows"])
+    return ("batch", case["format"], case["files"], case["rows_per_file"], case["jobs"])
+
+
+def compare_results(baseline, current):
+    def best_times(results):
+        best = {}
+        for case in results.get("stages", []) + results.get("batches", []):
+            key = _case_key(case)
+            best[key] = min(best.get(key, case["total_seconds"]), case["total_seconds"])
+        return best
+
+    before = best_times(baseline)
+    after = best_times(current)
+    for key in sorted(after, key=str):
+        if key not in before:
+            continue
+        ratio = before[key] / after[key] if after[key] > 0 else None
+        label = " ".join(str(part) for part in key)
+        speedup = f"{ratio:.2f}x" if ratio is not None else "n/a"
+        print(f"{label:<40} {before[key]:.3f}s -> {after[key]:.3f}s  ({speedup})")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cubeflow-benchmark", description="Benchmark CubeFlow conversion on synthetic ArrayFieldDataSet XML.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000], help="row counts to generate (default: %(default)s)")
+    parser.add_argument("--columns", type=int, default=DEFAULT_COLUMN_COUNT, help="values per Items row (default: %(default)s)")
+    parser.add_argument("--irregular", type=float, default=0.1, help="fraction of rows with off-interval timestamps (default: %(default)s)")
+    parser.add_argument("--formats", nargs="+", default=list(BUILTIN_FORMAT_NAMES) + [CUSTOM_FORMAT_NAME], help="formats to run (default: all built-ins and a sample custom format)")
+    parser.add_argument("--batch-files", type=int, default=4, help="files per batch run, 0 to skip batch runs (default: %(default)s)")
+    parser.add_argument("--batch-rows", type=int, default=None, help="rows per batch file (default: first --rows value)")
+    parser.add_argument("-j", "--jobs", type=int, default=default_batch_worker_count(), help="worker processes for batch runs (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for generated data (default: %(default)s)")
+    parser.add_argument("--low-memory", action="store_true", help="export in xlsxwriter constant_memory mode")
+    parser.add_argument("--formula-mode", choices=FORMULA_MODES, default=DEFAULT_FORMULA_MODE, help="formula emission mode for derived columns (default: %(default)s)")
+    parser.add_argument("--chunk-rows", type=int, default=0, help="convert in streamed blocks of this many rows, 0 to load each file whole (default: %(default)s)")
+    parser.add_argument("--workdir", default=None, help="folder for generated XML and workbooks (default: a temporary folder)")
+    parser.add_argument("-o", "--output", default=None, help="write results as JSON to this path")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    known = {name.lower(): name for name in list(BUILTIN_FORMAT_NAMES) + [CUSTOM_FORMAT_NAME]}
+    unknown = [name for name in args.formats if name.lower() not in known]
+    if unknown:
+        print(f"Unknown format: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    args.formats = [known[name.lower()] for name in args.formats]
+    args.repeat = max(1, args.repeat)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="cubeflow_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        results = run_benchmarks(args, workdir)
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fp:
+            compare_results(json.load(fp), results)
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
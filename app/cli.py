@@ -0,0 +1,160 @@
+import sys
+import os
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from conversion import (
+    BUILTIN_FORMAT_NAMES,
+    CONVERSION_CHUNK_ROWS,
+    DEFAULT_FORMULA_MODE,
+    FORMULA_MODES,
+    RESOURCE_BASE_DIR,
+    collect_xml_files_from_paths,
+    compile_custom_format_plan,
+    convert_and_export_task,
+    default_batch_worker_count,
+    default_formats_dir,
+    ensure_xlsx_extension,
+)
+
+
+def _read_format_entries(path):
+    try:
+        with open(path, "r", encoding="utf-8") as fp:
+            loaded = json.load(fp)
+    except Exception:
+        return []
+    if isinstance(loaded, dict):
+        loaded = loaded.get("formats", [loaded])
+    if not isinstance(loaded, list):
+        return []
+    entries = []
+    for item in loaded:
+        if not isinstance(item, dict):
+            continue
+        name = str(item.get("name", "")).strip()
+        columns = item.get("columns", [])
+        if name and isinstance(columns, list) and columns:
+            entries.append({"name": name, "columns": columns})
+    return entries
+
+
+def load_format_definitions(formats_dir):
+    entries = []
+    model_path = os.path.join(formats_dir, "format_model.json")
+    stored = _read_format_entries(model_path) if os.path.exists(model_path) else []
+    if not stored:
+        stored = _read_format_entries(os.path.join(RESOURCE_BASE_DIR, "formats", "format_model.json"))
+    entries.extend(stored)
+    if os.path.isdir(formats_dir):
+        for entry in sorted(os.listdir(formats_dir)):
+            if entry.lower().endswith(".json") and entry.lower() != "format_model.json":
+                entries.extend(_read_format_entries(os.path.join(formats_dir, entry)))
+    definitions = {}
+    for fmt in entries:
+        definitions.setdefault(fmt["name"].lower(), fmt)
+    return definitions
+
+
+def resolve_format(format_name, formats_dir=None):
+    key = str(format_name or "").strip().lower()
+    for name in BUILTIN_FORMAT_NAMES:
+        if name.lower() == key:
+            return name, None, None
+    definition = load_format_definitions(formats_dir or default_formats_dir()).get(key)
+    if definition is None:
+        return None, None, None
+    return definition["name"], definition, compile_custom_format_plan(definition)
+
+
+def plan_output_paths(xml_files, output_dir):
+    planned = []
+    used = set()
+    for xml_file in xml_files:
+        stem = os.path.splitext(os.path.basename(xml_file))[0]
+        candidate = ensure_xlsx_extension(stem)
+        counter = 2
+        while candidate.lower() in used:
+            candidate = ensure_xlsx_extension(f"{stem} ({counter})")
+            counter += 1
+        used.add(candidate.lower())
+        planned.append(os.path.join(output_dir, candidate))
+    return planned
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cubeflow", description="Convert ArrayFieldDataSet XML exports to formatted Excel workbooks.")
+    parser.add_argument("inputs", nargs="+", help="XML files or folders (folders are scanned recursively)")
+    parser.add_argument("-f", "--format", required=True, help="format name (built-in or from the saved format model)")
+    parser.add_argument("-o", "--output", required=True, help="output directory for the .xlsx files")
+    parser.add_argument("-j", "--jobs", type=int, default=default_batch_worker_count(), help="number of worker processes (default: %(default)s)")
+    parser.add_argument("--formats-dir", default=None, help="folder holding format_model.json (default: the app's formats folder)")
+    parser.add_argument("--formula-mode", choices=FORMULA_MODES, default=DEFAULT_FORMULA_MODE, help="write derived columns as one formula per cell, array formulas per column range, formulas with precomputed cached results, or precomputed values (default: %(default)s)")
+    parser.add_argument("--include", default=None, help="glob patterns for files found in folders, separated by ';' (default: *.xml)")
+    parser.add_argument("--exclude", default=None, help="glob patterns for files or folders to skip, separated by ';'")
+    parser.add_argument("--max-depth", type=int, default=None, help="folder levels to descend below each input folder (default: unlimited)")
+    parser.add_argument("--low-memory", action="store_true", help="write workbooks in xlsxwriter constant_memory mode")
+    parser.add_argument("--chunked", action="store_true", help="stream each file through parsing and writing in row blocks instead of loading it whole (implies --low-memory)")
+    parser.add_argument("--chunk-rows", type=int, default=CONVERSION_CHUNK_ROWS, help="rows per block with --chunked (default: %(default)s)")
+    parser.add_argument("--rows-per-sheet", type=int, default=None, help="start a new sheet with repeated headers after this many data rows (default: the Excel row limit)")
+    parser.add_argument("--split-workbooks", action="store_true", help="write each sheet-sized block to its own workbook (name_part2.xlsx, ...) instead of another sheet")
+    return parser
+
+
+def run(args):
+    format_name, definition, plan = resolve_format(args.format, args.formats_dir)
+    if format_name is None:
+        print(f"Unknown format: {args.format}", file=sys.stderr)
+        return 2
+    xml_files = collect_xml_files_from_paths(args.inputs, include=args.include, exclude=args.exclude, max_depth=args.max_depth)
+    if not xml_files:
+        print("No XML files found.", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+    output_paths = plan_output_paths(xml_files, args.output)
+    jobs = max(1, min(int(args.jobs), len(xml_files)))
+    chunk_rows = max(1, int(args.chunk_rows)) if args.chunked else 0
+    rows_per_sheet = max(1, int(args.rows_per_sheet)) if args.rows_per_sheet else None
+    task_args = [
+        (xml_file, format_name, definition, plan, output_path, args.low_memory, None, args.formula_mode, chunk_rows, rows_per_sheet, args.split_workbooks)
+        for xml_file, output_path in zip(xml_files, output_paths)
+    ]
+
+    failures = 0
+    if jobs == 1:
+        outcomes = ((task[0], task[4], convert_and_export_task(*task)) for task in task_args)
+        for xml_file, output_path, result in outcomes:
+            failures += _report(xml_file, output_path, result)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {pool.submit(convert_and_export_task, *task): task for task in task_args}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"status": "Failed", "error": f"An unexpected error occurred for {task[0]}: {e}"}
+                failures += _report(task[0], task[4], result)
+    print(f"Converted {len(xml_files) - failures} of {len(xml_files)} file(s).")
+    return 1 if failures else 0
+
+
+def _report(xml_file, output_path, result):
+    if result.get("status") == "Done":
+        extra_parts = len(result.get("outputPaths") or [output_path]) - 1
+        print(f"OK      {xml_file} -> {output_path}" + (f" (+{extra_parts} more part(s))" if extra_parts else ""))
+        return 0
+    print(f"FAILED  {xml_file}: {result.get('error', 'Unknown error')}", file=sys.stderr)
+    return 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -8,6 +8,7 @@ ColumnLayout {
     property int totalBatchFiles: 0
     property string selectionType: ""
     property string completionDetailMessage: ""
+    property string metricsSummary: ""
     property color themeText: "white"
     property color themeTextSecondary: "#b8b8c4"
     property color themeLayer3: "#7d7d8a"
@@ -52,6 +53,18 @@ ColumnLayout {
         color: themeTextSecondary
     }
 
+    Text {
+        visible: String(metricsSummary || "").length > 0
+        text: metricsSummary
+        font.pixelSize: 11 * scaleFactor
+        Layout.alignment: Qt.AlignHCenter
+        Layout.fillWidth: true
+        horizontalAlignment: Text.AlignHCenter
+        wrapMode: Text.Wrap
+        lineHeight: 1.2
+        color: themeTextSecondary
+    }
+
     PixelButton {
         sliceLeft: 5
         sliceRight: 5
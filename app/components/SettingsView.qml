@@ -0,0 +1,303 @@
+import QtQuick
+import QtQuick.Controls
+import QtQuick.Layouts
+import "../controls"
+
+ColumnLayout {
+    id: settingsView
+
+    property real scaleFactor: 1.0
+    property color themeText: "white"
+    property color themeTextSecondary: "#b8b8c4"
+    property color themeInset: "#2b2b36"
+    property color themePanel: "#3d3d4d"
+    property color themeLayer3: "#7d7d8a"
+    property color themeLayer2: "#6b6b7a"
+    property color themeLayer1: "#52525e"
+    property var backendSafe: null
+
+    signal closeRequested()
+
+    spacing: 8 * scaleFactor
+
+    function toggleText(enabled) {
+        return enabled ? "On" : "Off"
+    }
+
+    function applyInt(field, setter) {
+        if (field.acceptableInput) {
+            setter(parseInt(field.text, 10))
+        }
+    }
+
+    Text {
+        text: "Settings"
+        color: themeText
+        font.family: appFontFamily
+        font.pixelSize: 14 * scaleFactor
+        font.bold: true
+        Layout.fillWidth: true
+        horizontalAlignment: Text.AlignHCenter
+    }
+
+    ScrollView {
+        id: settingsScroll
+        Layout.fillWidth: true
+        Layout.fillHeight: true
+        clip: true
+        ScrollBar.horizontal.policy: ScrollBar.AlwaysOff
+
+        GridLayout {
+            width: settingsScroll.availableWidth
+            columns: 2
+            columnSpacing: 8 * scaleFactor
+            rowSpacing: 6 * scaleFactor
+
+            Text {
+                text: "Formula mode"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelComboBox {
+                id: formulaModeCombo
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                textPixelSize: 11 * scaleFactor
+                popupTextPixelSize: 11 * scaleFactor
+                model: backendSafe ? backendSafe.formulaModeOptions : []
+                currentIndex: backendSafe ? model.indexOf(backendSafe.formulaMode) : -1
+                fallbackNormal: themeInset
+                fallbackFocus: themeLayer1
+                fallbackOpen: themeLayer2
+                fallbackDisabled: themeLayer2
+                fallbackBorder: themeLayer2
+                fallbackText: themeText
+                fallbackPopup: themePanel
+                onActivated: function(index) {
+                    backendSafe.setFormulaMode(model[index])
+                }
+            }
+
+            Text {
+                text: "Low-memory export"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelButton {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                text: toggleText(backendSafe && backendSafe.lowMemoryExport)
+                textPixelSize: 11 * scaleFactor
+                fallbackNormal: themeLayer3
+                fallbackHover: themeLayer2
+                fallbackPressed: themeLayer1
+                textColor: themeText
+                borderColor: themeLayer3
+                onClicked: backendSafe.setLowMemoryExport(!backendSafe.lowMemoryExport)
+            }
+
+            Text {
+                text: "Batch workers"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                id: batchWorkersField
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                text: backendSafe ? String(backendSafe.batchWorkerCount) : ""
+                validator: IntValidator { bottom: 1 }
+                hasError: !acceptableInput
+                onEditingFinished: settingsView.applyInt(batchWorkersField, backendSafe.setBatchWorkerCount)
+            }
+
+            Text {
+                text: "Save in batch workers"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelButton {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                text: toggleText(backendSafe && backendSafe.fusedBatchSave)
+                textPixelSize: 11 * scaleFactor
+                fallbackNormal: themeLayer3
+                fallbackHover: themeLayer2
+                fallbackPressed: themeLayer1
+                textColor: themeText
+                borderColor: themeLayer3
+                onClicked: backendSafe.setFusedBatchSave(!backendSafe.fusedBatchSave)
+            }
+
+            Text {
+                text: "Spill batch results to disk"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelButton {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                text: toggleText(backendSafe && backendSafe.spillBatchResults)
+                textPixelSize: 11 * scaleFactor
+                fallbackNormal: themeLayer3
+                fallbackHover: themeLayer2
+                fallbackPressed: themeLayer1
+                textColor: themeText
+                borderColor: themeLayer3
+                onClicked: backendSafe.setSpillBatchResults(!backendSafe.spillBatchResults)
+            }
+
+            Text {
+                text: "Chunk rows (0 = off)"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                id: chunkRowsField
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                text: backendSafe ? String(backendSafe.chunkRows) : ""
+                validator: IntValidator { bottom: 0 }
+                hasError: !acceptableInput
+                onEditingFinished: settingsView.applyInt(chunkRowsField, backendSafe.setChunkRows)
+            }
+
+            Text {
+                text: "Result cache"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelButton {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                text: toggleText(backendSafe && backendSafe.resultCacheEnabled)
+                textPixelSize: 11 * scaleFactor
+                fallbackNormal: themeLayer3
+                fallbackHover: themeLayer2
+                fallbackPressed: themeLayer1
+                textColor: themeText
+                borderColor: themeLayer3
+                onClicked: backendSafe.setResultCacheEnabled(!backendSafe.resultCacheEnabled)
+            }
+
+            Text {
+                text: "Result cache size (MB)"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                id: resultCacheField
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                enabled: backendSafe && backendSafe.resultCacheEnabled
+                text: backendSafe ? String(backendSafe.resultCacheMegabytes) : ""
+                validator: IntValidator { bottom: 0 }
+                hasError: !acceptableInput
+                onEditingFinished: settingsView.applyInt(resultCacheField, backendSafe.setResultCacheMegabytes)
+            }
+
+            Item {
+                Layout.fillWidth: true
+            }
+
+            PixelButton {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                text: "Clear Cache"
+                textPixelSize: 11 * scaleFactor
+                fallbackNormal: themePanel
+                fallbackHover: themeLayer2
+                fallbackPressed: themeLayer1
+                textColor: themeText
+                borderColor: themeLayer3
+                onClicked: backendSafe.clearResultCache()
+            }
+
+            Text {
+                text: "Folder scan include"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                text: backendSafe ? backendSafe.scanIncludeGlobs : ""
+                placeholderText: "*.xml"
+                onEditingFinished: backendSafe.setScanIncludeGlobs(text)
+            }
+
+            Text {
+                text: "Folder scan exclude"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                text: backendSafe ? backendSafe.scanExcludeGlobs : ""
+                placeholderText: "None"
+                onEditingFinished: backendSafe.setScanExcludeGlobs(text)
+            }
+
+            Text {
+                text: "Folder scan depth (-1 = all)"
+                color: themeText
+                font.pixelSize: 11 * scaleFactor
+                Layout.fillWidth: true
+            }
+
+            PixelTextField {
+                id: scanDepthField
+                Layout.preferredWidth: 110 * scaleFactor
+                Layout.preferredHeight: 30 * scaleFactor
+                font.pixelSize: 11 * scaleFactor
+                text: backendSafe ? String(backendSafe.scanMaxDepth) : ""
+                validator: IntValidator { bottom: -1 }
+                hasError: !acceptableInput
+                onEditingFinished: settingsView.applyInt(scanDepthField, backendSafe.setScanMaxDepth)
+            }
+        }
+    }
+
+    PixelButton {
+        sliceLeft: 5
+        sliceRight: 5
+        sliceTop: 4
+        sliceBottom: 4
+        Layout.fillWidth: true
+        Layout.preferredHeight: 34 * scaleFactor
+        text: "Done"
+        textPixelSize: 11 * scaleFactor
+        fallbackNormal: themeLayer3
+        fallbackHover: themeLayer2
+        fallbackPressed: themeLayer1
+        textColor: themeText
+        borderColor: themeLayer3
+        onClicked: settingsView.closeRequested()
+    }
+}
@@ -0,0 +1,2250 @@
+import sys
+import os
+import re
+import json
+import copy
+import time
+import shutil
+import tempfile
+import fnmatch
+import hashlib
+import functools
+import importlib
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class _LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attr)
+        setattr(self, attr, value)
+        return value
+
+
+def lazy_module(name):
+    return _LazyModule(name)
+
+
+np = lazy_module("numpy")
+pd = lazy_module("pandas")
+xlsxwriter = lazy_module("xlsxwriter")
+ENGINE_MODULES = ("numpy", "pandas", "pandas.io.parsers", "xlsxwriter")
+
+
+def warm_up_engine():
+    for name in ENGINE_MODULES:
+        importlib.import_module(name)
+
+BUILTIN_FORMAT_NAMES = ("Den", "Glacier", "Globe", "Kipshoven")
+BUILTIN_FORMAT_NAME_SET = {name.lower() for name in BUILTIN_FORMAT_NAMES}
+ARRAY_FIELD_DATASET_NS = "http://tempuri.org/ArrayFieldDataSet.xsd"
+XML_ITEMS_TAG = f"{{{ARRAY_FIELD_DATASET_NS}}}Items"
+XML_READ_CHUNK_ROWS = 20000
+CONVERSION_CHUNK_ROWS = 100000
+EXCEL_MAX_ROWS = 1048576
+PARSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+RESULT_CACHE_VERSION = 2
+FINGERPRINT_CHUNK_BYTES = 1024 * 1024
+SCAN_MAX_WORKERS = 8
+SCAN_BATCH_SIZE = 200
+SCAN_FLUSH_SECONDS = 0.25
+ITEM_CLOCK_POSITION = 1
+ITEM_STATUS_POSITION = 2
+ITEM_CLOCK_FORMAT = "%Y-%m-%d %H:%M:%S"
+ITEM_CLOCK_TEXT_LENGTH = 19
+ITEM_NA_VALUES = frozenset(("", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"))
+ITEM_BOOL_VALUES = {"True": True, "TRUE": True, "true": True, "False": False, "FALSE": False, "false": False}
+CLOCK_GAP_FACTOR = 1.5
+FORMULA_MODES = ("cells", "array", "cached", "values")
+DEFAULT_FORMULA_MODE = "cells"
+ROW_REFERENCE_PATTERN = re.compile(r"(\$?[A-Za-z]{1,3}\$?)\{r(-1)?\}")
+FORMULA_CALL_PATTERN = re.compile(r"[\w.]\(")
+FORMULA_TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|\$?([A-Za-z]{1,3})\$?\{r(-1)?\}|([-+*/^()]))")
+FORMULA_VALUE_OK = 0
+FORMULA_VALUE_UNKNOWN = 1
+FORMULA_VALUE_DIV0 = 2
+FORMULA_VALUE_NUM = 3
+FORMULA_ERROR_TEXT = {FORMULA_VALUE_DIV0: "#DIV/0!", FORMULA_VALUE_NUM: "#NUM!"}
+
+CUSTOM_LABEL_PRESETS = (
+    {"key": "clock", "row1": "0-0:1.0.0", "row2": "Clock"},
+    {"key": "edis_status", "row1": "0-0:96.240.12 [hex]", "row2": "EDIS status"},
+    {"key": "last_avg_demand", "row1": "1-1:1.5.0 [kW]", "row2": "Last average demand +A (QI+QIV)"},
+    {"key": "demand", "row1": "", "row2": "Demand"},
+    {"key": "active_import", "row1": "1-1:1.8.0 [Wh]", "row2": "Active energy import +A (QI+QIV)"},
+    {"key": "kwh", "row1": "", "row2": "kWh"},
+    {"key": "active_energy_rate1", "row1": "1-1:15.8.1 [Wh]", "row2": "Active energy A (QI+QII+QIII+QIV) rate 1"},
+    {"key": "energy_delta_import", "row1": "1-1:1.29.0 [Wh]", "row2": "Energy delta over capture period 1 +A (QI+QIV)"},
+    {"key": "active_export", "row1": "1-1:2.8.0 [Wh]", "row2": "Active energy export -A (QII+QIII)"},
+    {"key": "energy_delta_export", "row1": "1-1:2.29.0 [Wh]", "row2": "Energy delta over capture period 1 -A (QII+QIII)"},
+    {"key": "reactive_import", "row1": "1-1:3.8.0 [varh]", "row2": "Reactive energy import +R (QI+QII)"},
+    {"key": "kvarh", "row1": "", "row2": "kVarh"},
+    {"key": "energy_delta_reactive_import", "row1": "1-1:3.29.0 [varh]", "row2": "Energy delta over capture period 1 +R (QI+QII)"},
+    {"key": "reactive_export", "row1": "1-1:4.8.0 [varh]", "row2": "Reactive energy export -R (QIII+QIV)"},
+    {"key": "energy_delta_reactive_export", "row1": "1-1:4.29.0 [varh]", "row2": "Energy delta over capture period 1 -R (QIII+QIV)"},
+    {"key": "last_avg_power_factor", "row1": "1-1:13.5.0", "row2": "Last average power factor"},
+    {"key": "energy_abs_sum", "row1": "1-1:128.8.0 [Wh]", "row2": "Energy |AL1|+|AL2|+|AL3|"},
+)
+
+_DEN_MAPPING = {0: 0, 1: 1, 2: 2, 3: 4, 4: 6, 5: 7, 6: 9, 7: 10, 8: 11, 9: 12}
+_DEN_LABEL_KEYS = {
+    0: "clock",
+    1: "edis_status",
+    2: "last_avg_demand",
+    3: "demand",
+    4: "active_import",
+    5: "kwh",
+    6: "active_export",
+    7: "reactive_import",
+    8: "kvarh",
+    9: "reactive_export",
+    10: "active_energy_rate1",
+    11: "last_avg_power_factor",
+    12: "energy_abs_sum",
+}
+_GLOBE_MAPPING = {0: 0, 1: 1, 2: 2, 3: 4, 4: 6, 5: 7, 6: 8, 7: 9, 8: 11, 9: 12, 10: 13, 11: 14}
+_GLOBE_LABEL_KEYS = {
+    0: "clock",
+    1: "edis_status",
+    2: "last_avg_demand",
+    3: "demand",
+    4: "active_import",
+    5: "kwh",
+    6: "energy_delta_import",
+    7: "active_export",
+    8: "energy_delta_export",
+    9: "reactive_import",
+    10: "kvarh",
+    11: "energy_delta_reactive_import",
+    12: "reactive_export",
+    13: "energy_delta_reactive_export",
+    14: "last_avg_power_factor",
+}
+
+BUILTIN_FORMAT_SPECS = {
+    "Den": {
+        "source_cols": 11,
+        "max_col": 13,
+        "mapping": _DEN_MAPPING,
+        "formulas": {3: "=C{r}*280", 5: "=(E{r}-E{r-1})*280/1000", 8: "=(H{r}-H{r-1})*280/1000"},
+        "label_keys": _DEN_LABEL_KEYS,
+        "widths": [17.73, 17.27] + [16.27] * 7 + [32.27, 36.36, 23.36, 24.76],
+        "hidden_cols": {6: 16.27},
+    },
+    "Glacier": {
+        "source_cols": 11,
+        "max_col": 13,
+        "mapping": _DEN_MAPPING,
+        "formulas": {3: "=C{r}*280", 5: "=(E{r}-E{r-1})*280/1000", 8: "=(H{r}-H{r-1})*280/1000"},
+        "label_keys": _DEN_LABEL_KEYS,
+        "widths": [17.73, 17.27] + [16.91] * 7 + [18.73, 17.55, 23.36, 23.36],
+        "hidden_cols": {6: 16.91},
+    },
+    "Globe": {
+        "source_cols": 13,
+        "max_col": 15,
+        "mapping": _GLOBE_MAPPING,
+        "formulas": {3: "=C{r}*1400", 5: "=(E{r}-E{r-1})*1400/1000", 10: "=(J{r}-J{r-1})*1400/1000"},
+        "label_keys": _GLOBE_LABEL_KEYS,
+        "widths": [17.73, 17.27] + [14.91] * 9 + [41.91, 33.27, 43.36, 23.36],
+        "hidden_cols": {6: 14.91, 7: 14.91, 8: 14.91},
+    },
+    "Kipshoven": {
+        "source_cols": 11,
+        "max_col": 13,
+        "mapping": _DEN_MAPPING,
+        "formulas": {3: "=C{r}*350", 5: "=(E{r}-E{r-1})*350/1000", 8: "=(H{r}-H{r-1})*350/1000"},
+        "label_keys": _DEN_LABEL_KEYS,
+        "widths": [17.73, 17.27] + [16.91] * 7 + [18.73, 17.55, 23.36, 23.36],
+        "hidden_cols": {6: 16.91},
+    },
+}
+
+def _app_base_dir():
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+def _resource_base_dir():
+    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+        return getattr(sys, "_MEIPASS")
+    return _app_base_dir()
+
+APP_BASE_DIR = _app_base_dir()
+RESOURCE_BASE_DIR = _resource_base_dir()
+
+def documents_dir():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _Guid(ctypes.Structure):
+                _fields_ = [
+                    ("Data1", wintypes.DWORD),
+                    ("Data2", wintypes.WORD),
+                    ("Data3", wintypes.WORD),
+                    ("Data4", ctypes.c_ubyte * 8),
+                ]
+
+            folder_id = _Guid(0xFDD39AD0, 0x238F, 0x46AF, (ctypes.c_ubyte * 8)(0xAD, 0xB4, 0x6C, 0x85, 0x48, 0x03, 0x69, 0xC7))
+            path = ctypes.c_wchar_p()
+            if ctypes.windll.shell32.SHGetKnownFolderPath(ctypes.byref(folder_id), 0, None, ctypes.byref(path)) == 0:
+                value = path.value
+                ctypes.windll.ole32.CoTaskMemFree(path)
+                if value:
+                    return value
+        except Exception:
+            pass
+        return os.path.join(home, "Documents")
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+    try:
+        with open(os.path.join(config_home, "user-dirs.dirs"), "r", encoding="utf-8") as fp:
+            for line in fp:
+                name, _, value = line.strip().partition("=")
+                if name == "XDG_DOCUMENTS_DIR":
+                    value = value.strip().strip('"').replace("$HOME", home)
+                    if value:
+                        return value
+    except OSError:
+        pass
+    return os.path.join(home, "Documents")
+
+def user_data_dir_candidates():
+    candidates = []
+    docs = documents_dir()
+    if docs:
+        candidates.append(os.path.join(docs, "CubeFlow"))
+    candidates.append(os.path.join(os.path.expanduser("~"), "Documents", "CubeFlow"))
+    candidates.append(os.path.join(tempfile.gettempdir(), "CubeFlow"))
+    return candidates
+
+def user_data_dir():
+    for candidate in user_data_dir_candidates():
+        try:
+            if not candidate:
+                continue
+            os.makedirs(candidate, exist_ok=True)
+            probe_path = os.path.join(candidate, ".write_probe.tmp")
+            with open(probe_path, "w", encoding="utf-8") as fp:
+                fp.write("ok")
+            os.remove(probe_path)
+            return candidate
+        except Exception:
+            continue
+
+    return os.path.join(tempfile.gettempdir(), "CubeFlow")
+
+def default_formats_dir():
+    return os.path.join(user_data_dir(), "formats")
+
+
+def ensure_xlsx_extension(file_name):
+    if not file_name:
+        return "output.xlsx"
+    return file_name if file_name.lower().endswith(".xlsx") else f"{file_name}.xlsx"
+
+
+def excel_col_to_index(col_name):
+    name = (col_name or "").strip().upper()
+    if not name or not name.isalpha():
+        return 0
+    idx = 0
+    for ch in name:
+        idx = idx * 26 + (ord(ch) - ord('A') + 1)
+    return idx - 1
+
+
+def index_to_excel_col(idx):
+    n = max(0, int(idx))
+    out = ""
+    while True:
+        n, rem = divmod(n, 26)
+        out = chr(ord('A') + rem) + out
+        if n == 0:
+            break
+        n -= 1
+    return out
+
+
+def build_default_batch_output_path(xml_file):
+    source_dir = os.path.dirname(xml_file)
+    source_base = os.path.splitext(os.path.basename(xml_file))[0]
+    return os.path.join(source_dir, f"{source_base}.xlsx")
+
+
+def normalize_path(path):
+    if not path:
+        return ""
+    normalized = os.path.normpath(str(path))
+    return normalized
+
+
+def split_scan_patterns(patterns):
+    if not patterns:
+        return []
+    if isinstance(patterns, str):
+        patterns = patterns.replace(",", ";").split(";")
+    return [str(p).strip().lower() for p in patterns if str(p).strip()]
+
+
+def _matches_any(patterns, name, rel_path):
+    return any(fnmatch.fnmatchcase(name, p) or fnmatch.fnmatchcase(rel_path, p) for p in patterns)
+
+
+def _scan_directory(directory, root, include, exclude):
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    name = entry.name.lower()
+                    rel_path = os.path.relpath(entry.path, root).replace(os.sep, "/").lower()
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _matches_any(exclude, name, rel_path):
+                            subdirs.append(entry.path)
+                    elif name.endswith(".xml") and entry.is_file():
+                        if include and not _matches_any(include, name, rel_path):
+                            continue
+                        if not _matches_any(exclude, name, rel_path):
+                            files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def _iter_directory_xml_files(root, include, exclude, max_depth, max_workers, should_stop):
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        running = {pool.submit(_scan_directory, root, root, include, exclude): 0}
+        try:
+            while running:
+                if callable(should_stop) and should_stop():
+                    return
+                done, _ = wait(list(running), timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = running.pop(future)
+                    files, subdirs = future.result()
+                    if max_depth is None or depth < max_depth:
+                        for subdir in subdirs:
+                            running[pool.submit(_scan_directory, subdir, root, include, exclude)] = depth + 1
+                    yield files
+        finally:
+            for future in running:
+                future.cancel()
+
+
+def iter_xml_file_batches(paths, should_stop=None, include=None, exclude=None, max_depth=None, max_workers=SCAN_MAX_WORKERS, batch_size=SCAN_BATCH_SIZE):
+    include = split_scan_patterns(include)
+    exclude = split_scan_patterns(exclude)
+    if max_depth is not None and int(max_depth) < 0:
+        max_depth = None
+    seen = set()
+    batch = []
+    last_flush = time.monotonic()
+    for raw_path in paths:
+        if callable(should_stop) and should_stop():
+            return
+        path = normalize_path(raw_path)
+        if not path:
+            continue
+        if os.path.isfile(path):
+            if path.lower().endswith(".xml") and path not in seen:
+                batch.append(path)
+                seen.add(path)
+            continue
+        if not os.path.isdir(path):
+            continue
+        for files in _iter_directory_xml_files(path, include, exclude, max_depth, max_workers, should_stop):
+            for full_path in files:
+                if full_path not in seen:
+                    batch.append(full_path)
+                    seen.add(full_path)
+            if batch and (len(batch) >= batch_size or time.monotonic() - last_flush >= SCAN_FLUSH_SECONDS):
+                yield batch
+                batch = []
+                last_flush = time.monotonic()
+    if batch:
+        yield batch
+
+
+def _scan_sort_key(path):
+    return os.path.normcase(path).split(os.sep)
+
+
+def collect_xml_files_from_paths(paths, should_stop=None, include=None, exclude=None, max_depth=None, on_batch=None):
+    collected = []
+    seen = set()
+    found = 0
+    for raw_path in paths:
+        discovered = []
+        for batch in iter_xml_file_batches([raw_path], should_stop, include, exclude, max_depth):
+            discovered.extend(batch)
+            found += len(batch)
+            if callable(on_batch):
+                on_batch(batch, found)
+        if callable(should_stop) and should_stop():
+            return collected
+        for path in sorted(discovered, key=_scan_sort_key):
+            if path not in seen:
+                collected.append(path)
+                seen.add(path)
+    return collected
+
+
+def _local_xml_name(tag):
+    return tag.split("}", 1)[1] if "}" in tag else tag
+
+
+def _xml_item_record(elem, names):
+    record = {_local_xml_name(k): v for k, v in elem.attrib.items()} if elem.attrib else {}
+    if elem.text and not elem.text.isspace():
+        record[_local_xml_name(elem.tag)] = elem.text
+    for child in elem:
+        tag = child.tag
+        name = names.get(tag)
+        if name is None:
+            if not isinstance(tag, str):
+                continue
+            name = names[tag] = _local_xml_name(tag)
+        record[name] = child.text or None
+    return record
+
+
+def _xml_records_to_frame(records):
+    keys = list(dict.fromkeys(k for record in records for k in record))
+    return pd.DataFrame([[record.get(k) for k in keys] for record in records], columns=keys, dtype=object)
+
+
+def _infer_item_values(values, text=False):
+    values = np.array(values, dtype=object)
+    missing = pd.isna(values) | pd.Series(values).isin(ITEM_NA_VALUES).to_numpy()
+    if missing.any():
+        values[missing] = np.nan
+    if missing.all():
+        return values if text else values.astype("float64")
+    if text:
+        return values
+    numbers = pd.to_numeric(values, errors="coerce")
+    if not np.isnan(numbers[~missing].astype("float64")).any():
+        return numbers
+    flags = pd.Series(values[~missing]).map(ITEM_BOOL_VALUES)
+    if flags.isna().any():
+        return values
+    if not missing.any():
+        return flags.to_numpy(dtype=bool)
+    values[~missing] = flags.to_numpy(dtype=object)
+    return values
+
+
+def _item_value_kind(values):
+    if values.dtype.kind in "iuf":
+        return "number" if not np.isnan(values.astype("float64")).all() else None
+    if values.dtype.kind == "b":
+        return "bool"
+    present = values[~pd.isna(values)]
+    if not present.size:
+        return None
+    return "bool" if all(isinstance(value, bool) for value in present) else "text"
+
+
+def parse_item_columns(df, text_names=None):
+    text_names = set(df.columns[:ITEM_STATUS_POSITION + 1]) | set(text_names or ())
+    columns = {}
+    for position, name in enumerate(df.columns):
+        columns[name] = _infer_item_values(df.iloc[:, position].to_numpy(dtype=object), name in text_names)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def iter_xml_item_records(xml_file):
+    parents = []
+    names = {}
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag != XML_ITEMS_TAG or not parents:
+            continue
+        record = _xml_item_record(elem, names)
+        parents[-1].remove(elem)
+        yield record
+
+
+def iter_xml_item_chunks(xml_file, chunk_rows=XML_READ_CHUNK_ROWS, should_stop=None):
+    chunk_rows = max(1, int(chunk_rows))
+    records = []
+    for record in iter_xml_item_records(xml_file):
+        records.append(record)
+        if len(records) >= chunk_rows:
+            if callable(should_stop) and should_stop():
+                return
+            yield _xml_records_to_frame(records)
+            records = []
+    if records:
+        yield _xml_records_to_frame(records)
+
+
+def read_xml_items(xml_file, chunk_rows=XML_READ_CHUNK_ROWS, should_stop=None, text_names=()):
+    chunks = []
+    kinds = {}
+    for chunk in iter_xml_item_chunks(xml_file, chunk_rows=chunk_rows, should_stop=should_stop):
+        typed = parse_item_columns(chunk, text_names)
+        for position, name in enumerate(typed.columns):
+            kind = _item_value_kind(typed.iloc[:, position].to_numpy())
+            if kind is not None:
+                kinds.setdefault(name, set()).add(kind)
+        chunks.append(typed)
+    _raise_if_cancelled(should_stop)
+    if not chunks:
+        raise ValueError("xpath does not return any Items nodes.")
+    mixed = [name for name, seen in kinds.items() if len(seen) > 1]
+    if mixed:
+        if hasattr(xml_file, "seek"):
+            xml_file.seek(0)
+        return read_xml_items(xml_file, chunk_rows, should_stop, set(text_names) | set(mixed))
+    return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True, sort=False)
+
+
+def read_typed_items(xml_file, chunk_rows=XML_READ_CHUNK_ROWS, should_stop=None, text_names=()):
+    keys = []
+    parts = {}
+    kinds = {}
+    rows = 0
+    found = False
+    for chunk in iter_xml_item_chunks(xml_file, chunk_rows=chunk_rows, should_stop=should_stop):
+        found = True
+        keys.extend(name for name in chunk.columns if name not in keys)
+        items = filter_item_rows(parse_item_columns(chunk.reindex(columns=keys), text_names))
+        for position, name in enumerate(keys):
+            series = items.iloc[:, position]
+            if position == ITEM_CLOCK_POSITION:
+                series = _typed_clock_column(series)
+            elif position > ITEM_STATUS_POSITION:
+                kind = _item_value_kind(series.to_numpy())
+                if kind is not None:
+                    kinds.setdefault(name, set()).add(kind)
+            if name not in parts:
+                parts[name] = [pd.Series(np.nan, index=range(rows))] if rows else []
+            parts[name].append(series)
+        rows += len(items)
+    _raise_if_cancelled(should_stop)
+    if not found:
+        raise ValueError("xpath does not return any Items nodes.")
+    mixed = [name for name, seen in kinds.items() if len(seen) > 1]
+    if mixed:
+        parts.clear()
+        if hasattr(xml_file, "seek"):
+            xml_file.seek(0)
+        return read_typed_items(xml_file, chunk_rows, should_stop, set(text_names) | set(mixed))
+    columns = {}
+    for position, name in enumerate(keys):
+        column_parts = parts.pop(name)
+        if position == ITEM_CLOCK_POSITION and any(part.dtype.kind != "M" for part in column_parts):
+            column_parts = [part.dt.strftime(ITEM_CLOCK_FORMAT) if part.dtype.kind == "M" else part for part in column_parts]
+        column = pd.concat(column_parts, ignore_index=True) if len(column_parts) > 1 else column_parts[0].reset_index(drop=True)
+        del column_parts
+        columns[name] = _typed_register_column(column) if position > ITEM_STATUS_POSITION else column
+    return pd.DataFrame(columns, index=pd.RangeIndex(rows))
+
+
+def filter_item_rows(df):
+    return df[~df.iloc[:, 0].astype(str).str.contains("/ArrayFieldDataSet", na=False)].reset_index(drop=True)
+
+
+def _typed_clock_column(series):
+    text = series.astype(object)
+    present = text.notna()
+    parsed = pd.to_datetime(text, format=ITEM_CLOCK_FORMAT, errors="coerce")
+    if not parsed.notna().equals(present):
+        return series
+    if not text[present].str.len().eq(ITEM_CLOCK_TEXT_LENGTH).all():
+        return series
+    return parsed
+
+
+def _typed_register_column(series):
+    kind = series.dtype.kind
+    if kind in "iuf":
+        return series.astype("float64")
+    if kind == "b":
+        return series
+    numbers = pd.to_numeric(series, errors="coerce")
+    if numbers.notna().sum() != series.notna().sum():
+        return series
+    return numbers.astype("float64")
+
+
+def apply_item_schema(df, schema=None):
+    columns = {}
+    for position, name in enumerate(df.columns):
+        series = df.iloc[:, position]
+        if position == ITEM_CLOCK_POSITION:
+            if schema is None or schema["clock_typed"]:
+                series = _typed_clock_column(series)
+        elif position > ITEM_STATUS_POSITION:
+            kind = "number" if schema is None else schema["registers"].get(name, "number")
+            if kind == "number":
+                series = _typed_register_column(series)
+                if schema is not None and series.dtype.kind != "f":
+                    series = pd.to_numeric(series, errors="coerce").astype("float64")
+        columns[name] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _register_kind(series):
+    if not series.notna().any():
+        return None
+    kind = series.dtype.kind
+    if kind == "f":
+        return "number"
+    return "bool" if kind == "b" else "text"
+
+
+def scan_item_schema(xml_file, chunk_rows=XML_READ_CHUNK_ROWS, should_stop=None, progress_callback=None, progress_start=0, progress_end=0):
+    keys = []
+    registers = {}
+    clock_typed = True
+    with open(xml_file, "rb") as source:
+        total_bytes = max(1, os.fstat(source.fileno()).st_size)
+        for chunk in iter_xml_item_chunks(source, chunk_rows=chunk_rows, should_stop=should_stop):
+            keys.extend(name for name in chunk.columns if name not in keys)
+            items = filter_item_rows(parse_item_columns(chunk))
+            for position, name in enumerate(items.columns):
+                series = items.iloc[:, position]
+                if position == ITEM_CLOCK_POSITION:
+                    clock_typed = clock_typed and _typed_clock_column(series).dtype.kind == "M"
+                elif position > ITEM_STATUS_POSITION:
+                    kind = _register_kind(_typed_register_column(series))
+                    known = registers.get(name)
+                    if known is None or known == kind or kind is None:
+                        registers[name] = known or kind
+                    else:
+                        registers[name] = "text" if "text" in (known, kind) else "number"
+            _emit_progress_safe(progress_callback, progress_start + (progress_end - progress_start) * source.tell() // total_bytes)
+    return {"keys": keys, "clock_typed": clock_typed, "registers": registers}
+
+
+def read_xml_items_head(xml_file, max_rows, should_stop=None):
+    max_rows = max(1, int(max_rows))
+    records = []
+    found = 0
+    for record in iter_xml_item_records(xml_file):
+        if callable(should_stop) and should_stop():
+            break
+        records.append(record)
+        first = next(iter(record.values()), None)
+        if not (isinstance(first, str) and "/ArrayFieldDataSet" in first):
+            found += 1
+            if found >= max_rows:
+                break
+    _raise_if_cancelled(should_stop)
+    if not records:
+        raise ValueError("xpath does not return any Items nodes.")
+    return filter_item_rows(pd.DataFrame(records, dtype=object)).head(max_rows)
+
+
+def file_fingerprint(path):
+    path = os.path.normcase(os.path.abspath(path))
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(FINGERPRINT_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return (path, stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+
+
+class ParsedXmlCache:
+    def __init__(self, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.max_bytes = max(0, int(max_bytes))
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted
+
+    def set_max_bytes(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max(0, int(max_bytes))
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+PARSE_CACHE = ParsedXmlCache()
+
+
+def read_filtered_items(xml_file, should_stop=None, cache=None, metrics=None):
+    key = file_fingerprint(xml_file) if cache is not None and cache.max_bytes else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            if metrics is not None:
+                metrics["parse_cache_hit"] = True
+            return cached
+    df_filtered = read_typed_items(xml_file, should_stop=should_stop)
+    if key is not None:
+        cache.put(key, df_filtered)
+    if metrics is not None:
+        metrics["parse_cache_hit"] = False
+    return df_filtered
+
+
+def _tokenize_row_formula(template):
+    parts = []
+    rest = str(template)
+    while rest:
+        positions = [(rest.find(token), token) for token in ("{r}", "{r-1}") if token in rest]
+        if not positions:
+            parts.append(rest)
+            break
+        pos, token = min(positions)
+        if pos:
+            parts.append(rest[:pos])
+        parts.append(0 if token == "{r}" else -1)
+        rest = rest[pos + len(token):]
+    return parts
+
+
+def _row_number_labels(first_row, count, min_row=None):
+    rows = np.arange(first_row, first_row + count)
+    labels = {}
+    for offset in (0, -1):
+        refs = rows + offset
+        if min_row is not None:
+            refs = np.maximum(refs, min_row)
+        labels[offset] = refs.astype(str)
+    return labels
+
+
+def _render_row_formulas(parts, row_labels):
+    rendered = np.zeros(len(row_labels[0]), dtype=str)
+    for part in parts:
+        rendered = np.char.add(rendered, part if isinstance(part, str) else row_labels[part])
+    return rendered.astype(object)
+
+
+def normalize_formula_mode(mode):
+    mode = str(mode or "").strip().lower()
+    return mode if mode in FORMULA_MODES else DEFAULT_FORMULA_MODE
+
+
+def _range_formula_renderer(template, min_row):
+    if not str(template).startswith("="):
+        return None
+
+    def render(first_row, last_row):
+        def reference(match):
+            offset = -1 if match.group(2) else 0
+            first = first_row + offset
+            last = last_row + offset
+            if min_row is not None:
+                first = max(first, min_row)
+                last = max(last, min_row)
+            return f"{match.group(1)}{first}:{match.group(1)}{last}"
+
+        return ROW_REFERENCE_PATTERN.sub(reference, template)
+
+    if "{r" in ROW_REFERENCE_PATTERN.sub("", template):
+        return None
+    return render
+
+
+class _RowFormulaParser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take_operator(self, operators):
+        token = self._peek()
+        if token is not None and token[0] == "op" and token[1] in operators:
+            self.position += 1
+            return token[1]
+        return None
+
+    def parse(self):
+        node = self._expression()
+        if self._peek() is not None:
+            raise ValueError("Unexpected token in formula.")
+        return node
+
+    def _expression(self):
+        node = self._term()
+        while True:
+            op = self._take_operator("+-")
+            if op is None:
+                return node
+            node = (op, node, self._term())
+
+    def _term(self):
+        node = self._power()
+        while True:
+            op = self._take_operator("*/")
+            if op is None:
+                return node
+            node = (op, node, self._power())
+
+    def _power(self):
+        node = self._unary()
+        while self._take_operator("^"):
+            node = ("^", node, self._unary())
+        return node
+
+    def _unary(self):
+        op = self._take_operator("+-")
+        if op == "-":
+            return ("neg", self._unary())
+        if op == "+":
+            return self._unary()
+        return self._primary()
+
+    def _primary(self):
+        token = self._peek()
+        if token is None:
+            raise ValueError("Formula ends unexpectedly.")
+        self.position += 1
+        if token[0] in ("num", "ref"):
+            return token
+        if token[1] == "(":
+            node = self._expression()
+            if not self._take_operator(")"):
+                raise ValueError("Unbalanced parentheses in formula.")
+            return node
+        raise ValueError("Unexpected operator in formula.")
+
+
+def parse_row_formula(template):
+    text = str(template).rstrip()
+    if not text.startswith("="):
+        return None
+    tokens = []
+    pos = 1
+    while pos < len(text):
+        match = FORMULA_TOKEN_PATTERN.match(text, pos)
+        if match is None:
+            return None
+        number, column, previous, operator = match.groups()
+        if number is not None:
+            tokens.append(("num", float(number)))
+        elif column is not None:
+            tokens.append(("ref", excel_col_to_index(column), -1 if previous else 0))
+        else:
+            tokens.append(("op", operator))
+        pos = match.end()
+    if not tokens:
+        return None
+    try:
+        return _RowFormulaParser(tokens).parse()
+    except ValueError:
+        return None
+
+
+def _evaluate_row_formula(node, operand, row_count):
+    kind = node[0]
+    if kind == "num":
+        return np.full(row_count, node[1]), np.zeros(row_count, dtype=np.int8)
+    if kind == "ref":
+        return operand(node[1], node[2])
+    if kind == "neg":
+        values, codes = _evaluate_row_formula(node[1], operand, row_count)
+        return -values, codes
+    left, left_codes = _evaluate_row_formula(node[1], operand, row_count)
+    right, right_codes = _evaluate_row_formula(node[2], operand, row_count)
+    codes = np.where(left_codes != FORMULA_VALUE_OK, left_codes, right_codes)
+    with np.errstate(all="ignore"):
+        if kind == "+":
+            values = left + right
+        elif kind == "-":
+            values = left - right
+        elif kind == "*":
+            values = left * right
+        elif kind == "/":
+            values = left / right
+            codes = np.where((codes == FORMULA_VALUE_OK) & (right == 0), FORMULA_VALUE_DIV0, codes)
+        else:
+            values = np.power(left, right)
+            codes = np.where((codes == FORMULA_VALUE_OK) & (left == 0) & (right < 0), FORMULA_VALUE_DIV0, codes)
+            codes = np.where((codes == FORMULA_VALUE_OK) & (left == 0) & (right == 0), FORMULA_VALUE_NUM, codes)
+    codes = np.where((codes == FORMULA_VALUE_OK) & ~np.isfinite(values), FORMULA_VALUE_NUM, codes)
+    return values, codes.astype(np.int8)
+
+
+def _label_header_rows(label_keys, max_col):
+    presets = {item["key"]: item for item in CUSTOM_LABEL_PRESETS}
+    header_row_1 = [""] * max_col
+    header_row_2 = [""] * max_col
+    for idx, key in label_keys.items():
+        preset = presets.get(key)
+        if preset and 0 <= idx < max_col:
+            header_row_1[idx] = preset["row1"]
+            header_row_2[idx] = preset["row2"]
+    return header_row_1, header_row_2
+
+
+def _layout_frame(columns, row_count, layout):
+    frame = pd.DataFrame(
+        {target: series.reset_index(drop=True) for target, series in columns.items()},
+        index=pd.RangeIndex(row_count)
+    )
+    frame.attrs.update(layout)
+    return frame
+
+
+def build_builtin_format_frame(df_filtered, xml_type, progress_callback=None):
+    spec = BUILTIN_FORMAT_SPECS[xml_type]
+    max_col = spec["max_col"]
+    df_source = df_filtered.iloc[:, 1:1 + spec["source_cols"]]
+    steps = len(spec["mapping"])
+    columns = {}
+    for done, (source, target) in enumerate(spec["mapping"].items(), start=1):
+        columns[target] = df_source.iloc[:, source]
+        if callable(progress_callback):
+            progress_callback(done, steps)
+    header_row_1, header_row_2 = _label_header_rows(spec["label_keys"], max_col)
+    return _layout_frame(columns, len(df_source), {
+        "column_count": max_col,
+        "header_row_1": header_row_1,
+        "header_row_2": header_row_2,
+        "formula_columns": [[target, template] for target, template in spec["formulas"].items()],
+        "formula_first_row": 1,
+        "formula_min_row": None,
+        "data_start_row": 3,
+    })
+
+
+def compile_custom_format_plan(format_definition):
+    columns = (format_definition or {}).get("columns", [])
+    if not isinstance(columns, list):
+        columns = []
+    max_col = max(1, len(columns))
+    presets = {item["key"]: item for item in CUSTOM_LABEL_PRESETS}
+    header_row_1 = [""] * max_col
+    header_row_2 = [""] * max_col
+    data_columns = []
+    formula_columns = []
+    for target, col_def in enumerate(columns):
+        label_key = str(col_def.get("labelKey", "")).strip()
+        if label_key.startswith("custom:"):
+            header_row_2[target] = label_key[7:].strip()
+        else:
+            preset = presets.get(label_key)
+            if preset:
+                header_row_1[target] = str(preset.get("row1", ""))
+                header_row_2[target] = str(preset.get("row2", ""))
+        col_type = str(col_def.get("type", "empty"))
+        value = str(col_def.get("value", ""))
+        if col_type == "data":
+            try:
+                source_idx = int(value)
+            except Exception:
+                source_idx = -1
+            data_columns.append((target, source_idx))
+        elif col_type == "formula":
+            formula_columns.append((target, value))
+    return {
+        "name": str((format_definition or {}).get("name", "")),
+        "column_count": len(columns),
+        "max_col": max_col,
+        "data_columns": data_columns,
+        "formula_columns": formula_columns,
+        "header_row_1": header_row_1,
+        "header_row_2": header_row_2,
+        "widths": [float(col.get("width", 14) or 14) for col in columns],
+    }
+
+
+def build_custom_format_frame(df_filtered, plan, progress_callback=None):
+    df_data = df_filtered.iloc[:, 1:]
+    source_count = df_data.shape[1]
+    steps = len(plan["data_columns"])
+    columns = {}
+    for done, (target, source_idx) in enumerate(plan["data_columns"], start=1):
+        if 0 <= source_idx < source_count:
+            columns[target] = df_data.iloc[:, source_idx]
+        if callable(progress_callback):
+            progress_callback(done, steps)
+    return _layout_frame(columns, len(df_data), {
+        "column_count": plan["max_col"],
+        "header_row_1": list(plan["header_row_1"]),
+        "header_row_2": list(plan["header_row_2"]),
+        "formula_columns": [[target, template] for target, template in plan["formula_columns"]],
+        "formula_first_row": 0,
+        "formula_min_row": 1,
+        "data_start_row": 3,
+        "custom_widths": list(plan["widths"]),
+    })
+
+
+def clamp_percent(value):
+    try:
+        return max(0, min(100, int(value)))
+    except Exception:
+        return 0
+
+
+def _emit_progress_safe(progress_callback, value):
+    if callable(progress_callback):
+        progress_callback(clamp_percent(value))
+
+
+def _raise_if_cancelled(should_cancel):
+    if callable(should_cancel) and should_cancel():
+        raise RuntimeError("Operation cancelled by user.")
+
+
+@functools.lru_cache(maxsize=None)
+def _export_worksheet_class():
+    class ExportWorksheet(xlsxwriter.worksheet.Worksheet):
+        def _prepare_formula(self, formula, expand_future_functions=False):
+            if FORMULA_CALL_PATTERN.search(formula):
+                return super()._prepare_formula(formula, expand_future_functions)
+            if formula.startswith("{"):
+                formula = formula[1:]
+            if formula.startswith("="):
+                formula = formula[1:]
+            if formula.endswith("}"):
+                formula = formula[:-1]
+            return formula
+
+    return ExportWorksheet
+
+
+class _WorkbookFormatRegistry:
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, props):
+        key = tuple(sorted(props.items()))
+        fmt = self._formats.get(key)
+        if fmt is None:
+            fmt = self.workbook.add_format(dict(props))
+            self._formats[key] = fmt
+        return fmt
+
+
+def _is_irregular_clock(value):
+    if not isinstance(value, str):
+        return False
+    try:
+        hh, mm, ss = map(int, value.strip().split(' ')[1].split(':'))
+    except Exception:
+        return False
+    return ss != 0
+
+
+def clock_off_minute_mask(clock):
+    if clock.dtype.kind == "M":
+        return clock.dt.second.fillna(0).ne(0).to_numpy(dtype=bool)
+    mask = np.zeros(len(clock), dtype=bool)
+    text = clock.astype(object).where(clock.map(type).eq(str))
+    present = np.flatnonzero(text.notna().to_numpy())
+    if not present.size:
+        return mask
+    values = text.iloc[present]
+    parsed = pd.to_datetime(values, format=ITEM_CLOCK_FORMAT, errors="coerce")
+    matched = (parsed.notna() & values.str.len().eq(ITEM_CLOCK_TEXT_LENGTH)).to_numpy()
+    mask[present[matched]] = parsed[matched].dt.second.ne(0).to_numpy()
+    mask[present[~matched]] = [_is_irregular_clock(value) for value in values[~matched]]
+    return mask
+
+
+def classify_clock_rows(clock, previous_seconds=None, interval_seconds=None):
+    row_count = len(clock)
+    off_minute = clock_off_minute_mask(clock)
+    if clock.dtype.kind == "M":
+        stamps = clock.to_numpy()
+    else:
+        text = clock.astype(object).where(clock.map(type).eq(str))
+        parsed = pd.to_datetime(text, errors="coerce", format=ITEM_CLOCK_FORMAT)
+        retry = parsed.isna() & text.notna()
+        if retry.any():
+            parsed[retry] = pd.to_datetime(text[retry], errors="coerce", format="mixed")
+        stamps = parsed.to_numpy()
+    positions = np.flatnonzero(~np.isnat(stamps))
+    seconds = stamps[positions].astype("datetime64[s]").astype(np.int64)
+    last_seconds = int(seconds[-1]) if seconds.size else previous_seconds
+    if previous_seconds is not None:
+        positions = np.concatenate(([-1], positions))
+        seconds = np.concatenate(([previous_seconds], seconds))
+    deltas = np.diff(seconds)
+    later = positions[1:]
+    positive = deltas[deltas > 0]
+    if interval_seconds:
+        interval = float(interval_seconds)
+    else:
+        interval = float(np.median(positive)) if positive.size else 0.0
+    duplicate = np.zeros(row_count, dtype=bool)
+    duplicate[later[deltas == 0]] = True
+    gap = np.zeros(row_count, dtype=bool)
+    gap[later[(deltas < 0) | ((interval > 0) & (deltas > interval * CLOCK_GAP_FACTOR))]] = True
+    return {"off_minute": off_minute, "gap": gap, "duplicate": duplicate, "interval_seconds": interval, "last_seconds": last_seconds}
+
+
+def _builtin_cell_format_props(xml_type, c, kind, highlight):
+    general = {'num_format': 'General', 'border': 1, 'align': 'right'}
+    text = {'num_format': '@', 'border': 1, 'align': 'right'}
+    num = {'num_format': '0.00', 'border': 1, 'align': 'right'}
+    colored_num = {'num_format': '0.00', 'bg_color': '#F2E6FF', 'border': 1, 'align': 'right'}
+    if xml_type == "Den":
+        if c == 1:
+            props = text
+        elif c in [3, 5, 8] and not highlight:
+            props = colored_num
+        elif kind in ("formula", "number"):
+            props = num
+        else:
+            props = text
+    else:
+        colored_cols = [3, 5, 10] if xml_type == "Globe" else [3, 5, 8]
+        last_num_col = 14 if xml_type == "Globe" else 12
+        if c in colored_cols:
+            props = num if highlight else colored_num
+        elif 3 <= c <= last_num_col:
+            props = num
+        elif c == 0:
+            props = general
+        elif c == 1:
+            props = text
+        else:
+            props = num
+    if highlight:
+        props = dict(props, bg_color='#FFFF00')
+    return props
+
+
+def _builtin_column_formats(xml_type, c, formats):
+    return {
+        kind: tuple(formats.get(_builtin_cell_format_props(xml_type, c, kind, highlight)) for highlight in (False, True))
+        for kind in ("formula", "number", "text")
+    }
+
+
+def _cell_kind(value):
+    if isinstance(value, str) and value.startswith("="):
+        return "formula"
+    if isinstance(value, (int, float)):
+        return "number"
+    return "text"
+
+
+def _write_column_runs(ws, first_row, col, values, cell_formats):
+    total = len(values)
+    start = 0
+    while start < total:
+        fmt = cell_formats[start]
+        end = start + 1
+        while end < total and cell_formats[end] is fmt:
+            end += 1
+        ws.write_column(first_row + start, col, values[start:end], fmt)
+        start = end
+
+
+def _write_array_runs(ws, first_row, col, values, cell_formats, template, render):
+    total = len(values)
+    start = 0
+    while start < total:
+        is_formula = values[start] == template
+        end = start + 1
+        while end < total and (values[end] == template) == is_formula:
+            end += 1
+        if is_formula:
+            fmt = cell_formats[start]
+            ws.write_array_formula(first_row + start, col, first_row + end - 1, col, render(first_row + start + 1, first_row + end), fmt)
+            for offset in range(start + 1, end):
+                if cell_formats[offset] is not fmt:
+                    ws.write_number(first_row + offset, col, 0, cell_formats[offset])
+        else:
+            _write_column_runs(ws, first_row + start, col, values[start:end], cell_formats[start:end])
+        start = end
+
+
+def _write_row_runs(ws, row, values, cell_formats, skip=()):
+    total = len(values)
+    start = 0
+    while start < total:
+        if start in skip:
+            start += 1
+            continue
+        fmt = cell_formats[start]
+        end = start + 1
+        while end < total and cell_formats[end] is fmt and end not in skip:
+            end += 1
+        ws.write_row(row, start, values[start:end], fmt)
+        start = end
+
+
+def _clock_cell_text(values):
+    text = np.char.replace(np.datetime_as_string(values.astype("datetime64[s]"), unit="s"), "T", " ").astype(object)
+    text[np.isnat(values)] = 0
+    return text.tolist()
+
+
+def _data_column_reader(series):
+    kind = series.dtype.kind
+    if kind == "M":
+        clock = series.to_numpy()
+        return lambda start, end: _clock_cell_text(clock[start:end])
+    if kind == "f":
+        values = series.to_numpy()
+        values = np.where(np.isfinite(values), values, 0.0)
+    elif kind in "iub":
+        values = series.to_numpy()
+    else:
+        values = series.to_numpy(dtype=object)
+        missing = pd.isna(values) | series.isin([np.inf, -np.inf]).to_numpy()
+        if missing.any():
+            values = values.copy()
+            values[missing] = 0
+    return lambda start, end: values[start:end].tolist()
+
+
+def _carried_row_formula(template, row, min_row, previous_reference):
+    def reference(match):
+        return previous_reference(match.group(1)) if match.group(2) else f"{match.group(1)}{row}"
+
+    parts = _tokenize_row_formula(ROW_REFERENCE_PATTERN.sub(reference, str(template)))
+    return _render_row_formulas(parts, _row_number_labels(row, 1, min_row))[0]
+
+
+def _formula_column_reader(template, first_row, formula_first_row, min_row, as_template=False, carry=None):
+    parts = _tokenize_row_formula(template)
+
+    def read(start, end):
+        skip = max(0, min(end, formula_first_row) - start)
+        if as_template:
+            values = [""] * skip + [template] * (end - start - skip)
+        else:
+            row_labels = _row_number_labels(first_row + start + skip, end - start - skip, min_row)
+            values = [""] * skip + _render_row_formulas(parts, row_labels).tolist()
+        if carry is not None and start + skip <= carry[0] < end:
+            values[carry[0] - start] = _carried_row_formula(template, first_row + carry[0], min_row, carry[1])
+        return values
+
+    return read
+
+
+def _sheet_column_readers(df, column_count, formula_mode=DEFAULT_FORMULA_MODE, first_row=None, formula_first_row=None, evaluator=None, carry=None):
+    readers = [lambda start, end: [""] * (end - start)] * column_count
+    array_renderers = {}
+    for position, target in enumerate(df.columns):
+        if 0 <= int(target) < column_count:
+            readers[int(target)] = _data_column_reader(df.iloc[:, position])
+    if first_row is None:
+        first_row = int(df.attrs.get("data_start_row", 3))
+    if formula_first_row is None:
+        formula_first_row = int(df.attrs.get("formula_first_row", 0))
+    min_row = df.attrs.get("formula_min_row")
+    cached_readers = {}
+    if formula_mode not in ("cached", "values"):
+        evaluator = None
+    elif evaluator is None:
+        evaluator = _SheetFormulaEvaluator(df, column_count)
+    for target, template in frame_formula_columns(df):
+        if target >= column_count:
+            continue
+        render = _range_formula_renderer(template, min_row) if formula_mode == "array" else None
+        if render is not None:
+            array_renderers[target] = (template, render)
+        readers[target] = _formula_column_reader(template, first_row, formula_first_row, min_row, as_template=render is not None, carry=carry)
+        if evaluator is not None:
+            values, codes = evaluator.column(target)
+            cached_readers[target] = _cached_formula_reader(values, codes)
+            if formula_mode == "values":
+                readers[target] = _precomputed_formula_reader(readers[target], values, codes)
+    return readers, array_renderers, cached_readers
+
+
+def frame_formula_columns(df):
+    return layout_formula_columns(df.attrs)
+
+
+def layout_formula_columns(layout):
+    formula_columns = []
+    for item in layout.get("formula_columns", []):
+        try:
+            target, template = int(item[0]), str(item[1])
+        except Exception:
+            continue
+        if target >= 0:
+            formula_columns.append((target, template))
+    return formula_columns
+
+
+class _SheetFormulaEvaluator:
+    def __init__(self, df, column_count, previous=None, row_offset=0):
+        self.row_count = len(df)
+        self.column_count = column_count
+        self.previous = previous
+        self.first_row = int(df.attrs.get("data_start_row", 3))
+        self.formula_first_row = max(0, int(df.attrs.get("formula_first_row", 0)) - row_offset)
+        self.min_row = df.attrs.get("formula_min_row")
+        self.header_rows = [df.attrs.get("header_row_1", []), df.attrs.get("header_row_2", [])]
+        self.data = {int(target): df.iloc[:, position] for position, target in enumerate(df.columns)}
+        self.formulas = {target: template for target, template in frame_formula_columns(df) if target < column_count}
+        self._results = {}
+        self._active = set()
+
+    def _blank(self):
+        return np.zeros(self.row_count), np.zeros(self.row_count, dtype=np.int8)
+
+    def _data_column(self, series):
+        kind = series.dtype.kind
+        if kind in "fiub":
+            values = series.to_numpy(dtype=np.float64)
+            return np.where(np.isfinite(values), values, 0.0), np.zeros(self.row_count, dtype=np.int8)
+        values, codes = self._blank()
+        if kind == "M":
+            codes[series.notna().to_numpy()] = FORMULA_VALUE_UNKNOWN
+            return values, codes
+        for i, value in enumerate(series.to_numpy(dtype=object)):
+            if isinstance(value, (bool, np.bool_)):
+                values[i] = float(value)
+            elif isinstance(value, (int, float, np.integer, np.floating)):
+                values[i] = float(value) if np.isfinite(value) else 0.0
+            elif value is not None and not pd.isna(value) and value != "":
+                codes[i] = FORMULA_VALUE_UNKNOWN
+        return values, codes
+
+    def column(self, col):
+        if col in self._results:
+            return self._results[col]
+        if col in self.formulas and col not in self._active:
+            self._active.add(col)
+            node = parse_row_formula(self.formulas[col])
+            if node is None:
+                values, codes = np.zeros(self.row_count), np.full(self.row_count, FORMULA_VALUE_UNKNOWN, dtype=np.int8)
+            else:
+                values, codes = _evaluate_row_formula(node, self.operand, self.row_count)
+            self._active.discard(col)
+            blank_rows = min(self.row_count, self.formula_first_row)
+            values[:blank_rows] = 0.0
+            codes[:blank_rows] = FORMULA_VALUE_OK
+        elif col in self.formulas:
+            return np.zeros(self.row_count), np.full(self.row_count, FORMULA_VALUE_UNKNOWN, dtype=np.int8)
+        elif col in self.data and col < self.column_count:
+            values, codes = self._data_column(self.data[col])
+        else:
+            values, codes = self._blank()
+        self._results[col] = (values, codes)
+        return values, codes
+
+    def _header_state(self, excel_row, col):
+        header_row = self.header_rows[excel_row - 1] if 1 <= excel_row <= len(self.header_rows) else []
+        text = header_row[col] if isinstance(header_row, list) and col < len(header_row) else ""
+        return FORMULA_VALUE_UNKNOWN if text not in ("", None) else FORMULA_VALUE_OK
+
+    def operand(self, col, offset):
+        values, codes = self.column(col)
+        rows = np.arange(self.row_count) + self.first_row + offset
+        if self.min_row is not None:
+            rows = np.maximum(rows, int(self.min_row))
+        index = rows - self.first_row
+        inside = (index >= 0) & (index < self.row_count)
+        shifted_values = np.zeros(self.row_count)
+        shifted_codes = np.zeros(self.row_count, dtype=np.int8)
+        shifted_values[inside] = values[index[inside]]
+        shifted_codes[inside] = codes[index[inside]]
+        for excel_row in np.unique(rows[~inside]).tolist():
+            if self.previous is not None and excel_row == self.first_row - 1:
+                value, code = self.previous.get(col, (0.0, FORMULA_VALUE_OK))
+                shifted_values[rows == excel_row] = value
+                shifted_codes[rows == excel_row] = code
+            else:
+                shifted_codes[rows == excel_row] = self._header_state(excel_row, col)
+        return shifted_values, shifted_codes
+
+    def last_row_state(self):
+        if not self.row_count:
+            return self.previous
+        state = dict(self.previous or {})
+        for col, (values, codes) in self._results.items():
+            state[col] = (float(values[-1]), int(codes[-1]))
+        return state
+
+
+def _cached_formula_reader(values, codes):
+    def read(start, end):
+        return [
+            value if code == FORMULA_VALUE_OK else FORMULA_ERROR_TEXT.get(code, "")
+            for value, code in zip(values[start:end].tolist(), codes[start:end].tolist())
+        ]
+
+    return read
+
+
+def _precomputed_formula_reader(formula_reader, values, codes):
+    def read(start, end):
+        formulas = formula_reader(start, end)
+        return [
+            value if code == FORMULA_VALUE_OK and formula != "" else formula
+            for formula, value, code in zip(formulas, values[start:end].tolist(), codes[start:end].tolist())
+        ]
+
+    return read
+
+
+def _frame_clock_column(df):
+    if 0 not in df.columns or any(target == 0 for target, _ in frame_formula_columns(df)):
+        return None
+    return df[0]
+
+
+def _clock_highlight_rows(df, row_count, stats, state=None):
+    clock = _frame_clock_column(df)
+    if clock is None:
+        mask = np.zeros(row_count, dtype=bool)
+    elif stats is not None:
+        state = state if state is not None else {}
+        classes = classify_clock_rows(clock, state.get("last_seconds"), state.get("interval_seconds"))
+        mask = classes["off_minute"]
+        for key, rows in (("off_minute_rows", mask), ("gap_rows", classes["gap"]), ("duplicate_rows", classes["duplicate"])):
+            stats[key] = stats.get(key, 0) + int(rows.sum())
+        stats["clock_interval_seconds"] = classes["interval_seconds"]
+        state["last_seconds"] = classes["last_seconds"]
+        state["interval_seconds"] = state.get("interval_seconds") or classes["interval_seconds"]
+    else:
+        mask = clock_off_minute_mask(clock)
+    if stats is not None:
+        stats["highlighted_rows"] = stats.get("highlighted_rows", 0) + int(mask.sum())
+    return mask.tolist()
+
+
+def _write_cached_formula_column(ws, first_row, col, values, cell_formats, cached_values):
+    for offset, (value, fmt, cached) in enumerate(zip(values, cell_formats, cached_values)):
+        if isinstance(value, str) and value.startswith("="):
+            ws.write_formula(first_row + offset, col, value, fmt, cached)
+        else:
+            ws.write(first_row + offset, col, value, fmt)
+
+
+def _write_body_blocks(ws, first_row, readers, start, end, format_for_column, progress_callback, should_cancel, progress_start, progress_end, row_order=False, array_renderers=None, cached_readers=None):
+    array_renderers = array_renderers or {}
+    cached_readers = cached_readers or {}
+    row_count = end - start
+    block_rows = max(1, row_count // 50) if row_count else 1
+    first_row -= start
+    for c, (template, render) in array_renderers.items():
+        values = readers[c](start, end)
+        _write_array_runs(ws, first_row + start, c, values, format_for_column(c, start, values), template, render)
+    for block_start in range(start, end, block_rows):
+        block_end = min(end, block_start + block_rows)
+        block_columns = [[] if c in array_renderers else read(block_start, block_end) for c, read in enumerate(readers)]
+        block_formats = [format_for_column(c, block_start, block_values) for c, block_values in enumerate(block_columns)]
+        block_cached = {c: read(block_start, block_end) for c, read in cached_readers.items()}
+        if row_order:
+            for offset, (row_values, row_formats) in enumerate(zip(zip(*block_columns), zip(*block_formats))):
+                row = first_row + block_start + offset
+                formulas = [c for c in block_cached if isinstance(row_values[c], str) and row_values[c].startswith("=")]
+                _write_row_runs(ws, row, row_values, row_formats, formulas)
+                for c in formulas:
+                    ws.write_formula(row, c, row_values[c], row_formats[c], block_cached[c][offset])
+        else:
+            for c, block_values in enumerate(block_columns):
+                if c in block_cached:
+                    _write_cached_formula_column(ws, first_row + block_start, c, block_values, block_formats[c], block_cached[c])
+                elif c not in array_renderers:
+                    _write_column_runs(ws, first_row + block_start, c, block_values, block_formats[c])
+        progress_value = progress_start + int(((block_end - start) / row_count) * (progress_end - progress_start))
+        _emit_progress_safe(progress_callback, progress_value)
+        _raise_if_cancelled(should_cancel)
+
+
+def peak_rss_bytes():
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _ProcessMemoryCounters(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = _ProcessMemoryCounters()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return int(counters.PeakWorkingSetSize)
+        except Exception:
+            pass
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def sheet_row_capacity(layout, rows_per_sheet=None):
+    capacity = EXCEL_MAX_ROWS - max(0, int(layout.get("data_start_row", 3)) - 1)
+    if rows_per_sheet:
+        capacity = min(capacity, int(rows_per_sheet))
+    return max(1, capacity)
+
+
+def workbook_part_path(save_path, part):
+    if part <= 1:
+        return save_path
+    stem, ext = os.path.splitext(save_path)
+    return f"{stem}_part{part}{ext}"
+
+
+def _xml_sheet_name(xml_file):
+    xml_file_name = os.path.splitext(os.path.basename(xml_file))[0]
+    return ('_'.join(xml_file_name.split('_')[:-1]) if '_' in xml_file_name else xml_file_name)[:31]
+
+
+def _continuation_sheet_name(sheet_name, number):
+    suffix = f"_{number}"
+    return f"{sheet_name[:31 - len(suffix)]}{suffix}"
+
+
+def _number_literal(value):
+    text = repr(float(value))
+    return f"({text})" if text.startswith("-") else text
+
+
+def _cell_literal(value):
+    if isinstance(value, str):
+        if value.startswith("="):
+            return "NA()"
+        return '"' + value.replace('"', '""') + '"'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _number_literal(value)
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return "0"
+
+
+class _SheetStreamWriter:
+    def __init__(self, save_path, xml_type, layout, sheet_name, formula_mode=DEFAULT_FORMULA_MODE, low_memory=False, tmpdir=None, stats=None, rows_per_sheet=None, split_workbooks=False):
+        self.save_path = save_path
+        self.xml_type = xml_type
+        self.is_builtin = str(xml_type).strip().lower() in BUILTIN_FORMAT_NAME_SET
+        self.layout = layout
+        self.column_count = int(layout.get("column_count", 0))
+        self.start_row = max(0, int(layout.get("data_start_row", 3)) - 1)
+        self.sheet_capacity = sheet_row_capacity(layout, rows_per_sheet)
+        self.sheet_name = sheet_name
+        self.split_workbooks = bool(split_workbooks)
+        self.row_order = bool(low_memory)
+        self.workbook_options = {}
+        if low_memory:
+            self.workbook_options["constant_memory"] = True
+            if tmpdir:
+                self.workbook_options["tmpdir"] = tmpdir
+        self.formula_mode = DEFAULT_FORMULA_MODE if low_memory and formula_mode == "array" else formula_mode
+        self.formula_column_set = {target for target, _ in layout_formula_columns(layout) if target < self.column_count}
+        self.formula_first_row = int(layout.get("formula_first_row", 0))
+        header_row_1 = layout.get("header_row_1", [])
+        header_row_2 = layout.get("header_row_2", [])
+        self.header_rows = [row if isinstance(row, list) else [] for row in (header_row_1, header_row_2)]
+        self.stats = stats
+        self.output_paths = []
+        self.sheet_names = []
+        self.workbook = None
+        self.ws = None
+        self.carry_reference = None
+        self.sheet_rows = 0
+        self.rows_written = 0
+        self.clock_state = {}
+        self.formula_state = None
+        self.previous_cells = []
+        self.previous_formulas = {}
+        self.highlight_rows = []
+        if stats is not None:
+            stats["formula_cells"] = 0
+            stats["formula_mode"] = self.formula_mode
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open_workbook(self):
+        if self.workbook is not None:
+            self.workbook.close()
+        path = workbook_part_path(self.save_path, len(self.output_paths) + 1)
+        self.workbook = xlsxwriter.Workbook(path, dict(self.workbook_options))
+        self.output_paths.append(path)
+        formats = _WorkbookFormatRegistry(self.workbook)
+        self.header_fmt = formats.get({'num_format': '@', 'bg_color': '#99CC00', 'font_color': 'white', 'align': 'center', 'valign': 'vcenter', 'left': 1, 'right': 1})
+        if self.is_builtin:
+            self.black_header_fmt = formats.get({'num_format': '@', 'bg_color': '#F2E6FF', 'font_color': 'black', 'align': 'center', 'valign': 'vcenter', 'left': 1, 'right': 1})
+            self.column_formats = [_builtin_column_formats(self.xml_type, c, formats) for c in range(self.column_count)]
+        else:
+            self.formula_header_fmt = formats.get({'num_format': '@', 'bg_color': '#B4C6E7', 'font_color': 'black', 'align': 'center', 'valign': 'vcenter', 'left': 1, 'right': 1})
+            self.generic_fmt = formats.get({'num_format': 'General', 'border': 1, 'align': 'right'})
+            self.formula_fmt = formats.get({'num_format': '0.00', 'bg_color': '#B4C6E7', 'border': 1, 'align': 'right'})
+            self.generic_highlight_fmt = formats.get({'num_format': 'General', 'bg_color': '#FFFF00', 'border': 1, 'align': 'right'})
+            self.formula_highlight_fmt = formats.get({'num_format': '0.00', 'bg_color': '#FFFF00', 'border': 1, 'align': 'right'})
+
+    def _start_sheet(self):
+        continuation = self.ws is not None
+        if self.workbook is None or (continuation and self.split_workbooks):
+            self._open_workbook()
+            name = self.sheet_name
+        else:
+            name = _continuation_sheet_name(self.sheet_name, len(self.sheet_names) + 1) if continuation else self.sheet_name
+        if not continuation:
+            self.carry_reference = None
+        elif self.split_workbooks:
+            self.carry_reference = self._previous_literal
+        else:
+            prefix = "'" + self.ws.get_name().replace("'", "''") + "'!"
+            last_row = self.start_row + self.sheet_capacity
+            self.carry_reference = lambda column: f"{prefix}{column}{last_row}"
+        self.ws = self.workbook.add_worksheet(name, worksheet_class=_export_worksheet_class())
+        self.sheet_names.append(name)
+        self.sheet_rows = 0
+        if self.is_builtin:
+            self._write_builtin_headers(self.ws)
+        else:
+            self._write_custom_headers(self.ws)
+
+    def _write_custom_headers(self, ws):
+        custom_widths = self.layout.get("custom_widths", None)
+        if isinstance(custom_widths, list):
+            for i, w in enumerate(custom_widths[:self.column_count]):
+                ws.set_column(i, i, float(w))
+        for r, header_row in enumerate(self.header_rows):
+            for c in range(self.column_count):
+                fmt = self.formula_header_fmt if c in self.formula_column_set else self.header_fmt
+                text = str(header_row[c]) if c < len(header_row) and header_row[c] is not None else ""
+                ws.write(r, c, text, fmt)
+
+    def _write_builtin_headers(self, ws):
+        width_spec = BUILTIN_FORMAT_SPECS.get(self.xml_type, BUILTIN_FORMAT_SPECS["Glacier"])
+        for i, w in enumerate(width_spec["widths"][:self.column_count]):
+            ws.set_column(i, i, w)
+        for col, w in width_spec["hidden_cols"].items():
+            if col < self.column_count:
+                ws.set_column(col, col, w, None, {'hidden': True})
+        for r, header_row in enumerate(self.header_rows):
+            for c in range(self.column_count):
+                text = header_row[c] if c < len(header_row) else ""
+                if self.xml_type == "Globe" and c in [3, 5, 10]:
+                    ws.write(r, c, text, self.black_header_fmt)
+                elif self.xml_type in ["Glacier", "Den","Kipshoven"] and c in [3, 5, 8]:
+                    ws.write(r, c, text, self.black_header_fmt)
+                else:
+                    ws.write(r, c, text, self.header_fmt)
+
+    def _previous_literal(self, column):
+        col = excel_col_to_index(column.replace("$", ""))
+        if col in self.previous_formulas:
+            value, code = self.previous_formulas[col]
+            if code == FORMULA_VALUE_OK:
+                return _number_literal(value)
+            return FORMULA_ERROR_TEXT.get(code, "NA()")
+        return _cell_literal(self.previous_cells[col] if col < len(self.previous_cells) else None)
+
+    def _remember_row(self, readers, evaluator, index):
+        self.previous_cells = [read(index, index + 1)[0] for read in readers]
+        self.previous_formulas = {}
+        for target in self.formula_column_set:
+            values, codes = evaluator.column(target)
+            self.previous_formulas[target] = (float(values[index]), int(codes[index]))
+
+    def _format_for_column(self, c, block_start, block_values):
+        block_highlight = self.highlight_rows[block_start:block_start + len(block_values)]
+        if not self.is_builtin:
+            precomputed = self.formula_mode == "values" and c in self.formula_column_set
+            return [
+                (self.formula_highlight_fmt if highlight else self.formula_fmt)
+                if (isinstance(val, str) and val.startswith("=")) or (precomputed and isinstance(val, float))
+                else (self.generic_highlight_fmt if highlight else self.generic_fmt)
+                for val, highlight in zip(block_values, block_highlight)
+            ]
+        kind_formats = self.column_formats[c]
+        if kind_formats["formula"] == kind_formats["number"] == kind_formats["text"]:
+            normal_fmt, highlight_fmt = kind_formats["number"]
+            return [highlight_fmt if highlight else normal_fmt for highlight in block_highlight]
+        return [kind_formats[_cell_kind(val)][highlight] for val, highlight in zip(block_values, block_highlight)]
+
+    def write_frame(self, df, progress_callback=None, should_cancel=None, progress_start=0, progress_end=100):
+        row_count = len(df)
+        frame_offset = self.rows_written
+        if self.ws is None:
+            self._start_sheet()
+        self.highlight_rows = _clock_highlight_rows(df, row_count, self.stats, self.clock_state)
+        formula_first_row = max(0, self.formula_first_row - frame_offset)
+        if self.stats is not None:
+            self.stats["formula_cells"] += len(self.formula_column_set) * max(0, row_count - formula_first_row)
+        evaluator = None
+        if self.formula_mode in ("cached", "values") or self.split_workbooks:
+            evaluator = _SheetFormulaEvaluator(df, self.column_count, self.formula_state, frame_offset)
+        progress_span = progress_end - progress_start
+        position = 0
+        while position < row_count:
+            if self.sheet_rows >= self.sheet_capacity:
+                self._start_sheet()
+            end = min(row_count, position + self.sheet_capacity - self.sheet_rows)
+            carry = (position, self.carry_reference) if self.sheet_rows == 0 and self.carry_reference is not None else None
+            first_row = self.start_row + 1 + self.sheet_rows - position
+            readers, array_renderers, cached_readers = _sheet_column_readers(df, self.column_count, self.formula_mode, first_row, formula_first_row, evaluator, carry)
+            _write_body_blocks(
+                self.ws,
+                self.start_row + self.sheet_rows,
+                readers,
+                position,
+                end,
+                self._format_for_column,
+                progress_callback,
+                should_cancel,
+                progress_start + progress_span * position // row_count,
+                progress_start + progress_span * end // row_count,
+                row_order=self.row_order,
+                array_renderers=array_renderers,
+                cached_readers=cached_readers
+            )
+            if self.split_workbooks:
+                self._remember_row(readers, evaluator, end - 1)
+            self.sheet_rows += end - position
+            self.rows_written += end - position
+            position = end
+        if evaluator is not None:
+            for target in self.formula_column_set:
+                evaluator.column(target)
+            self.formula_state = evaluator.last_row_state()
+
+    def close(self):
+        if self.ws is None:
+            self._start_sheet()
+        self.workbook.close()
+        self.workbook = None
+        if self.stats is not None:
+            self.stats["sheets"] = len(self.sheet_names)
+            if len(self.output_paths) > 1:
+                self.stats["output_paths"] = list(self.output_paths)
+
+    def output_bytes(self):
+        return sum(os.path.getsize(path) for path in self.output_paths if os.path.exists(path))
+
+
+def export_dataframe_to_excel(df, xml_type, save_path, xml_file, progress_callback=None, should_cancel=None, low_memory=False, tmpdir=None, metrics=None, formula_mode=DEFAULT_FORMULA_MODE, rows_per_sheet=None, split_workbooks=False):
+    started = time.perf_counter()
+    stats = {} if metrics is not None else None
+    _emit_progress_safe(progress_callback, 2)
+    _raise_if_cancelled(should_cancel)
+    layout = dict(df.attrs, column_count=int(df.attrs.get("column_count", df.shape[1])))
+    is_builtin = str(xml_type).strip().lower() in BUILTIN_FORMAT_NAME_SET
+    writer = _SheetStreamWriter(save_path, xml_type, layout, _xml_sheet_name(xml_file), normalize_formula_mode(formula_mode), low_memory, tmpdir, stats, rows_per_sheet, split_workbooks)
+    with writer:
+        _emit_progress_safe(progress_callback, 30)
+        _raise_if_cancelled(should_cancel)
+        writer.write_frame(df, progress_callback, should_cancel, 40 if is_builtin else 45, 95 if is_builtin else 90)
+        _emit_progress_safe(progress_callback, 98)
+    _emit_progress_safe(progress_callback, 100)
+    if metrics is not None:
+        metrics.update(stats)
+        metrics["write_seconds"] = round(time.perf_counter() - started, 4)
+        metrics["output_bytes"] = writer.output_bytes() if writer.output_paths else None
+        metrics["peak_rss_bytes"] = peak_rss_bytes()
+
+
+SPILL_KIND_NONE = 0
+SPILL_KIND_FLOAT = 1
+SPILL_KIND_INT = 2
+SPILL_KIND_BOOL = 3
+SPILL_KIND_STR = 4
+
+
+def _json_safe_name(name):
+    return name.item() if isinstance(name, np.generic) else name
+
+
+def spill_frame_to_cache(df, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    columns_meta = []
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        prefix = os.path.join(cache_dir, f"c{position}")
+        column_meta = {"name": _json_safe_name(df.columns[position]), "dtype": str(series.dtype)}
+        if series.dtype.kind in "biufM":
+            np.save(prefix + ".npy", series.to_numpy())
+            column_meta["encoding"] = "native"
+            columns_meta.append(column_meta)
+            continue
+        values = series.tolist()
+        kinds = np.zeros(len(values), dtype=np.uint8)
+        numbers = np.zeros(len(values), dtype=np.float64)
+        integers = np.zeros(len(values), dtype=np.int64)
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        texts = []
+        text_length = 0
+        for i, value in enumerate(values):
+            if isinstance(value, str):
+                kinds[i] = SPILL_KIND_STR
+                texts.append(value)
+                text_length += len(value)
+            elif isinstance(value, bool):
+                kinds[i] = SPILL_KIND_BOOL
+                integers[i] = int(value)
+            elif isinstance(value, (int, np.integer)):
+                kinds[i] = SPILL_KIND_INT
+                integers[i] = int(value)
+            elif isinstance(value, (float, np.floating)):
+                kinds[i] = SPILL_KIND_FLOAT
+                numbers[i] = float(value)
+            elif value is not None and not pd.isna(value):
+                kinds[i] = SPILL_KIND_STR
+                texts.append(str(value))
+                text_length += len(texts[-1])
+            offsets[i + 1] = text_length
+        np.save(prefix + "_kind.npy", kinds)
+        np.save(prefix + "_offsets.npy", offsets)
+        if (kinds == SPILL_KIND_FLOAT).any():
+            np.save(prefix + "_float.npy", numbers)
+        if ((kinds == SPILL_KIND_INT) | (kinds == SPILL_KIND_BOOL)).any():
+            np.save(prefix + "_int.npy", integers)
+        with open(prefix + "_text.txt", "w", encoding="utf-8", newline="") as f:
+            f.write("".join(texts))
+        column_meta["encoding"] = "mixed"
+        columns_meta.append(column_meta)
+    meta = {"rows": int(len(df)), "columns": columns_meta, "attrs": copy.deepcopy(df.attrs)}
+    with open(os.path.join(cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return cache_dir
+
+
+def _load_mixed_cache_column(prefix, row_count):
+    kinds = np.load(prefix + "_kind.npy", mmap_mode="r")
+    values = np.full(row_count, None, dtype=object)
+    float_mask = kinds == SPILL_KIND_FLOAT
+    if float_mask.any():
+        values[float_mask] = np.load(prefix + "_float.npy", mmap_mode="r")[float_mask].tolist()
+    int_mask = kinds == SPILL_KIND_INT
+    bool_mask = kinds == SPILL_KIND_BOOL
+    if int_mask.any() or bool_mask.any():
+        integers = np.load(prefix + "_int.npy", mmap_mode="r")
+        values[int_mask] = integers[int_mask].tolist()
+        values[bool_mask] = integers[bool_mask].astype(bool).tolist()
+    str_positions = np.flatnonzero(kinds == SPILL_KIND_STR)
+    if len(str_positions):
+        offsets = np.load(prefix + "_offsets.npy", mmap_mode="r")
+        with open(prefix + "_text.txt", "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        starts = offsets[str_positions].tolist()
+        ends = offsets[str_positions + 1].tolist()
+        values[str_positions] = [text[start:end] for start, end in zip(starts, ends)]
+    return values
+
+
+def load_cached_frame(cache_dir):
+    with open(os.path.join(cache_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    row_count = int(meta["rows"])
+    data = {}
+    for position, column_meta in enumerate(meta["columns"]):
+        prefix = os.path.join(cache_dir, f"c{position}")
+        if column_meta["encoding"] == "native":
+            data[position] = pd.Series(np.load(prefix + ".npy", mmap_mode="r"), copy=False)
+        else:
+            values = _load_mixed_cache_column(prefix, row_count)
+            dtype = object if column_meta["dtype"] == "object" else column_meta["dtype"]
+            data[position] = pd.Series(values, dtype=dtype)
+    frame = pd.DataFrame(data)
+    frame.columns = [column_meta["name"] for column_meta in meta["columns"]]
+    frame.attrs.update(meta.get("attrs", {}))
+    return frame
+
+
+def format_definition_hash(xml_type, format_definition=None, formula_mode=DEFAULT_FORMULA_MODE, options=None):
+    if xml_type in BUILTIN_FORMAT_SPECS:
+        payload = {"builtin": xml_type, "spec": BUILTIN_FORMAT_SPECS[xml_type]}
+    else:
+        payload = {"custom": xml_type, "definition": format_definition}
+    payload["version"] = RESULT_CACHE_VERSION
+    payload["formula_mode"] = normalize_formula_mode(formula_mode)
+    payload["options"] = options or {}
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, cache_dir, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+
+    def key_for(self, xml_file, format_hash):
+        encoded = json.dumps([list(file_fingerprint(xml_file)), format_hash]).encode("utf-8")
+        return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + ".xlsx", base + ".json"
+
+    def fetch(self, key, target_path):
+        output_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            shutil.copyfile(output_path, target_path)
+            now = time.time()
+            os.utime(output_path, (now, now))
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) else {}
+
+    def store(self, key, output_path, meta=None):
+        if not self.max_bytes:
+            return False
+        cached_path, meta_path = self._paths(key)
+        try:
+            if os.path.getsize(output_path) > self.max_bytes:
+                return False
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta or {}, f, default=str)
+            staging_path = cached_path + ".tmp"
+            shutil.copyfile(output_path, staging_path)
+            os.replace(staging_path, cached_path)
+        except OSError:
+            return False
+        self.evict()
+        return True
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".xlsx"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, max_bytes=None):
+        limit = self.max_bytes if max_bytes is None else max(0, int(max_bytes))
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                for stale in (path, path[:-len(".xlsx")] + ".json"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                total -= size
+
+    def clear(self):
+        self.evict(0)
+
+
+def default_batch_worker_count():
+    return max(1, min(4, (os.cpu_count() or 1) - 1))
+
+
+class ConversionError(Exception):
+    pass
+
+
+def _row_progress_callback(progress_callback, start, end):
+    def emit_row_progress(current, total):
+        if total <= 0:
+            _emit_progress_safe(progress_callback, end)
+            return
+        clamped_current = max(0, min(total, int(current)))
+        span = max(0, int(end) - int(start))
+        _emit_progress_safe(progress_callback, int(start) + int((clamped_current / total) * span))
+
+    return emit_row_progress if callable(progress_callback) else None
+
+
+def convert_xml_file(xml_file, xml_type, format_definition=None, format_plan=None, progress_callback=None, should_cancel=None, metrics=None, cache=None):
+    _emit_progress_safe(progress_callback, 5)
+    started = time.perf_counter()
+    try:
+        df_filtered = read_filtered_items(xml_file, should_stop=should_cancel, cache=cache, metrics=metrics)
+    except RuntimeError as e:
+        if str(e) == "Operation cancelled by user.":
+            raise
+        raise ConversionError(f"Error reading XML {xml_file}: {e}") from e
+    except Exception as e:
+        raise ConversionError(f"Error reading XML {xml_file}: {e}") from e
+    parsed = time.perf_counter()
+    _emit_progress_safe(progress_callback, 15)
+    is_builtin = xml_type in BUILTIN_FORMAT_NAMES
+    if not is_builtin and not format_definition:
+        raise ConversionError(f"Format '{xml_type}' is not implemented.")
+    row_progress = _row_progress_callback(progress_callback, 20, 84)
+    try:
+        if df_filtered.empty:
+            raise ConversionError(f"No valid rows found in {xml_type} XML.")
+        if is_builtin:
+            final_df = build_builtin_format_frame(df_filtered, xml_type, progress_callback=row_progress)
+        else:
+            plan = format_plan if format_plan is not None else compile_custom_format_plan(format_definition)
+            if not plan["column_count"]:
+                raise ConversionError(f"Format '{xml_type}' has no columns.")
+            final_df = build_custom_format_frame(df_filtered, plan, progress_callback=row_progress)
+    except ConversionError:
+        raise
+    except Exception as e:
+        raise ConversionError(f"{xml_type} processing error: {e}") from e
+    if metrics is not None:
+        metrics.update({
+            "xml_file": xml_file,
+            "xml_type": xml_type,
+            "parse_seconds": round(parsed - started, 4),
+            "build_seconds": round(time.perf_counter() - parsed, 4),
+            "rows": len(df_filtered),
+            "columns": int(final_df.attrs.get("column_count", final_df.shape[1])),
+            "peak_rss_bytes": peak_rss_bytes(),
+        })
+    _emit_progress_safe(progress_callback, 85)
+    return final_df
+
+
+def convert_xml_file_chunked(xml_file, xml_type, save_path, format_definition=None, format_plan=None, chunk_rows=CONVERSION_CHUNK_ROWS, rows_per_sheet=None, split_workbooks=False, formula_mode=DEFAULT_FORMULA_MODE, tmpdir=None, progress_callback=None, should_cancel=None, metrics=None):
+    _emit_progress_safe(progress_callback, 2)
+    if xml_type in BUILTIN_FORMAT_NAMES:
+        build_frame = lambda items: build_builtin_format_frame(items, xml_type)
+    else:
+        if not format_definition:
+            raise ConversionError(f"Format '{xml_type}' is not implemented.")
+        plan = format_plan if format_plan is not None else compile_custom_format_plan(format_definition)
+        if not plan["column_count"]:
+            raise ConversionError(f"Format '{xml_type}' has no columns.")
+        build_frame = lambda items: build_custom_format_frame(items, plan)
+    stats = {} if metrics is not None else None
+    seconds = {"parse": 0.0, "build": 0.0, "write": 0.0}
+    rows = 0
+    writer = None
+    started = time.perf_counter()
+    try:
+        schema = scan_item_schema(xml_file, chunk_rows=chunk_rows, should_stop=should_cancel, progress_callback=progress_callback, progress_start=2, progress_end=20)
+    except Exception as e:
+        raise ConversionError(f"Error reading XML {xml_file}: {e}") from e
+    _raise_if_cancelled(should_cancel)
+    seconds["parse"] += time.perf_counter() - started
+    keys = schema["keys"]
+    text_names = [name for name, kind in schema["registers"].items() if kind == "text"]
+    try:
+        with open(xml_file, "rb") as source:
+            total_bytes = max(1, os.fstat(source.fileno()).st_size)
+            chunks = iter_xml_item_chunks(source, chunk_rows=chunk_rows, should_stop=should_cancel)
+            while True:
+                started = time.perf_counter()
+                try:
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        items = apply_item_schema(filter_item_rows(parse_item_columns(chunk.reindex(columns=keys), text_names)), schema)
+                except Exception as e:
+                    raise ConversionError(f"Error reading XML {xml_file}: {e}") from e
+                parsed = time.perf_counter()
+                seconds["parse"] += parsed - started
+                if chunk is None:
+                    break
+                if items.empty:
+                    continue
+                try:
+                    frame = build_frame(items)
+                except Exception as e:
+                    raise ConversionError(f"{xml_type} processing error: {e}") from e
+                built = time.perf_counter()
+                seconds["build"] += built - parsed
+                if writer is None:
+                    writer = _SheetStreamWriter(save_path, xml_type, frame.attrs, _xml_sheet_name(xml_file), normalize_formula_mode(formula_mode), True, tmpdir, stats, rows_per_sheet, split_workbooks)
+                writer.write_frame(frame, should_cancel=should_cancel)
+                rows += len(frame)
+                seconds["write"] += time.perf_counter() - built
+                _emit_progress_safe(progress_callback, 20 + 75 * source.tell() // total_bytes)
+            _raise_if_cancelled(should_cancel)
+    finally:
+        if writer is not None:
+            writer.close()
+    if not keys:
+        raise ConversionError(f"Error reading XML {xml_file}: xpath does not return any Items nodes.")
+    if writer is None:
+        raise ConversionError(f"No valid rows found in {xml_type} XML.")
+    if metrics is not None:
+        metrics.update(stats)
+        metrics.update({
+            "xml_file": xml_file,
+            "xml_type": xml_type,
+            "parse_seconds": round(seconds["parse"], 4),
+            "build_seconds": round(seconds["build"], 4),
+            "write_seconds": round(seconds["write"], 4),
+            "rows": rows,
+            "columns": writer.column_count,
+            "chunk_rows": int(chunk_rows),
+            "output_bytes": writer.output_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+        })
+    _emit_progress_safe(progress_callback, 100)
+    return writer.output_paths
+
+
+def convert_xml_file_task(xml_file, xml_type, format_definition=None, format_plan=None):
+    metrics = {}
+    try:
+        final_df = convert_xml_file(xml_file, xml_type, format_definition, format_plan, metrics=metrics)
+    except ConversionError as e:
+        return {"status": "Failed", "xml_file": xml_file, "error": str(e)}
+    return {"status": "Done", "xml_file": xml_file, "xml_type": xml_type, "df": final_df, "metrics": metrics}
+
+
+def convert_and_export_task(xml_file, xml_type, format_definition, format_plan, staging_path, low_memory=False, tmpdir=None, formula_mode=DEFAULT_FORMULA_MODE, chunk_rows=0, rows_per_sheet=None, split_workbooks=False):
+    if chunk_rows:
+        metrics = {}
+        try:
+            output_paths = convert_xml_file_chunked(xml_file, xml_type, staging_path, format_definition, format_plan, chunk_rows, rows_per_sheet, split_workbooks, formula_mode, tmpdir, metrics=metrics)
+        except ConversionError as e:
+            return {"status": "Failed", "xml_file": xml_file, "error": str(e)}
+        except Exception as e:
+            return {"status": "Failed", "xml_file": xml_file, "error": f"Failed to save Excel: {e}"}
+        result = {"status": "Done", "xml_file": xml_file, "xml_type": xml_type, "metrics": metrics, "stagedPath": staging_path}
+        if len(output_paths) > 1:
+            result["outputPaths"] = output_paths
+        return result
+    result = convert_xml_file_task(xml_file, xml_type, format_definition, format_plan)
+    if result["status"] != "Done":
+        return result
+    try:
+        export_dataframe_to_excel(result.pop("df"), xml_type, staging_path, xml_file, low_memory=low_memory, tmpdir=tmpdir, metrics=result["metrics"], formula_mode=formula_mode, rows_per_sheet=rows_per_sheet, split_workbooks=split_workbooks)
+    except Exception as e:
+        return {"status": "Failed", "xml_file": xml_file, "error": f"Failed to save Excel: {e}"}
+    result["stagedPath"] = staging_path
+    output_paths = result["metrics"].get("output_paths")
+    if output_paths:
+        result["outputPaths"] = output_paths
+    return result
+
+
+def convert_and_spill_task(xml_file, xml_type, format_definition, format_plan, cache_path):
+    result = convert_xml_file_task(xml_file, xml_type, format_definition, format_plan)
+    if result["status"] != "Done":
+        return result
+    try:
+        spill_frame_to_cache(result.pop("df"), cache_path)
+    except Exception as e:
+        return {"status": "Failed", "xml_file": xml_file, "error": f"Failed to cache converted data: {e}"}
+    result["cachePath"] = cache_path
+    return result
+
+
+def move_staged_output(staged_path, save_path):
+    if os.path.normcase(os.path.abspath(staged_path)) == os.path.normcase(os.path.abspath(save_path)):
+        return
+    if not os.path.exists(staged_path):
+        raise FileNotFoundError(f"Converted output is no longer available: {staged_path}")
+    if os.path.exists(save_path):
+        os.remove(save_path)
+    shutil.move(staged_path, save_path)
+
+
+def move_staged_output_task(index, staged_path, save_path):
+    try:
+        move_staged_output(staged_path, save_path)
+    except PermissionError as e:
+        return {"status": "PermissionDenied", "index": index, "savePath": save_path, "error": str(e)}
+    except Exception as e:
+        return {"status": "Failed", "index": index, "savePath": save_path, "error": str(e)}
+    return {"status": "Done", "index": index, "savePath": save_path}
+
+
+def export_batch_output_task(index, df, xml_type, save_path, xml_file, low_memory=False, tmpdir=None, progress_queue=None, cancel_event=None, cache_path=None, formula_mode=DEFAULT_FORMULA_MODE):
+    def progress_callback(value):
+        if progress_queue is not None:
+            progress_queue.put((index, clamp_percent(value)))
+
+    should_cancel = cancel_event.is_set if cancel_event is not None else None
+    metrics = {"xml_file": xml_file}
+    try:
+        if df is None:
+            df = load_cached_frame(cache_path)
+        export_dataframe_to_excel(
+            df,
+            xml_type,
+            save_path,
+            xml_file,
+            progress_callback=progress_callback,
+            should_cancel=should_cancel,
+            low_memory=low_memory,
+            tmpdir=tmpdir,
+            metrics=metrics,
+            formula_mode=formula_mode
+        )
+    except PermissionError as e:
+        return {"status": "PermissionDenied", "index": index, "savePath": save_path, "error": str(e)}
+    except RuntimeError as e:
+        if str(e) == "Operation cancelled by user.":
+            return {"status": "Cancelled", "index": index, "savePath": save_path}
+        return {"status": "Failed", "index": index, "savePath": save_path, "error": str(e)}
+    except Exception as e:
+        return {"status": "Failed", "index": index, "savePath": save_path, "error": str(e)}
+    return {"status": "Done", "index": index, "savePath": save_path, "metrics": metrics}
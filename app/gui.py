@@ -0,0 +1,3349 @@
+import time
+_STARTUP_T0 = time.perf_counter()
+import sys
+import os
+import json
+import copy
+import tempfile
+import shutil
+import threading
+import logging
+import multiprocessing
+from logging.handlers import RotatingFileHandler
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from conversion import (
+    BUILTIN_FORMAT_NAMES,
+    BUILTIN_FORMAT_NAME_SET,
+    BUILTIN_FORMAT_SPECS,
+    CUSTOM_LABEL_PRESETS,
+    DEFAULT_FORMULA_MODE,
+    FORMULA_MODES,
+    RESOURCE_BASE_DIR,
+    ConversionError,
+    PARSE_CACHE,
+    clamp_percent,
+    build_default_batch_output_path,
+    collect_xml_files_from_paths,
+    compile_custom_format_plan,
+    convert_and_export_task,
+    convert_and_spill_task,
+    convert_xml_file,
+    convert_xml_file_chunked,
+    convert_xml_file_task,
+    default_batch_worker_count,
+    default_formats_dir,
+    documents_dir,
+    ensure_xlsx_extension,
+    excel_col_to_index,
+    export_batch_output_task,
+    export_dataframe_to_excel,
+    index_to_excel_col,
+    lazy_module,
+    load_cached_frame,
+    move_staged_output,
+    move_staged_output_task,
+    normalize_formula_mode,
+    normalize_path,
+    read_xml_items_head,
+    user_data_dir,
+    user_data_dir_candidates,
+    RESULT_CACHE_MAX_BYTES,
+    ResultCache,
+    format_definition_hash,
+    warm_up_engine,
+)
+from PyQt6.QtCore import QObject, pyqtSlot, pyqtProperty, QUrl, pyqtSignal, QThread, Qt, QSettings, QTimer, QEventLoop
+from PyQt6.QtWidgets import QApplication, QFileDialog, QMessageBox
+from PyQt6.QtQml import QQmlApplicationEngine
+from PyQt6.QtGui import QIcon, QFontDatabase, QFont
+
+os.environ.setdefault("QT_QUICK_CONTROLS_STYLE", "Basic")
+os.environ.setdefault("QT_QUICK_CONTROLS_FALLBACK_STYLE", "Basic")
+os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.fonts.warning=false")
+
+pd = lazy_module("pandas")
+STARTUP_TIMINGS = {"imports": round((time.perf_counter() - _STARTUP_T0) * 1000, 1)}
+STARTUP_TIMING_LOG_LIMIT = 200
+METRICS_LOG_MAX_BYTES = 1024 * 1024
+XML_PREVIEW_MAX_COLUMNS = 12
+PATH_SCAN_RECENT_LIMIT = 5
+METRICS_LOG_BACKUP_COUNT = 3
+
+def _preferred_formats_dir():
+    return os.path.join(user_data_dir_candidates()[0], "formats")
+
+def _metrics_logger():
+    logger = logging.getLogger("cubeflow.metrics")
+    if not logger.handlers:
+        log_dir = os.path.join(user_data_dir(), "logs")
+        os.makedirs(log_dir, exist_ok=True)
+        handler = RotatingFileHandler(
+            os.path.join(log_dir, "conversion_metrics.jsonl"),
+            maxBytes=METRICS_LOG_MAX_BYTES,
+            backupCount=METRICS_LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+def _format_bytes(value):
+    if value is None:
+        return "n/a"
+    if value < 1024 * 1024:
+        return f"{value / 1024:.1f} KB"
+    return f"{value / (1024 * 1024):.1f} MB"
+
+def format_conversion_metrics_summary(entries):
+    if not entries:
+        return ""
+    def total(key):
+        return sum(entry.get(key) or 0 for entry in entries)
+    peaks = [entry["peak_rss_bytes"] for entry in entries if entry.get("peak_rss_bytes")]
+    lines = []
+    if len(entries) > 1:
+        lines.append(f"{len(entries)} files")
+    lines.append(f"Parse {total('parse_seconds'):.2f}s · Build {total('build_seconds'):.2f}s · Write {total('write_seconds'):.2f}s")
+    columns = max(entry.get("columns") or 0 for entry in entries)
+    lines.append(
+        f"{total('rows'):,} rows × {columns} columns · {total('formula_cells'):,} formula cells · "
+        f"{total('highlighted_rows'):,} highlighted rows"
+    )
+    if any((entry.get("sheets") or 1) > 1 for entry in entries):
+        lines.append(f"Split across {sum(entry.get('sheets') or 1 for entry in entries):,} sheets")
+    if any(total(key) for key in ("gap_rows", "duplicate_rows")):
+        lines.append(
+            f"Clock: {total('off_minute_rows'):,} off-minute · {total('gap_rows'):,} gaps · "
+            f"{total('duplicate_rows'):,} duplicate timestamps"
+        )
+    lines.append(f"Peak memory {_format_bytes(max(peaks) if peaks else None)} · Output {_format_bytes(total('output_bytes'))}")
+    return "\n".join(lines)
+
+def normalize_batch_output_name(file_name):
+    raw_name = (file_name or "").strip()
+    if not raw_name:
+        return ""
+    if raw_name.lower().endswith(".xlsx"):
+        raw_name = raw_name[:-5]
+    elif raw_name.lower().endswith(".xls"):
+        raw_name = raw_name[:-4]
+    raw_name = raw_name.strip()
+    if not raw_name:
+        return ""
+    return f"{raw_name}.xlsx"
+
+def get_invalid_batch_name_message(file_name):
+    raw_name = (file_name or "").strip()
+    if raw_name.lower().endswith(".xlsx"):
+        raw_name = raw_name[:-5]
+    elif raw_name.lower().endswith(".xls"):
+        raw_name = raw_name[:-4]
+    base_name = raw_name.strip()
+    if not base_name:
+        return "File name cannot be empty."
+    invalid_chars = '<>:"/\\|?*'
+    bad = sorted(set(ch for ch in base_name if ch in invalid_chars or ord(ch) < 32))
+    if bad:
+        return (
+            f"Invalid character(s): {' '.join(bad)}. "
+            "Use letters, numbers, spaces, '-', '_', '(', ')', '.'.\n"
+            "Not allowed: < > : \" / \\ | ? *"
+        )
+    if base_name.endswith(".") or base_name.endswith(" "):
+        return "File name cannot end with a dot or space."
+    return ""
+
+def get_invalid_output_directory_message(directory):
+    folder = (directory or "").strip()
+    if not folder:
+        return "Save folder cannot be empty."
+    if not os.path.exists(folder):
+        return "Save folder does not exist."
+    if not os.path.isdir(folder):
+        return "Save path is not a folder."
+    if not os.access(folder, os.W_OK):
+        return "Save folder is not writable."
+    return ""
+
+
+class Worker(QObject):
+    progress = pyqtSignal(int)
+    error = pyqtSignal(str)
+    dataReady = pyqtSignal(object, str, str)
+    metricsReady = pyqtSignal(object)
+
+    def __init__(self, xml_files, xml_type, format_definition=None, format_plan=None):
+        super().__init__()
+        self.xml_files = xml_files
+        self.xml_type = xml_type
+        self.format_definition = format_definition
+        self.format_plan = format_plan
+        self.current_file_index = 0
+        self.cancel_requested = False
+        self._last_progress = -1
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    def _emit_progress(self, value):
+        safe_value = clamp_percent(value)
+        if safe_value != self._last_progress:
+            self._last_progress = safe_value
+            self.progress.emit(safe_value)
+
+    @pyqtSlot()
+    def process(self):
+        while self.current_file_index < len(self.xml_files):
+            if self.cancel_requested:
+                self.error.emit("Operation cancelled by user.")
+                return
+            xml_file = self.xml_files[self.current_file_index]
+            metrics = {}
+            try:
+                final_df = convert_xml_file(
+                    xml_file,
+                    self.xml_type,
+                    self.format_definition,
+                    self.format_plan,
+                    progress_callback=self._emit_progress,
+                    should_cancel=lambda: self.cancel_requested,
+                    metrics=metrics,
+                    cache=PARSE_CACHE
+                )
+            except ConversionError as e:
+                self.error.emit(str(e))
+            except RuntimeError as e:
+                if str(e) == "Operation cancelled by user.":
+                    self.error.emit("Operation cancelled by user.")
+                    return
+                self.error.emit(f"An unexpected error occurred for {xml_file}: {e}")
+            except Exception as e:
+                self.error.emit(f"An unexpected error occurred for {xml_file}: {e}")
+            else:
+                self.metricsReady.emit(metrics)
+                self.dataReady.emit(final_df, self.xml_type, xml_file)
+                return
+            self.current_file_index += 1
+
+
+class BatchConvertWorker(QObject):
+    fileStarted = pyqtSignal(int)
+    fileFinished = pyqtSignal(int, object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, xml_files, xml_type, format_definition=None, format_plan=None, max_workers=None, stage_dir=None, low_memory=False, tmpdir=None, cache_dir=None, result_cache=None, reuse_dir=None, formula_mode=DEFAULT_FORMULA_MODE, chunk_rows=0):
+        super().__init__()
+        self.xml_files = list(xml_files)
+        self.xml_type = xml_type
+        self.format_definition = format_definition
+        self.format_plan = format_plan
+        self.max_workers = max(1, int(max_workers or default_batch_worker_count()))
+        self.stage_dir = stage_dir
+        self.cache_dir = cache_dir
+        self.low_memory = low_memory
+        self.tmpdir = tmpdir
+        self.formula_mode = formula_mode
+        self.chunk_rows = max(0, int(chunk_rows or 0))
+        self.result_cache = result_cache if reuse_dir else None
+        self.reuse_dir = reuse_dir
+        self.format_hash = format_definition_hash(xml_type, format_definition, formula_mode, {"low_memory": bool(low_memory), "chunk_rows": self.chunk_rows}) if self.result_cache else None
+        self.cancel_requested = False
+
+    def _lookup_result_cache(self, index, xml_file):
+        if self.result_cache is None:
+            return None, None
+        try:
+            key = self.result_cache.key_for(xml_file, self.format_hash)
+        except OSError:
+            return None, None
+        staging_path = os.path.join(self.reuse_dir, f"{index:05d}_cached.xlsx")
+        meta = self.result_cache.fetch(key, staging_path)
+        if meta is None:
+            return None, key
+        metrics = dict(meta.get("metrics") or {}, xml_file=xml_file, result_cache_hit=True)
+        return {
+            "status": "Done",
+            "xml_file": xml_file,
+            "xml_type": self.xml_type,
+            "stagedPath": staging_path,
+            "resultKey": key,
+            "resultCacheHit": True,
+            "metrics": metrics
+        }, key
+
+    def _submit(self, pool, index, xml_file):
+        if self.stage_dir:
+            staging_path = os.path.join(self.stage_dir, f"{index:05d}.xlsx")
+            return pool.submit(
+                convert_and_export_task,
+                xml_file,
+                self.xml_type,
+                self.format_definition,
+                self.format_plan,
+                staging_path,
+                self.low_memory,
+                self.tmpdir,
+                self.formula_mode,
+                self.chunk_rows
+            )
+        if self.cache_dir:
+            cache_path = os.path.join(self.cache_dir, f"{index:05d}")
+            return pool.submit(convert_and_spill_task, xml_file, self.xml_type, self.format_definition, self.format_plan, cache_path)
+        return pool.submit(convert_xml_file_task, xml_file, self.xml_type, self.format_definition, self.format_plan)
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    @pyqtSlot()
+    def process(self):
+        pool = None
+        lookups = None
+        try:
+            if self.result_cache is not None:
+                lookups = ThreadPoolExecutor(max_workers=self.max_workers)
+            pending = list(enumerate(self.xml_files))
+            looking = {}
+            running = {}
+            while pending or looking or running:
+                if self.cancel_requested:
+                    self.error.emit("Operation cancelled by user.")
+                    return
+                while pending and len(looking) + len(running) < self.max_workers and not self.cancel_requested:
+                    index, xml_file = pending.pop(0)
+                    self.fileStarted.emit(index)
+                    if lookups is not None:
+                        looking[lookups.submit(self._lookup_result_cache, index, xml_file)] = (index, xml_file)
+                        continue
+                    if pool is None:
+                        pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+                    running[self._submit(pool, index, xml_file)] = (index, xml_file, None)
+                if not (looking or running):
+                    continue
+                done, _ = wait(list(looking) + list(running), timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in looking:
+                        index, xml_file = looking.pop(future)
+                        cached, key = future.result()
+                        if cached is not None:
+                            if not self.cancel_requested:
+                                self.fileFinished.emit(index, cached)
+                            continue
+                        if pool is None:
+                            pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+                        running[self._submit(pool, index, xml_file)] = (index, xml_file, key)
+                        continue
+                    index, xml_file, key = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"status": "Failed", "xml_file": xml_file, "error": f"An unexpected error occurred for {xml_file}: {e}"}
+                    if self.cancel_requested:
+                        continue
+                    if key and result.get("status") == "Done":
+                        result["resultKey"] = key
+                        result["resultOptions"] = (self.formula_mode, bool(self.low_memory))
+                    self.fileFinished.emit(index, result)
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(f"Batch conversion failed: {e}")
+        finally:
+            if lookups is not None:
+                lookups.shutdown(wait=not self.cancel_requested, cancel_futures=True)
+            if pool is not None:
+                pool.shutdown(wait=not self.cancel_requested, cancel_futures=True)
+
+
+class FormatLoadWorker(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    @pyqtSlot()
+    def process(self):
+        try:
+            self.finished.emit(self.loader())
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class PathDiscoveryWorker(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    batchFound = pyqtSignal(object, int)
+
+    def __init__(self, paths, include=None, exclude=None, max_depth=None):
+        super().__init__()
+        self.paths = [normalize_path(p) for p in paths if normalize_path(p)]
+        self.include = include
+        self.exclude = exclude
+        self.max_depth = max_depth
+        self.cancel_requested = False
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    @pyqtSlot()
+    def process(self):
+        try:
+            xml_paths = collect_xml_files_from_paths(
+                self.paths,
+                should_stop=lambda: self.cancel_requested,
+                include=self.include,
+                exclude=self.exclude,
+                max_depth=self.max_depth,
+                on_batch=self.batchFound.emit
+            )
+            if self.cancel_requested:
+                self.error.emit("Operation cancelled by user.")
+                return
+            self.finished.emit(xml_paths)
+        except Exception as e:
+            self.error.emit(f"Failed to scan dropped paths: {e}")
+
+class XmlPreviewWorker(QObject):
+    finished = pyqtSignal(int, object)
+    error = pyqtSignal(int, str)
+
+    def __init__(self, request_id, source_file, rows_limit):
+        super().__init__()
+        self.request_id = request_id
+        self.source_file = source_file
+        self.rows_limit = rows_limit
+        self.cancel_requested = False
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    @pyqtSlot()
+    def process(self):
+        file_name = os.path.basename(self.source_file)
+        try:
+            df_filtered = read_xml_items_head(self.source_file, self.rows_limit, should_stop=lambda: self.cancel_requested)
+            if df_filtered.empty:
+                self.finished.emit(self.request_id, ([], [], f"No valid rows found in {file_name}."))
+                return
+            df_data = df_filtered.iloc[:, 1:] if df_filtered.shape[1] > 1 else df_filtered
+            max_cols = min(XML_PREVIEW_MAX_COLUMNS, df_data.shape[1])
+            if max_cols <= 0:
+                self.finished.emit(self.request_id, ([], [], f"No previewable columns in {file_name}."))
+                return
+            headers = [{"index": i, "name": str(df_data.columns[i])} for i in range(max_cols)]
+            rows = []
+            for r in range(min(self.rows_limit, len(df_data))):
+                row_vals = []
+                for c in range(max_cols):
+                    val = df_data.iloc[r, c]
+                    row_vals.append("" if pd.isna(val) else str(val))
+                rows.append(row_vals)
+            self.finished.emit(self.request_id, (headers, rows, f"Previewing {file_name}"))
+        except RuntimeError as e:
+            if str(e) == "Operation cancelled by user.":
+                self.error.emit(self.request_id, "Operation cancelled by user.")
+                return
+            self.error.emit(self.request_id, f"Preview failed: {e}")
+        except Exception as e:
+            self.error.emit(self.request_id, f"Preview failed: {e}")
+
+
+class SaveWorker(QObject):
+    progress = pyqtSignal(int)
+    error = pyqtSignal(str)
+    saved = pyqtSignal(str, str)
+    metricsReady = pyqtSignal(object)
+
+    def __init__(self, df, xml_type, save_path, xml_file, low_memory=False, tmpdir=None, formula_mode=DEFAULT_FORMULA_MODE, format_definition=None, format_plan=None, chunk_rows=0):
+        super().__init__()
+        self.df = df
+        self.xml_type = xml_type
+        self.save_path = save_path
+        self.xml_file = xml_file
+        self.low_memory = low_memory
+        self.tmpdir = tmpdir
+        self.formula_mode = formula_mode
+        self.format_definition = format_definition
+        self.format_plan = format_plan
+        self.chunk_rows = max(0, int(chunk_rows or 0))
+        self.cancel_requested = False
+        self._last_stage_progress = -1
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    def _emit_save_stage_progress(self, export_progress):
+        safe_export = clamp_percent(export_progress)
+        stage_start = 0 if self.df is None else 86
+        stage_progress = stage_start + int((safe_export / 100) * (100 - stage_start))
+        if stage_progress != self._last_stage_progress:
+            self._last_stage_progress = stage_progress
+            self.progress.emit(stage_progress)
+
+    @pyqtSlot()
+    def save(self):
+        try:
+            if self.cancel_requested:
+                self.error.emit("Operation cancelled by user.")
+                return
+            self._emit_save_stage_progress(0)
+            metrics = {"xml_file": self.xml_file}
+            if self.df is None:
+                convert_xml_file_chunked(
+                    self.xml_file,
+                    self.xml_type,
+                    self.save_path,
+                    self.format_definition,
+                    self.format_plan,
+                    chunk_rows=self.chunk_rows,
+                    formula_mode=self.formula_mode,
+                    tmpdir=self.tmpdir,
+                    progress_callback=self._emit_save_stage_progress,
+                    should_cancel=lambda: self.cancel_requested,
+                    metrics=metrics
+                )
+            else:
+                export_dataframe_to_excel(
+                    self.df,
+                    self.xml_type,
+                    self.save_path,
+                    self.xml_file,
+                    progress_callback=self._emit_save_stage_progress,
+                    should_cancel=lambda: self.cancel_requested,
+                    low_memory=self.low_memory,
+                    tmpdir=self.tmpdir,
+                    metrics=metrics,
+                    formula_mode=self.formula_mode
+                )
+            if self.cancel_requested:
+                self.error.emit("Operation cancelled by user.")
+                return
+            self.progress.emit(100)
+            self.metricsReady.emit(metrics)
+            self.saved.emit(self.save_path, self.xml_file)
+        except RuntimeError as e:
+            if str(e) == "Operation cancelled by user.":
+                self.error.emit("Operation cancelled by user.")
+                return
+            self.error.emit(f"Failed to save Excel: {e}")
+        except PermissionError as e:
+            self.error.emit(f"PERMISSION_DENIED::{self.save_path}::{e}")
+        except Exception as e:
+            self.error.emit(f"Failed to save Excel: {e}")
+            
+
+
+class BatchSaveWorker(QObject):
+    progress = pyqtSignal(int)
+    error = pyqtSignal(str)
+    finished = pyqtSignal(object)
+    saveCountUpdated = pyqtSignal(int)
+    metricsReady = pyqtSignal(object)
+
+    def __init__(self, batch_results, batch_outputs, low_memory=False, tmpdir=None, max_workers=1, result_cache=None, formula_mode=DEFAULT_FORMULA_MODE):
+        super().__init__()
+        self.batch_results = batch_results
+        self.batch_outputs = [dict(item) for item in batch_outputs]
+        self.low_memory = low_memory
+        self.tmpdir = tmpdir
+        self.formula_mode = formula_mode
+        self.max_workers = max(1, int(max_workers or 1))
+        self.result_cache = result_cache
+        self.cancel_requested = False
+        self._last_progress = -1
+
+    @pyqtSlot()
+    def request_cancel(self):
+        self.cancel_requested = True
+
+    def _emit_progress(self, value):
+        safe_value = clamp_percent(value)
+        if safe_value != self._last_progress:
+            self._last_progress = safe_value
+            self.progress.emit(safe_value)
+
+    def _save_path_for(self, index):
+        output = self.batch_outputs[index]
+        return os.path.join(output["saveDir"], ensure_xlsx_extension(output["fileName"]))
+
+    def _mark_saved(self, index, save_path):
+        self.batch_outputs[index]["savePath"] = save_path
+        self.batch_outputs[index]["fileName"] = os.path.basename(save_path)
+        result = self.batch_results[index]
+        if "stagedPath" not in result and result.get("resultOptions") != (self.formula_mode, bool(self.low_memory)):
+            return
+        if self.result_cache is not None and result.get("resultKey") and not result.get("resultCacheHit"):
+            self.result_cache.store(
+                result["resultKey"],
+                save_path,
+                {"xml_file": result["xml_file"], "xml_type": result["xml_type"], "metrics": result.get("metrics")}
+            )
+
+    def _save_all_parallel(self):
+        total = len(self.batch_results)
+        context = multiprocessing.get_context("spawn")
+        manager = context.Manager()
+        pool = ProcessPoolExecutor(max_workers=min(self.max_workers, total), mp_context=context)
+        progress_queue = manager.Queue()
+        cancel_event = manager.Event()
+        file_progress = [0] * total
+        pending = list(range(total))
+        running = {}
+        saved_count = 0
+        failure = None
+        try:
+            while pending or running:
+                if self.cancel_requested and not cancel_event.is_set():
+                    cancel_event.set()
+                    pending = []
+                while pending and len(running) < self.max_workers and not cancel_event.is_set():
+                    i = pending.pop(0)
+                    result = self.batch_results[i]
+                    if "stagedPath" in result:
+                        running[pool.submit(move_staged_output_task, i, result["stagedPath"], self._save_path_for(i))] = i
+                        continue
+                    future = pool.submit(
+                        export_batch_output_task,
+                        i,
+                        result.get("df"),
+                        result["xml_type"],
+                        self._save_path_for(i),
+                        result["xml_file"],
+                        self.low_memory,
+                        self.tmpdir,
+                        progress_queue,
+                        cancel_event,
+                        result.get("cachePath"),
+                        self.formula_mode
+                    )
+                    running[future] = i
+                if not running:
+                    break
+                done, _ = wait(list(running), timeout=0.1, return_when=FIRST_COMPLETED)
+                while not progress_queue.empty():
+                    i, value = progress_queue.get_nowait()
+                    file_progress[i] = max(file_progress[i], value)
+                for future in done:
+                    i = running.pop(future)
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = {"status": "Failed", "index": i, "savePath": self._save_path_for(i), "error": str(e)}
+                    if outcome["status"] == "Done":
+                        file_progress[i] = 100
+                        if "stagedPath" in self.batch_results[i]:
+                            self.batch_results[i]["stagedPath"] = outcome["savePath"]
+                        self.metricsReady.emit(outcome.get("metrics"))
+                        self._mark_saved(i, outcome["savePath"])
+                        saved_count += 1
+                        self.saveCountUpdated.emit(saved_count)
+                    elif outcome["status"] != "Cancelled" and failure is None:
+                        failure = outcome
+                        cancel_event.set()
+                        pending = []
+                self._emit_progress(int(sum(file_progress) / total))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            manager.shutdown()
+
+        if failure is not None:
+            if failure["status"] == "PermissionDenied":
+                self.error.emit(f"BATCH_PERMISSION_DENIED::{failure['index']}::{failure['savePath']}::{failure['error']}")
+            else:
+                self.error.emit(f"Failed to save batch files: {failure['error']}")
+            return
+        if self.cancel_requested:
+            self.error.emit("Operation cancelled by user.")
+            return
+        self.finished.emit(self.batch_outputs)
+
+    @pyqtSlot()
+    def save_all(self):
+        try:
+            total = len(self.batch_results)
+            if total == 0:
+                self.finished.emit(self.batch_outputs)
+                return
+            if self.max_workers > 1 and total > 1 and any("stagedPath" not in result for result in self.batch_results):
+                self._save_all_parallel()
+                return
+
+            for i, result in enumerate(self.batch_results):
+                if self.cancel_requested:
+                    self.error.emit("Operation cancelled by user.")
+                    return
+                save_path = self._save_path_for(i)
+                try:
+                    def file_progress_callback(file_progress, file_index=i, total_files=total):
+                        overall = int(((file_index + (clamp_percent(file_progress) / 100.0)) / total_files) * 100)
+                        self._emit_progress(overall)
+
+                    if "stagedPath" in result:
+                        move_staged_output(result["stagedPath"], save_path)
+                        result["stagedPath"] = save_path
+                    else:
+                        df = result["df"] if "df" in result else load_cached_frame(result["cachePath"])
+                        metrics = {"xml_file": result["xml_file"]}
+                        export_dataframe_to_excel(
+                            df,
+                            result["xml_type"],
+                            save_path,
+                            result["xml_file"],
+                            progress_callback=file_progress_callback,
+                            should_cancel=lambda: self.cancel_requested,
+                            low_memory=self.low_memory,
+                            tmpdir=self.tmpdir,
+                            metrics=metrics,
+                            formula_mode=self.formula_mode
+                        )
+                        self.metricsReady.emit(metrics)
+                except PermissionError as e:
+                    self.error.emit(f"BATCH_PERMISSION_DENIED::{i}::{save_path}::{e}")
+                    return
+                except RuntimeError as e:
+                    if str(e) == "Operation cancelled by user.":
+                        self.error.emit("Operation cancelled by user.")
+                        return
+                    self.error.emit(f"Failed to save batch files: {e}")
+                    return
+                self._mark_saved(i, save_path)
+                self.saveCountUpdated.emit(i + 1)
+                self._emit_progress(int(((i + 1) / total) * 100))
+
+            self.finished.emit(self.batch_outputs)
+        except Exception as e:
+            self.error.emit(f"Failed to save batch files: {e}")
+
+
+class Backend(QObject):
+    progressUpdated = pyqtSignal(int)
+    formatModelChanged = pyqtSignal()
+    formatDesignerStatusChanged = pyqtSignal()
+    xmlTypeOptionsChanged = pyqtSignal()
+    formatSavePathChanged = pyqtSignal()
+    xmlPreviewChanged = pyqtSignal()
+    formatImportNotice = pyqtSignal(str)
+    inAppConfirmRequested = pyqtSignal(int, str, str)
+    inAppNotice = pyqtSignal(str)
+    exportSettingsChanged = pyqtSignal()
+    engineWarmed = pyqtSignal()
+    conversionMetricsChanged = pyqtSignal()
+    pathScanChanged = pyqtSignal()
+
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        self.root = None
+        self.selected_file = None
+        self.selected_files = []
+        self.xml_type = ""
+        self.progress = 0
+        self.is_batch = False
+        self.current_batch_index = 0
+        self.progressUpdated.connect(self.updateProgressInQML)
+        self.thread = None
+        self.worker = None
+        self.save_thread = None
+        self.save_worker = None
+        self.batch_save_thread = None
+        self.batch_save_worker = None
+        self.path_scan_thread = None
+        self.path_scan_worker = None
+        self.preview_thread = None
+        self.preview_worker = None
+        self.path_scan_active = False
+        self.path_scan_found_count = 0
+        self.path_scan_recent_paths = []
+        self.xml_preview_loading = False
+        self._preview_request_id = 0
+        self.batch_convert_thread = None
+        self.batch_convert_worker = None
+        self._batch_result_slots = {}
+        self._batch_stage_dir = None
+        self._pending_file_metrics = {}
+        self.conversion_metrics = []
+        self.batch_results = []
+        self.batch_outputs = []
+        self.batch_file_statuses = []
+        self.cancel_requested = False
+        self.formats_dir = _preferred_formats_dir()
+        self.formats_path = os.path.join(self.formats_dir, "format_model.json")
+        self.format_save_path = self.formats_path
+        self.custom_label_options = self._custom_label_presets()
+        self._format_plan_cache = {}
+        self.format_model = self._default_formats()
+        self.formats_loaded = False
+        self._open_designer_when_loaded = False
+        self.format_load_thread = None
+        self.format_load_worker = None
+        self.startup_timings = dict(STARTUP_TIMINGS)
+        self._startup_timings_written = False
+        self.xml_type_options = []
+        self.format_designer_status = ""
+        self.xml_preview_headers = []
+        self.xml_preview_rows = []
+        self.xml_preview_status = ""
+        self.preview_selected_file = ""
+        self._format_edit_snapshot = None
+        self._format_edit_active = False
+        self._last_save_payload = None
+        self._confirm_token = 0
+        self._confirm_response = False
+        self._confirm_loop = None
+        self.settings = QSettings("CubeFlow", "CubeFlow")
+        self.last_open_dir = str(self.settings.value("lastOpenDir", "", str))
+        self.last_save_dir = str(self.settings.value("lastSaveDir", "", str))
+        self.last_batch_dir = str(self.settings.value("lastBatchDir", "", str))
+        self.xml_type = str(self.settings.value("lastXmlType", "", str))
+        self.low_memory_export = bool(self.settings.value("lowMemoryExport", False, bool))
+        self.formula_mode = normalize_formula_mode(self.settings.value("formulaMode", DEFAULT_FORMULA_MODE, str))
+        self.export_temp_dir = str(self.settings.value("exportTempDir", "", str)).strip()
+        self.batch_worker_count = max(1, int(self.settings.value("batchWorkers", default_batch_worker_count(), int)))
+        self.fused_batch_save = bool(self.settings.value("fusedBatchSave", False, bool))
+        self.chunk_rows = max(0, int(self.settings.value("chunkRows", 0, int)))
+        self.spill_batch_results = bool(self.settings.value("spillBatchResults", False, bool))
+        self.result_cache_enabled = bool(self.settings.value("resultCacheEnabled", False, bool))
+        self.result_cache_megabytes = max(0, int(self.settings.value("resultCacheMegabytes", RESULT_CACHE_MAX_BYTES // (1024 * 1024), int)))
+        self.result_cache = None
+        self.scan_include_globs = str(self.settings.value("scanIncludeGlobs", "", str)).strip()
+        self.scan_exclude_globs = str(self.settings.value("scanExcludeGlobs", "", str)).strip()
+        self.scan_max_depth = int(self.settings.value("scanMaxDepth", -1, int))
+        saved_format_path = str(self.settings.value("formatSavePath", "", str)).strip()
+        if saved_format_path and "AppData\\Local\\CubeFlow\\formats\\format_model.json" in saved_format_path:
+            self.settings.remove("formatSavePath")
+        self.format_save_path = self.formats_path
+        self._refresh_xml_type_options(emit_signal=False)
+        self.engineWarmed.connect(self.handleEngineWarmed)
+
+    @pyqtProperty('QVariantList', notify=formatModelChanged)
+    def formatModel(self):
+        return self.format_model
+
+    @pyqtProperty(str, notify=formatDesignerStatusChanged)
+    def formatDesignerStatus(self):
+        return self.format_designer_status
+
+    @pyqtProperty('QVariantList', notify=xmlTypeOptionsChanged)
+    def xmlTypeOptions(self):
+        return self.xml_type_options
+
+    @pyqtProperty('QVariantList', notify=formatModelChanged)
+    def customLabelOptions(self):
+        return self.custom_label_options
+
+    @pyqtProperty(str, notify=formatSavePathChanged)
+    def formatSavePath(self):
+        return self.format_save_path
+
+    @pyqtProperty(bool, notify=exportSettingsChanged)
+    def lowMemoryExport(self):
+        return self.low_memory_export
+
+    @pyqtProperty(str, notify=exportSettingsChanged)
+    def formulaMode(self):
+        return self.formula_mode
+
+    @pyqtProperty('QVariantList', notify=exportSettingsChanged)
+    def formulaModeOptions(self):
+        return list(FORMULA_MODES)
+
+    @pyqtProperty(int, notify=exportSettingsChanged)
+    def batchWorkerCount(self):
+        return self.batch_worker_count
+
+    @pyqtProperty(bool, notify=exportSettingsChanged)
+    def fusedBatchSave(self):
+        return self.fused_batch_save
+
+    @pyqtProperty(int, notify=exportSettingsChanged)
+    def chunkRows(self):
+        return self.chunk_rows
+
+    @pyqtProperty(bool, notify=exportSettingsChanged)
+    def spillBatchResults(self):
+        return self.spill_batch_results
+
+    @pyqtProperty(bool, notify=exportSettingsChanged)
+    def resultCacheEnabled(self):
+        return self.result_cache_enabled
+
+    @pyqtProperty(int, notify=exportSettingsChanged)
+    def resultCacheMegabytes(self):
+        return self.result_cache_megabytes
+
+    @pyqtProperty(str, notify=exportSettingsChanged)
+    def scanIncludeGlobs(self):
+        return self.scan_include_globs
+
+    @pyqtProperty(str, notify=exportSettingsChanged)
+    def scanExcludeGlobs(self):
+        return self.scan_exclude_globs
+
+    @pyqtProperty(int, notify=exportSettingsChanged)
+    def scanMaxDepth(self):
+        return self.scan_max_depth
+
+    @pyqtProperty(bool, notify=pathScanChanged)
+    def pathScanActive(self):
+        return self.path_scan_active
+
+    @pyqtProperty(int, notify=pathScanChanged)
+    def pathScanFoundCount(self):
+        return self.path_scan_found_count
+
+    @pyqtProperty('QVariantList', notify=pathScanChanged)
+    def pathScanRecentPaths(self):
+        return self.path_scan_recent_paths
+
+    @pyqtProperty('QVariantList', notify=conversionMetricsChanged)
+    def conversionMetrics(self):
+        return self.conversion_metrics
+
+    @pyqtProperty(str, notify=conversionMetricsChanged)
+    def conversionMetricsSummary(self):
+        return format_conversion_metrics_summary(self.conversion_metrics)
+
+    @pyqtProperty('QVariantList', notify=xmlPreviewChanged)
+    def xmlPreviewHeaders(self):
+        return self.xml_preview_headers
+
+    @pyqtProperty('QVariantList', notify=xmlPreviewChanged)
+    def xmlPreviewRows(self):
+        return self.xml_preview_rows
+
+    @pyqtProperty(str, notify=xmlPreviewChanged)
+    def xmlPreviewStatus(self):
+        return self.xml_preview_status
+
+    @pyqtProperty(bool, notify=xmlPreviewChanged)
+    def xmlPreviewLoading(self):
+        return self.xml_preview_loading
+
+    def _set_format_designer_status(self, status):
+        self.format_designer_status = status
+        self.formatDesignerStatusChanged.emit()
+
+    @pyqtSlot(object)
+    def handleFileMetrics(self, metrics):
+        if not isinstance(metrics, dict) or not metrics.get("xml_file"):
+            return
+        self._pending_file_metrics.setdefault(metrics["xml_file"], {}).update(metrics)
+
+    def _publish_conversion_metrics(self):
+        entries = list(self._pending_file_metrics.values())
+        self._pending_file_metrics = {}
+        self.conversion_metrics = entries
+        self.conversionMetricsChanged.emit()
+        if not entries:
+            return
+        try:
+            logger = _metrics_logger()
+            timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+            for entry in entries:
+                logger.info(json.dumps(dict(entry, timestamp=timestamp)))
+        except Exception:
+            pass
+
+    def _clear_conversion_metrics(self):
+        self._pending_file_metrics = {}
+        if self.conversion_metrics:
+            self.conversion_metrics = []
+            self.conversionMetricsChanged.emit()
+
+    def _set_xml_preview(self, headers=None, rows=None, status="", loading=False):
+        self.xml_preview_headers = headers if isinstance(headers, list) else []
+        self.xml_preview_rows = rows if isinstance(rows, list) else []
+        self.xml_preview_status = str(status or "")
+        self.xml_preview_loading = bool(loading)
+        self.xmlPreviewChanged.emit()
+
+    def _preview_source_file(self):
+        if self.preview_selected_file and os.path.exists(self.preview_selected_file):
+            return self.preview_selected_file
+        if self.selected_file and os.path.exists(self.selected_file):
+            return self.selected_file
+        if self.selected_files:
+            first = self.selected_files[0]
+            if first and os.path.exists(first):
+                return first
+        return ""
+
+    def _default_columns(self, formula):
+        return [
+            {"col": "A", "type": "data", "value": "0", "width": 17, "labelKey": ""},
+            {"col": "B", "type": "data", "value": "1", "width": 17, "labelKey": ""},
+            {"col": "C", "type": "data", "value": "2", "width": 14, "labelKey": ""},
+            {"col": "D", "type": "formula", "value": formula, "width": 14, "labelKey": ""},
+        ]
+
+    def _build_columns_from_spec(self, max_col, mapping, formulas, widths, label_keys=None):
+        target_to_source = {target: source for source, target in mapping.items()}
+        label_keys = label_keys if isinstance(label_keys, dict) else {}
+        columns = []
+        for idx in range(max_col):
+            if idx in formulas:
+                col_type = "formula"
+                value = formulas[idx]
+            elif idx in target_to_source:
+                col_type = "data"
+                value = str(target_to_source[idx])
+            else:
+                col_type = "empty"
+                value = ""
+            width = widths[idx] if idx < len(widths) else 14
+            columns.append({
+                "col": index_to_excel_col(idx),
+                "type": col_type,
+                "value": value,
+                "width": width,
+                "labelKey": str(label_keys.get(idx, "")),
+            })
+        return columns
+
+    def _custom_label_presets(self):
+        return [dict(item) for item in CUSTOM_LABEL_PRESETS]
+
+    def _label_presets_map(self):
+        return {item.get("key", ""): item for item in self.custom_label_options if isinstance(item, dict)}
+
+    def _default_formats(self):
+        return [
+            {
+                "name": name,
+                "columns": self._build_columns_from_spec(
+                    spec["max_col"], spec["mapping"], spec["formulas"], spec["widths"], spec["label_keys"]
+                ),
+            }
+            for name, spec in BUILTIN_FORMAT_SPECS.items()
+        ]
+
+    def _builtin_default_columns_map(self):
+        mapping = {}
+        for fmt in self._default_formats():
+            name = str(fmt.get("name", "")).strip().lower()
+            cols = fmt.get("columns", [])
+            if name and isinstance(cols, list):
+                mapping[name] = cols
+        return mapping
+
+    def _apply_builtin_label_defaults(self, name, columns):
+        if not isinstance(columns, list):
+            return columns
+        default_map = self._builtin_default_columns_map()
+        builtin_cols = default_map.get(str(name or "").strip().lower())
+        if not isinstance(builtin_cols, list):
+            return columns
+        for i, col in enumerate(columns):
+            if not isinstance(col, dict):
+                continue
+            existing = str(col.get("labelKey", "")).strip()
+            if existing:
+                continue
+            if i < len(builtin_cols) and isinstance(builtin_cols[i], dict):
+                default_key = str(builtin_cols[i].get("labelKey", "")).strip()
+                if default_key:
+                    col["labelKey"] = default_key
+        return columns
+
+    def _normalize_loaded_formats(self, raw_formats):
+        normalized = []
+        if isinstance(raw_formats, dict):
+            raw_formats = [raw_formats]
+        if not isinstance(raw_formats, list):
+            return normalized
+        for item in raw_formats:
+            if not isinstance(item, dict):
+                continue
+            name = str(item.get("name", "")).strip()
+            if not name:
+                continue
+            raw_columns = item.get("columns", [])
+            columns = []
+            if isinstance(raw_columns, list):
+                for col in raw_columns:
+                    if not isinstance(col, dict):
+                        continue
+                    row_type = self._sanitize_format_type(col.get("type", "data"))
+                    columns.append({
+                        "col": self._normalize_column_label(col.get("col", "A")),
+                        "type": row_type,
+                        "value": self._sanitize_format_value(row_type, col.get("value", "")),
+                        "width": self._sanitize_format_width(col.get("width", 14)),
+                        "labelKey": self._sanitize_label_key(col.get("labelKey", ""), row_type),
+                    })
+            if not columns:
+                columns = self._default_columns("=C{r}*280")
+            columns = self._apply_builtin_label_defaults(name, columns)
+            normalized.append({"name": name, "columns": columns})
+        return normalized
+
+    def _merge_format_entries(self, base_formats, extra_formats):
+        merged = []
+        seen = set()
+        for fmt in base_formats:
+            name = str((fmt or {}).get("name", "")).strip()
+            if not name:
+                continue
+            key = name.lower()
+            if key in seen:
+                continue
+            merged.append(fmt)
+            seen.add(key)
+        for fmt in extra_formats:
+            name = str((fmt or {}).get("name", "")).strip()
+            if not name:
+                continue
+            key = name.lower()
+            if key in seen:
+                continue
+            merged.append(fmt)
+            seen.add(key)
+        return merged
+
+    def _load_sidecar_formats(self, formats_dir):
+        extras = []
+        try:
+            if not os.path.isdir(formats_dir):
+                return extras
+            for entry in os.listdir(formats_dir):
+                if not entry.lower().endswith(".json"):
+                    continue
+                if entry.lower() == "format_model.json":
+                    continue
+                path = os.path.join(formats_dir, entry)
+                if not os.path.isfile(path):
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as fp:
+                        loaded = json.load(fp)
+                    parsed = self._normalize_loaded_formats(loaded)
+                    if parsed:
+                        extras.extend(parsed)
+                except Exception:
+                    continue
+        except Exception:
+            return extras
+        return extras
+
+    def _read_startup_formats(self):
+        formats_dir = default_formats_dir()
+        storage_dir = formats_dir
+        for candidate in self._format_storage_candidates(formats_dir):
+            if self._probe_writable_dir(candidate):
+                storage_dir = candidate
+                break
+        os.makedirs(storage_dir, exist_ok=True)
+        switched = os.path.normcase(os.path.normpath(storage_dir)) != os.path.normcase(os.path.normpath(formats_dir))
+        return storage_dir, switched, self._read_formats_from(storage_dir)
+
+    def _read_formats_from(self, formats_dir):
+        formats_path = os.path.join(formats_dir, "format_model.json")
+        bundled_formats = []
+        stored_formats = []
+        if os.path.exists(formats_path):
+            try:
+                with open(formats_path, "r", encoding="utf-8") as fp:
+                    loaded = json.load(fp)
+                parsed = self._normalize_loaded_formats(loaded)
+                if parsed:
+                    stored_formats = parsed
+            except Exception:
+                pass
+        if not stored_formats:
+            bundled_formats_path = os.path.join(RESOURCE_BASE_DIR, "formats", "format_model.json")
+            if os.path.exists(bundled_formats_path):
+                try:
+                    with open(bundled_formats_path, "r", encoding="utf-8") as fp:
+                        loaded = json.load(fp)
+                    parsed = self._normalize_loaded_formats(loaded)
+                    if parsed:
+                        bundled_formats = parsed
+                except Exception:
+                    pass
+        builtin_formats = self._default_formats()
+        persisted_formats = stored_formats if stored_formats else bundled_formats
+        merged = self._merge_format_entries(builtin_formats, persisted_formats)
+        sidecars = self._load_sidecar_formats(formats_dir)
+        return self._merge_format_entries(merged, sidecars)
+
+    def startFormatLoading(self):
+        self._stop_thread("format_load_thread", "format_load_worker")
+        self.format_load_thread = QThread()
+        self.format_load_worker = FormatLoadWorker(self._read_startup_formats)
+        self.format_load_worker.moveToThread(self.format_load_thread)
+        self.format_load_worker.finished.connect(self.handleFormatsLoaded)
+        self.format_load_worker.error.connect(self.handleFormatLoadError)
+        self.format_load_thread.started.connect(self.format_load_worker.process)
+        self.format_load_thread.start()
+
+    @pyqtSlot(object)
+    def handleFormatsLoaded(self, result):
+        self._stop_thread("format_load_thread", "format_load_worker")
+        formats_dir, switched, formats = result
+        if os.path.normcase(os.path.normpath(formats_dir)) != os.path.normcase(os.path.normpath(self.formats_dir)):
+            self.formats_dir = formats_dir
+            self.formats_path = os.path.join(self.formats_dir, "format_model.json")
+            self.format_save_path = self.formats_path
+            self.formatSavePathChanged.emit()
+        if switched:
+            self._set_format_designer_status(f"Switched format storage to writable path: {self.formats_path}")
+        self.format_model = formats
+        self.formats_loaded = True
+        self._invalidate_format_plan()
+        self._refresh_xml_type_options()
+        self.formatModelChanged.emit()
+        self.applyRememberedSettingsToUI()
+        self.recordStartupTiming("formats_loaded")
+        self._open_queued_format_designer()
+
+    def handleFormatLoadError(self, msg):
+        self._stop_thread("format_load_thread", "format_load_worker")
+        self.formats_loaded = True
+        self._set_format_designer_status(f"Failed to load saved formats: {msg}")
+        self.recordStartupTiming("formats_loaded")
+        self._open_queued_format_designer()
+
+    def _open_queued_format_designer(self):
+        if self._open_designer_when_loaded:
+            self._open_designer_when_loaded = False
+            if self.format_designer_status == "Loading saved formats...":
+                self._set_format_designer_status("")
+            self.openFormatDesigner()
+
+    def _custom_formats_pending(self):
+        if self.formats_loaded or self.xml_type in BUILTIN_FORMAT_NAMES:
+            return False
+        QMessageBox.information(None, "Info", "Saved formats are still loading. Please try again in a moment.")
+        return True
+
+    def startEngineWarmUp(self):
+        threading.Thread(target=self._warm_up_engine, daemon=True).start()
+
+    def _warm_up_engine(self):
+        try:
+            warm_up_engine()
+        except Exception:
+            pass
+        self.engineWarmed.emit()
+
+    @pyqtSlot()
+    def handleEngineWarmed(self):
+        self.recordStartupTiming("engine_warm")
+
+    @pyqtSlot()
+    def handleFirstFrame(self):
+        if self.root:
+            try:
+                self.root.frameSwapped.disconnect(self.handleFirstFrame)
+            except TypeError:
+                pass
+        if "first_frame" not in self.startup_timings:
+            self.recordStartupTiming("first_frame")
+
+    def recordStartupTiming(self, name):
+        self.startup_timings[name] = round((time.perf_counter() - _STARTUP_T0) * 1000, 1)
+        if self._startup_timings_written:
+            return
+        if all(key in self.startup_timings for key in ("first_frame", "formats_loaded", "engine_warm")):
+            self._startup_timings_written = True
+            self._write_startup_timings()
+
+    def _write_startup_timings(self):
+        try:
+            log_dir = os.path.join(os.path.dirname(self.formats_dir), "logs")
+            os.makedirs(log_dir, exist_ok=True)
+            log_path = os.path.join(log_dir, "startup_timings.jsonl")
+            lines = []
+            if os.path.exists(log_path):
+                with open(log_path, "r", encoding="utf-8") as fp:
+                    lines = [line for line in fp.read().splitlines() if line.strip()]
+            entry = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "timings_ms": self.startup_timings}
+            lines.append(json.dumps(entry))
+            with open(log_path, "w", encoding="utf-8") as fp:
+                fp.write("\n".join(lines[-STARTUP_TIMING_LOG_LIMIT:]) + "\n")
+        except Exception:
+            pass
+
+    def _refresh_xml_type_options(self, emit_signal=True):
+        self.xml_type_options = [fmt.get("name", "") for fmt in self.format_model if fmt.get("name", "")]
+        if emit_signal:
+            self.xmlTypeOptionsChanged.emit()
+
+    def _format_plan_for(self, fmt):
+        if not fmt or self._is_builtin_format_name(fmt.get("name", "")):
+            return None
+        key = str(fmt.get("name", "")).strip().lower()
+        plan = self._format_plan_cache.get(key)
+        if plan is None:
+            plan = compile_custom_format_plan(fmt)
+            self._format_plan_cache[key] = plan
+        return plan
+
+    def _invalidate_format_plan(self, format_index=None):
+        if format_index is None or format_index < 0 or format_index >= len(self.format_model):
+            self._format_plan_cache.clear()
+            return
+        key = str(self.format_model[format_index].get("name", "")).strip().lower()
+        self._format_plan_cache.pop(key, None)
+
+    def _unique_format_name(self, base_name, skip_index=None):
+        raw = (base_name or "").strip()
+        if not raw:
+            raw = "New Format"
+        existing = {
+            self.format_model[i]["name"].lower()
+            for i in range(len(self.format_model))
+            if i != skip_index
+        }
+        if raw.lower() not in existing:
+            return raw
+        counter = 2
+        while True:
+            candidate = f"{raw} {counter}"
+            if candidate.lower() not in existing:
+                return candidate
+            counter += 1
+
+    def _next_column_label(self, columns):
+        used_indexes = set()
+        if isinstance(columns, list):
+            for row in columns:
+                col_label = self._normalize_column_label((row or {}).get("col", "A"))
+                col_index = excel_col_to_index(col_label)
+                if col_index >= 0:
+                    used_indexes.add(col_index)
+        next_index = 0
+        while next_index in used_indexes:
+            next_index += 1
+        return index_to_excel_col(next_index)
+
+    def _normalize_column_label(self, value):
+        normalized = "".join(ch for ch in str(value).upper() if ch.isalpha())
+        return normalized[:3] if normalized else "A"
+
+    def _sanitize_column_input(self, value):
+        return "".join(ch for ch in str(value).upper() if ch.isalpha())[:3]
+
+    def _sanitize_format_type(self, value):
+        type_value = str(value).strip().lower()
+        return type_value if type_value in ("data", "formula", "empty") else "data"
+
+    def _sanitize_format_value(self, row_type, value):
+        safe_type = self._sanitize_format_type(row_type)
+        if safe_type == "empty":
+            return ""
+        return str(value)
+
+    def _sanitize_format_width(self, value):
+        try:
+            width_value = int(value)
+        except Exception:
+            width_value = 14
+        return max(1, min(200, width_value))
+
+    def _allowed_label_keys_for_type(self, row_type):
+        safe_type = self._sanitize_format_type(row_type)
+        all_keys = {item.get("key", "") for item in self.custom_label_options if isinstance(item, dict)}
+        if safe_type == "formula":
+            return {"demand", "kwh", "kvarh"}
+        return all_keys
+
+    def _sanitize_label_key(self, value, row_type="data"):
+        key = str(value or "").strip()
+        if key.startswith("custom:"):
+            custom_text = key[7:].strip()
+            return f"custom:{custom_text}" if custom_text else ""
+        valid_keys = self._allowed_label_keys_for_type(row_type)
+        return key if key in valid_keys else ""
+
+    def _sort_format_columns(self, columns):
+        if not isinstance(columns, list) or not columns:
+            return
+        columns.sort(key=lambda row: excel_col_to_index(self._normalize_column_label((row or {}).get("col", "A"))))
+
+    def _is_builtin_format_name(self, name):
+        return str(name).strip().lower() in BUILTIN_FORMAT_NAME_SET
+
+    @pyqtSlot(str, result=bool)
+    def isBuiltinFormat(self, name):
+        return self._is_builtin_format_name(name)
+
+    def _only_builtin_formats_left(self):
+        if not self.format_model:
+            return True
+        for fmt in self.format_model:
+            if not self._is_builtin_format_name(fmt.get("name", "")):
+                return False
+        return True
+
+    def _persist_formats_after_delete(self):
+        target_path = self.formats_path
+        try:
+            os.makedirs(self.formats_dir, exist_ok=True)
+            if self._only_builtin_formats_left():
+                if os.path.exists(target_path):
+                    self._prepare_file_for_write(target_path)
+                    with open(target_path, "w", encoding="utf-8") as fp:
+                        json.dump(self.format_model, fp, indent=2)
+                    self._hide_file_if_supported(target_path)
+                    self._set_format_designer_status(f"Kept format file and saved built-in formats: {target_path}")
+                else:
+                    self._set_format_designer_status("Only built-in formats remain. No format file found to delete.")
+                return
+            self._prepare_file_for_write(target_path)
+            with open(target_path, "w", encoding="utf-8") as fp:
+                json.dump(self.format_model, fp, indent=2)
+            self._hide_file_if_supported(target_path)
+            self._set_format_designer_status(f"Updated format file: {target_path}")
+        except Exception as e:
+            self._set_format_designer_status(f"Failed to update format file: {e}")
+
+    def _autosave_formats(self):
+        if not self.formats_loaded:
+            return
+        if not self._ensure_formats_storage_writable():
+            self._set_format_designer_status("Failed to auto-save format file: no writable format storage path.")
+            return
+        try:
+            os.makedirs(self.formats_dir, exist_ok=True)
+            self._prepare_file_for_write(self.formats_path)
+            with open(self.formats_path, "w", encoding="utf-8") as fp:
+                json.dump(self.format_model, fp, indent=2)
+            self._hide_file_if_supported(self.formats_path)
+            return
+        except Exception:
+            pass
+        if self._switch_to_next_writable_formats_storage():
+            try:
+                os.makedirs(self.formats_dir, exist_ok=True)
+                self._prepare_file_for_write(self.formats_path)
+                with open(self.formats_path, "w", encoding="utf-8") as fp:
+                    json.dump(self.format_model, fp, indent=2)
+                self._hide_file_if_supported(self.formats_path)
+                return
+            except Exception as e:
+                self._set_format_designer_status(f"Failed to auto-save format file: {e}")
+                return
+        self._set_format_designer_status("Failed to auto-save format file: permission denied for all storage paths.")
+
+    def _probe_writable_dir(self, directory):
+        try:
+            os.makedirs(directory, exist_ok=True)
+            probe = os.path.join(directory, ".write_probe.tmp")
+            with open(probe, "w", encoding="utf-8") as fp:
+                fp.write("ok")
+            os.remove(probe)
+            return True
+        except Exception:
+            return False
+
+    def _format_storage_candidates(self, current=None):
+        current = current or self.formats_dir
+        candidates = [current]
+        docs = documents_dir()
+        if docs:
+            candidates.append(os.path.join(docs, "CubeFlow", "formats"))
+        candidates.append(os.path.join(os.path.expanduser("~"), "Documents", "CubeFlow", "formats"))
+        candidates.append(os.path.join(tempfile.gettempdir(), "CubeFlow", "formats"))
+        unique = []
+        seen = set()
+        for item in candidates:
+            key = os.path.normcase(os.path.normpath(item))
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(item)
+        return unique
+
+    def _set_formats_storage(self, directory):
+        self.formats_dir = directory
+        self.formats_path = os.path.join(self.formats_dir, "format_model.json")
+        self.format_save_path = self.formats_path
+        if hasattr(self, "settings") and self.settings is not None:
+            self.settings.setValue("formatSavePath", self.formats_path)
+            self.formatSavePathChanged.emit()
+
+    def _ensure_formats_storage_writable(self):
+        for candidate in self._format_storage_candidates():
+            if self._probe_writable_dir(candidate):
+                if os.path.normcase(os.path.normpath(candidate)) != os.path.normcase(os.path.normpath(self.formats_dir)):
+                    self._set_formats_storage(candidate)
+                    self._set_format_designer_status(f"Switched format storage to writable path: {self.formats_path}")
+                return True
+        return False
+
+    def _switch_to_next_writable_formats_storage(self):
+        current_key = os.path.normcase(os.path.normpath(self.formats_dir))
+        candidates = self._format_storage_candidates()
+        start_idx = 0
+        for i, c in enumerate(candidates):
+            if os.path.normcase(os.path.normpath(c)) == current_key:
+                start_idx = i + 1
+                break
+        for candidate in candidates[start_idx:]:
+            if self._probe_writable_dir(candidate):
+                self._set_formats_storage(candidate)
+                self._set_format_designer_status(f"Switched format storage to writable path: {self.formats_path}")
+                return True
+        return False
+
+    def _hide_file_if_supported(self, path):
+        if not path or not os.path.exists(path):
+            return
+        if os.name != "nt":
+            return
+        try:
+            import ctypes
+            FILE_ATTRIBUTE_HIDDEN = 0x02
+            attrs = ctypes.windll.kernel32.GetFileAttributesW(str(path))
+            if attrs == -1:
+                return
+            if not (attrs & FILE_ATTRIBUTE_HIDDEN):
+                ctypes.windll.kernel32.SetFileAttributesW(str(path), attrs | FILE_ATTRIBUTE_HIDDEN)
+        except Exception:
+            pass
+
+    def _prepare_file_for_write(self, path):
+        if not path or os.name != "nt" or not os.path.exists(path):
+            return
+        try:
+            import ctypes
+            FILE_ATTRIBUTE_READONLY = 0x01
+            FILE_ATTRIBUTE_HIDDEN = 0x02
+            attrs = ctypes.windll.kernel32.GetFileAttributesW(str(path))
+            if attrs == -1:
+                return
+            new_attrs = attrs & ~FILE_ATTRIBUTE_READONLY
+            new_attrs = new_attrs & ~FILE_ATTRIBUTE_HIDDEN
+            ctypes.windll.kernel32.SetFileAttributesW(str(path), new_attrs)
+        except Exception:
+            pass
+
+    def _autosave_format_model_changes(self):
+        self._autosave_formats()
+
+    def _safe_format_filename(self, name):
+        raw = str(name or "").strip()
+        if not raw:
+            raw = "format"
+        cleaned = "".join(ch for ch in raw if ch not in '<>:"/\\|?*' and ord(ch) >= 32).strip().rstrip(". ")
+        if not cleaned:
+            cleaned = "format"
+        return f"{cleaned}.json"
+
+    def _read_format_name_from_file(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as fp:
+                data = json.load(fp)
+            if isinstance(data, dict):
+                return str(data.get("name", "")).strip()
+        except Exception:
+            pass
+        return ""
+
+    def _resolve_unique_format_file_path(self, format_name):
+        base_file = self._safe_format_filename(format_name)
+        base_stem, _ = os.path.splitext(base_file)
+        candidate = os.path.join(self.formats_dir, base_file)
+        counter = 2
+        while os.path.exists(candidate):
+            existing_name = self._read_format_name_from_file(candidate)
+            if existing_name and existing_name.lower() == str(format_name).strip().lower():
+                return candidate
+            candidate = os.path.join(self.formats_dir, f"{base_stem} {counter}.json")
+            counter += 1
+        return candidate
+
+    def _find_format_file_paths_by_name(self, name):
+        matches = []
+        target_name = str(name or "").strip().lower()
+        if not target_name:
+            return matches
+        canonical = self._safe_format_filename(name).lower()
+        try:
+            for entry in os.listdir(self.formats_dir):
+                if not entry.lower().endswith(".json"):
+                    continue
+                if entry.lower() == "format_model.json":
+                    continue
+                path = os.path.join(self.formats_dir, entry)
+                if not os.path.isfile(path):
+                    continue
+                if entry.lower() == canonical:
+                    matches.append(path)
+                    continue
+                existing_name = self._read_format_name_from_file(path).lower()
+                if existing_name == target_name:
+                    matches.append(path)
+        except Exception:
+            pass
+        return matches
+
+    def _delete_format_files_for_names(self, names):
+        removed = []
+        unique_paths = set()
+        for name in names:
+            for path in self._find_format_file_paths_by_name(name):
+                unique_paths.add(path)
+        for path in sorted(unique_paths):
+            os.remove(path)
+            removed.append(path)
+        return removed
+
+    def _delete_format_file_by_name(self, name):
+        file_name = self._safe_format_filename(name)
+        target_path = os.path.join(self.formats_dir, file_name)
+        if os.path.exists(target_path):
+            os.remove(target_path)
+            return target_path
+        return ""
+
+    def refreshBatchFileStatusesProperty(self):
+        if self.root:
+            self.root.setProperty("batchFileStatuses", self.batch_file_statuses)
+
+    def _stop_thread(self, thread_attr, worker_attr=None, timeout_ms=3000):
+        t = getattr(self, thread_attr, None)
+        if t:
+            try:
+                if t.isRunning():
+                    t.quit()
+                    if not t.wait(timeout_ms):
+                        t.terminate()
+                        t.wait(timeout_ms)
+            except Exception:
+                pass
+        setattr(self, thread_attr, None)
+        if worker_attr:
+            setattr(self, worker_attr, None)
+
+    def _request_worker_cancel(self, worker_attr):
+        worker = getattr(self, worker_attr, None)
+        if worker and hasattr(worker, "request_cancel"):
+            try:
+                worker.request_cancel()
+            except Exception:
+                pass
+
+    def _request_all_worker_cancels(self):
+        self._request_worker_cancel("worker")
+        self._request_worker_cancel("save_worker")
+        self._request_worker_cancel("batch_save_worker")
+        self._request_worker_cancel("path_scan_worker")
+        self._request_worker_cancel("batch_convert_worker")
+        self._request_worker_cancel("preview_worker")
+
+    def _stop_all_background_threads(self, timeout_ms=3000):
+        self._stop_thread("thread", "worker", timeout_ms)
+        self._stop_thread("save_thread", "save_worker", timeout_ms)
+        self._stop_thread("batch_save_thread", "batch_save_worker", timeout_ms)
+        self._stop_thread("path_scan_thread", "path_scan_worker", timeout_ms)
+        self._stop_thread("batch_convert_thread", "batch_convert_worker", timeout_ms)
+        self._stop_thread("preview_thread", "preview_worker", timeout_ms)
+
+    def _confirm_in_app(self, title, message):
+        if not self.root:
+            result = QMessageBox.question(
+                None,
+                str(title or "Confirm"),
+                str(message or "Are you sure?"),
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            return result == QMessageBox.StandardButton.Yes
+        self._confirm_token += 1
+        token = self._confirm_token
+        self._confirm_response = False
+        self.inAppConfirmRequested.emit(token, str(title or "Confirm"), str(message or "Are you sure?"))
+        loop = QEventLoop()
+        self._confirm_loop = loop
+        loop.exec()
+        self._confirm_loop = None
+        return bool(self._confirm_response)
+
+    def _confirm_overwrite_paths(self, paths, title="Confirm Overwrite"):
+        existing = [p for p in paths if os.path.exists(p)]
+        if not existing:
+            return True
+        preview = "\n".join(existing[:8])
+        suffix = "" if len(existing) <= 8 else f"\n...and {len(existing) - 8} more file(s)"
+        msg = (
+            "The following file(s) already exist:\n\n"
+            f"{preview}{suffix}\n\n"
+            "Do you want to overwrite them?"
+        )
+        return self._confirm_in_app(title, msg)
+
+    @pyqtSlot(int, bool)
+    def resolveInAppConfirm(self, token, accepted):
+        try:
+            token_value = int(token)
+        except Exception:
+            return
+        if token_value != self._confirm_token:
+            return
+        self._confirm_response = bool(accepted)
+        if self._confirm_loop is not None and self._confirm_loop.isRunning():
+            self._confirm_loop.quit()
+
+    def applyRememberedSettingsToUI(self):
+        if not self.root:
+            return
+        if self.xml_type:
+            self.root.setProperty("selectionType", self.xml_type)
+
+    @pyqtSlot()
+    def openFormatDesigner(self):
+        if not self.formats_loaded:
+            self._open_designer_when_loaded = True
+            self._set_format_designer_status("Loading saved formats...")
+            return
+        if self.root:
+            self.root.setProperty("processState", "formatDesigner")
+
+    @pyqtSlot()
+    def closeFormatDesigner(self):
+        if self.root:
+            self.root.setProperty("processState", "idle")
+
+    @pyqtSlot()
+    def chooseFormatSavePath(self):
+        start_dir = self.formats_dir
+        chosen_path, _ = QFileDialog.getSaveFileName(
+            None,
+            "Save Formats As",
+            start_dir,
+            "JSON Files (*.json)"
+        )
+        if not chosen_path:
+            return
+        if not chosen_path.lower().endswith(".json"):
+            chosen_path += ".json"
+        self.format_save_path = self.formats_path
+        self.settings.setValue("formatSavePath", self.formats_path)
+        self.formatSavePathChanged.emit()
+        self._set_format_designer_status(f"Formats are saved to {self.formats_path}")
+
+    @pyqtSlot()
+    def importFormatModelFromFile(self):
+        if not self.formats_loaded:
+            return
+        start_dir = self.formats_dir
+        chosen_path, _ = QFileDialog.getOpenFileName(
+            None,
+            "Open Format File",
+            start_dir,
+            "JSON Files (*.json)"
+        )
+        if not chosen_path:
+            return
+        try:
+            with open(chosen_path, "r", encoding="utf-8") as fp:
+                loaded = json.load(fp)
+            if isinstance(loaded, dict):
+                loaded = [loaded]
+            parsed = self._normalize_loaded_formats(loaded)
+            if not parsed:
+                QMessageBox.warning(None, "Import Failed", "No valid format entries were found in the selected JSON file.")
+                self._set_format_designer_status("Failed to import: no valid format entries found.")
+                return
+
+            added = 0
+            skipped = 0
+            copied = 0
+            copy_errors = 0
+            existing_names = {str(item.get("name", "")).strip().lower() for item in self.format_model if isinstance(item, dict)}
+            for fmt in parsed:
+                incoming_name = str(fmt.get("name", "New Format")).strip()
+                if not incoming_name:
+                    incoming_name = "New Format"
+                if incoming_name.lower() in existing_names:
+                    skipped += 1
+                    continue
+                name = incoming_name
+                imported_fmt = {
+                    "name": name,
+                    "columns": fmt.get("columns", self._default_columns("=C{r}*280"))
+                }
+                self.format_model.append(imported_fmt)
+                existing_names.add(name.lower())
+                added += 1
+                try:
+                    os.makedirs(self.formats_dir, exist_ok=True)
+                    target_path = self._resolve_unique_format_file_path(name)
+                    self._prepare_file_for_write(target_path)
+                    with open(target_path, "w", encoding="utf-8") as fp:
+                        json.dump(imported_fmt, fp, indent=2)
+                    copied += 1
+                except Exception:
+                    copy_errors += 1
+
+            self.format_save_path = self.formats_path
+            self.settings.setValue("formatSavePath", self.formats_path)
+            self.formatSavePathChanged.emit()
+            if added > 0:
+                self._invalidate_format_plan()
+                self.formatModelChanged.emit()
+                self._refresh_xml_type_options()
+                self._autosave_formats()
+            if added > 0 and (skipped > 0 or copy_errors > 0):
+                self._set_format_designer_status(
+                    f"Imported {added} format(s). Skipped {skipped} duplicate format(s). "
+                    f"Copied {copied} file(s){', copy failed for ' + str(copy_errors) if copy_errors > 0 else ''}."
+                )
+                notice = (
+                    f"Imported {added} format(s).\n"
+                    f"Copied {copied} file(s) to formats folder."
+                )
+                if skipped > 0:
+                    notice += f"\nSkipped {skipped} because they are already in the list."
+                if copy_errors > 0:
+                    notice += f"\nFailed to copy {copy_errors} file(s)."
+                self.formatImportNotice.emit(notice)
+            elif added > 0:
+                self._set_format_designer_status(f"Imported {added} format(s) from {chosen_path}. Copied {copied} file(s) to formats folder.")
+            else:
+                self._set_format_designer_status("No formats imported. Selected file already exists in the list.")
+                self.formatImportNotice.emit("This format is already in the list.")
+        except Exception as e:
+            self._set_format_designer_status(f"Failed to import format file: {e}")
+            QMessageBox.critical(None, "Import Failed", f"Failed to import format file:\n{e}")
+
+    @pyqtSlot()
+    def addFormatDefinition(self):
+        name = self._unique_format_name("New Format")
+        self.format_model.append({"name": name, "columns": self._default_columns("=C{r}*280")})
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._autosave_format_model_changes()
+
+    @pyqtSlot(int, result=int)
+    def duplicateFormatDefinition(self, index):
+        if index < 0 or index >= len(self.format_model):
+            return -1
+        source = self.format_model[index]
+        duplicate_name = self._unique_format_name(f"{source.get('name', 'Format')} Copy")
+        duplicate_columns = copy.deepcopy(source.get("columns", self._default_columns("=C{r}*280")))
+        self.format_model.append({
+            "name": duplicate_name,
+            "columns": duplicate_columns
+        })
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        new_index = len(self.format_model) - 1
+        try:
+            os.makedirs(self.formats_dir, exist_ok=True)
+            target_path = self._resolve_unique_format_file_path(duplicate_name)
+            with open(target_path, "w", encoding="utf-8") as fp:
+                json.dump(self.format_model[new_index], fp, indent=2)
+            self._autosave_formats()
+            self._set_format_designer_status(f"Duplicated format and saved file: {target_path}")
+        except Exception as e:
+            self._set_format_designer_status(f"Duplicated format but failed to save file: {e}")
+        return new_index
+
+    @pyqtSlot(int)
+    def openFormatForEdit(self, index):
+        if index < 0 or index >= len(self.format_model):
+            return
+        self.beginFormatEdit(index)
+        if self.root:
+            self.root.setProperty("formatDesignerSelectedFormatIndex", index)
+            self.root.setProperty("formatDesignerSelectedRowIndex", -1)
+            self.root.setProperty("processState", "formatCreate")
+
+    @pyqtSlot(int)
+    def duplicateFormatAndOpen(self, index):
+        if index < 0 or index >= len(self.format_model):
+            return
+        self._format_edit_snapshot = copy.deepcopy(self.format_model)
+        self._format_edit_active = True
+
+        source = self.format_model[index]
+        duplicate_name = self._unique_format_name(f"{source.get('name', 'Format')} Copy")
+        duplicate_columns = copy.deepcopy(source.get("columns", self._default_columns("=C{r}*280")))
+        self.format_model.append({
+            "name": duplicate_name,
+            "columns": duplicate_columns
+        })
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._autosave_format_model_changes()
+
+        new_index = len(self.format_model) - 1
+        if self.root:
+            self.root.setProperty("formatDesignerSelectedFormatIndex", new_index)
+            self.root.setProperty("formatDesignerSelectedRowIndex", -1)
+            self.root.setProperty("processState", "formatCreate")
+
+    @pyqtSlot(result=int)
+    def createFormatDraft(self):
+                                                                                 
+        self._format_edit_snapshot = copy.deepcopy(self.format_model)
+        self._format_edit_active = True
+        name = self._unique_format_name("New Format")
+        self.format_model.append({"name": name, "columns": self._default_columns("=C{r}*280")})
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._autosave_format_model_changes()
+        return len(self.format_model) - 1
+
+    @pyqtSlot(int)
+    def beginFormatEdit(self, format_index):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return
+        self._format_edit_snapshot = copy.deepcopy(self.format_model)
+        self._format_edit_active = True
+
+    @pyqtSlot()
+    def cancelFormatEdit(self):
+        if not self._format_edit_active or self._format_edit_snapshot is None:
+            return
+        self.format_model = copy.deepcopy(self._format_edit_snapshot)
+        self._format_edit_snapshot = None
+        self._format_edit_active = False
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._autosave_format_model_changes()
+        self._set_format_designer_status("Discarded unsaved format changes.")
+
+    @pyqtSlot(result=bool)
+    def confirmDiscardFormatEdit(self):
+        if not self._format_edit_active:
+            return True
+        return self._confirm_in_app(
+            "Discard Changes",
+            "Unsaved format changes will not be saved.\n\nGo back to list anyway?"
+        )
+
+    @pyqtSlot()
+    def commitFormatEdit(self):
+        self._format_edit_snapshot = None
+        self._format_edit_active = False
+        self._autosave_format_model_changes()
+
+    @pyqtSlot(int)
+    def deleteFormatDefinition(self, index):
+        if index < 0 or index >= len(self.format_model):
+            return
+        fmt = self.format_model[index]
+        format_name = fmt.get("name", "")
+        if self._is_builtin_format_name(format_name):
+            self._set_format_designer_status(
+                f"Failed to delete: {', '.join(BUILTIN_FORMAT_NAMES)} are built-in formats."
+            )
+            return
+        alias_names = []
+        raw_aliases = fmt.get("__aliases", [])
+        if isinstance(raw_aliases, list):
+            alias_names = [str(v).strip() for v in raw_aliases if str(v).strip()]
+        names_to_remove = [format_name] + alias_names
+        deleted_paths = []
+        try:
+            os.makedirs(self.formats_dir, exist_ok=True)
+            deleted_paths = self._delete_format_files_for_names(names_to_remove)
+        except Exception as e:
+            self._set_format_designer_status(f"Failed to delete format file: {e}")
+            return
+        self.format_model.pop(index)
+        if not self.format_model:
+            self.format_model = self._default_formats()
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._persist_formats_after_delete()
+        if deleted_paths:
+            self._set_format_designer_status(f"Deleted format and removed {len(deleted_paths)} file(s).")
+        else:
+            self._set_format_designer_status("Deleted format from model. No matching sidecar format file found.")
+
+    @pyqtSlot(int, str)
+    def renameFormatDefinition(self, index, name):
+        if index < 0 or index >= len(self.format_model):
+            return
+        current_name = str(self.format_model[index].get("name", "")).strip()
+        next_name = self._unique_format_name(name, skip_index=index)
+        if current_name and current_name.lower() != next_name.lower():
+            aliases = self.format_model[index].get("__aliases", [])
+            if not isinstance(aliases, list):
+                aliases = []
+            lowered = {str(v).strip().lower() for v in aliases}
+            if current_name.lower() not in lowered:
+                aliases.append(current_name)
+            self.format_model[index]["__aliases"] = aliases
+        self.format_model[index]["name"] = next_name
+        self._invalidate_format_plan()
+        self.formatModelChanged.emit()
+        self._refresh_xml_type_options()
+        self._autosave_format_model_changes()
+
+    @pyqtSlot(int, result=int)
+    def addFormatRow(self, format_index):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return -1
+        columns = self.format_model[format_index]["columns"]
+        new_row = {
+            "col": self._next_column_label(columns),
+            "type": "data",
+            "value": "",
+            "width": 14,
+            "labelKey": "",
+        }
+        columns.append(new_row)
+        self._sort_format_columns(columns)
+        new_index = -1
+        for i, candidate in enumerate(columns):
+            if candidate is new_row:
+                new_index = i
+                break
+        self._invalidate_format_plan(format_index)
+        self._autosave_format_model_changes()
+        QTimer.singleShot(0, self.formatModelChanged.emit)
+        return new_index
+
+    @pyqtSlot(int, int)
+    def deleteFormatRow(self, format_index, row_index):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return
+        columns = self.format_model[format_index]["columns"]
+        if row_index < 0 or row_index >= len(columns):
+            return
+        columns.pop(row_index)
+        self._invalidate_format_plan(format_index)
+        self._autosave_format_model_changes()
+        self.formatModelChanged.emit()
+
+    @pyqtSlot(int, int, str, 'QVariant', result=int)
+    def updateFormatRow(self, format_index, row_index, field, value):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return -1
+        columns = self.format_model[format_index]["columns"]
+        if row_index < 0 or row_index >= len(columns):
+            return -1
+        row = columns[row_index]
+        if field == "col":
+            normalized = self._sanitize_column_input(value)
+            if normalized:
+                row["col"] = normalized
+                self._sort_format_columns(columns)
+        elif field == "type":
+            row["type"] = self._sanitize_format_type(value)
+            row["value"] = self._sanitize_format_value(row["type"], row.get("value", ""))
+            row["labelKey"] = self._sanitize_label_key(row.get("labelKey", ""), row["type"])
+        elif field == "value":
+            row["value"] = self._sanitize_format_value(row.get("type", "data"), value)
+        elif field == "width":
+            row["width"] = self._sanitize_format_width(value)
+        elif field == "labelKey":
+            row["labelKey"] = self._sanitize_label_key(value, row.get("type", "data"))
+        updated_index = -1
+        for i, candidate in enumerate(columns):
+            if candidate is row:
+                updated_index = i
+                break
+        if updated_index < 0:
+            updated_index = row_index
+        self._invalidate_format_plan(format_index)
+        self._autosave_format_model_changes()
+        QTimer.singleShot(0, self.formatModelChanged.emit)
+        return updated_index
+
+    @pyqtSlot(int, int, int, result=int)
+    def moveFormatRow(self, format_index, from_index, to_index):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return -1
+        columns = self.format_model[format_index]["columns"]
+        if not isinstance(columns, list) or not columns:
+            return -1
+        if from_index < 0 or from_index >= len(columns):
+            return -1
+        safe_to = max(0, min(int(to_index), len(columns) - 1))
+        if from_index == safe_to:
+            return from_index
+        moved = columns.pop(from_index)
+        columns.insert(safe_to, moved)
+        self._invalidate_format_plan(format_index)
+        self._autosave_format_model_changes()
+        QTimer.singleShot(0, self.formatModelChanged.emit)
+        return safe_to
+
+    @pyqtSlot(int, result=bool)
+    def loadXmlPreview(self, max_rows=10):
+        source_file = self._preview_source_file()
+        if not source_file:
+            self._set_xml_preview([], [], "Select an XML file first.")
+            return False
+        rows_limit = max(1, min(30, int(max_rows) if max_rows else 10))
+        self._cancel_xml_preview()
+        self.preview_thread = QThread()
+        self.preview_worker = XmlPreviewWorker(self._preview_request_id, source_file, rows_limit)
+        self.preview_worker.moveToThread(self.preview_thread)
+        self.preview_thread.started.connect(self.preview_worker.process)
+        self.preview_worker.finished.connect(self.handleXmlPreviewReady)
+        self.preview_worker.error.connect(self.handleXmlPreviewError)
+        self._set_xml_preview([], [], f"Loading preview of {os.path.basename(source_file)}...", loading=True)
+        self.preview_thread.start()
+        return True
+
+    def _cancel_xml_preview(self):
+        self._preview_request_id += 1
+        self._request_worker_cancel("preview_worker")
+        self._stop_thread("preview_thread", "preview_worker")
+
+    def _clear_xml_preview(self):
+        self._cancel_xml_preview()
+        self._set_xml_preview([], [], "")
+
+    @pyqtSlot(int, object)
+    def handleXmlPreviewReady(self, request_id, preview):
+        if request_id != self._preview_request_id:
+            return
+        self._stop_thread("preview_thread", "preview_worker")
+        headers, rows, status = preview
+        self._set_xml_preview(headers, rows, status)
+
+    @pyqtSlot(int, str)
+    def handleXmlPreviewError(self, request_id, msg):
+        if request_id != self._preview_request_id:
+            return
+        self._stop_thread("preview_thread", "preview_worker")
+        if msg == "Operation cancelled by user.":
+            self._set_xml_preview([], [], "Preview cancelled.")
+            return
+        self._set_xml_preview([], [], msg)
+
+    @pyqtSlot()
+    def selectPreviewXmlFile(self):
+        if self.preview_selected_file and os.path.exists(self.preview_selected_file):
+            self.loadXmlPreview(10)
+            return
+        self.selectAnotherPreviewXmlFile()
+
+    @pyqtSlot()
+    def selectAnotherPreviewXmlFile(self):
+        start_dir = self.last_open_dir if self.last_open_dir and os.path.isdir(self.last_open_dir) else ""
+        file_path, _ = QFileDialog.getOpenFileName(None, "Select XML Preview File", start_dir, "XML Files (*.xml)")
+        if not file_path:
+            return
+        self.rememberOpenDirectory(file_path)
+        self.preview_selected_file = file_path
+        self.loadXmlPreview(10)
+
+    @pyqtSlot(int, int, int, result=int)
+    def setFormatRowFromPreview(self, format_index, row_index, column_index):
+        if format_index < 0 or format_index >= len(self.format_model):
+            return -1
+        columns = self.format_model[format_index]["columns"]
+        if row_index < 0 or row_index >= len(columns):
+            return -1
+        safe_col_index = max(0, int(column_index))
+        row = columns[row_index]
+        row["type"] = "data"
+        row["value"] = str(safe_col_index)
+        updated_index = -1
+        for i, candidate in enumerate(columns):
+            if candidate is row:
+                updated_index = i
+                break
+        if updated_index < 0:
+            updated_index = row_index
+        self._invalidate_format_plan(format_index)
+        self._autosave_format_model_changes()
+        QTimer.singleShot(0, self.formatModelChanged.emit)
+        return updated_index
+
+    @pyqtSlot()
+    def saveFormatModel(self):
+        if not self.formats_loaded:
+            return
+        try:
+            target_path = self.formats_path
+            os.makedirs(self.formats_dir, exist_ok=True)
+            self._prepare_file_for_write(target_path)
+            with open(target_path, "w", encoding="utf-8") as fp:
+                json.dump(self.format_model, fp, indent=2)
+            self._hide_file_if_supported(target_path)
+            self._refresh_xml_type_options()
+            self._set_format_designer_status(f"Saved formats to {target_path}")
+            QMessageBox.information(None, "Formats Saved", f"Formats saved to:\n{target_path}")
+        except Exception as e:
+            self._set_format_designer_status(f"Failed to save format: {e}")
+
+    @pyqtSlot(int)
+    def saveFormatByName(self, format_index):
+        if not self.formats_loaded or format_index < 0 or format_index >= len(self.format_model):
+            return
+        try:
+            os.makedirs(self.formats_dir, exist_ok=True)
+            fmt = self.format_model[format_index]
+            if self._is_builtin_format_name(fmt.get("name", "")):
+                self._set_format_designer_status("Built-in formats are not saved as individual files.")
+                return
+            file_name = self._safe_format_filename(fmt.get("name", "format"))
+            target_path = self._resolve_unique_format_file_path(fmt.get("name", "format"))
+            with open(target_path, "w", encoding="utf-8") as fp:
+                json.dump(fmt, fp, indent=2)
+            self._autosave_formats()
+            self._set_format_designer_status(f"Saved format to {target_path}")
+        except Exception as e:
+            self._set_format_designer_status(f"Failed to save format: {e}")
+
+    def rememberOpenDirectory(self, file_path):
+        directory = os.path.dirname(file_path) if file_path else ""
+        if not directory:
+            return
+        self.last_open_dir = directory
+        self.settings.setValue("lastOpenDir", directory)
+
+    def rememberSaveDirectory(self, directory, batch=False):
+        if not directory:
+            return
+        self.last_save_dir = directory
+        self.settings.setValue("lastSaveDir", directory)
+        if batch:
+            self.last_batch_dir = directory
+            self.settings.setValue("lastBatchDir", directory)
+
+    def applySelectedPaths(self, file_paths):
+        if not file_paths:
+            QMessageBox.information(None, "Info", "No XML files selected")
+            return
+
+        is_batch_selection = len(file_paths) > 1
+        self.selected_files = file_paths if is_batch_selection else []
+        self.selected_file = file_paths[0] if not is_batch_selection else None
+        self.is_batch = is_batch_selection
+        self.current_batch_index = 0
+        self.xml_type = ""
+        self.batch_file_statuses = ["Queued"] * len(self.selected_files) if is_batch_selection else []
+        self.preview_selected_file = ""
+        self._clear_xml_preview()
+
+        if self.root:
+                                                                                       
+            self.root.setProperty("processState", "")
+            self.root.setProperty("isBatch", False)
+            self.root.setProperty("selectedFiles", [])
+            self.root.setProperty("batchFileStatuses", [])
+            self.root.setProperty("selectedFile", "")
+            self.root.setProperty("totalBatchFiles", 0)
+            self.root.setProperty("currentBatchIndex", 0)
+            self.root.setProperty("currentFileName", "")
+            QApplication.processEvents()
+            self.root.setProperty("selectionType", "")
+            self.root.setProperty("selectedFile", self.selected_file or "")
+            self.root.setProperty("selectedFiles", list(self.selected_files) if is_batch_selection else [])
+            self.root.setProperty("isBatch", is_batch_selection)
+            self.root.setProperty("totalBatchFiles", len(file_paths) if is_batch_selection else 0)
+            self.root.setProperty("currentBatchIndex", 0)
+            self.root.setProperty("currentFileName", os.path.basename(file_paths[0]) if is_batch_selection else "")
+            self.root.setProperty("batchOutputs", [])
+            self.refreshBatchFileStatusesProperty()
+            if is_batch_selection:
+                self.root.setProperty("fileSize", "")
+            else:
+                self.root.setProperty("fileSize", self.getFileSize(self.selected_file))
+            self.root.setProperty("processState", "selecting")
+
+    @pyqtSlot()
+    def selectFile(self):
+        start_dir = self.last_open_dir if self.last_open_dir and os.path.isdir(self.last_open_dir) else ""
+        file_paths, _ = QFileDialog.getOpenFileNames(None, "Select XML File(s)", start_dir, "XML Files (*.xml)")
+        if file_paths:
+            self.rememberOpenDirectory(file_paths[0])
+        self.applySelectedPaths(file_paths)
+
+    @pyqtSlot('QVariantList')
+    def setDroppedPaths(self, paths):
+        self.cancel_requested = False
+        normalized_paths = [normalize_path(p) for p in paths if normalize_path(p)]
+        if not normalized_paths:
+            QMessageBox.warning(None, "Invalid Selection", "No valid dropped paths were found.")
+            return
+        if self.path_scan_thread and self.path_scan_thread.isRunning():
+            QMessageBox.information(None, "Scanning", "Please wait for the current folder scan to finish.")
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self._stop_thread("path_scan_thread", "path_scan_worker")
+        self._set_path_scan_state(True, 0, [])
+        self.path_scan_thread = QThread()
+        self.path_scan_worker = PathDiscoveryWorker(
+            normalized_paths,
+            include=self.scan_include_globs,
+            exclude=self.scan_exclude_globs,
+            max_depth=self.scan_max_depth
+        )
+        self.path_scan_worker.moveToThread(self.path_scan_thread)
+        self.path_scan_thread.started.connect(self.path_scan_worker.process)
+        self.path_scan_worker.batchFound.connect(self.handleDroppedPathScanBatch)
+        self.path_scan_worker.finished.connect(self.handleDroppedPathScanFinished)
+        self.path_scan_worker.error.connect(self.handleDroppedPathScanError)
+        self.path_scan_worker.finished.connect(self.path_scan_thread.quit)
+        self.path_scan_worker.error.connect(self.path_scan_thread.quit)
+        self.path_scan_thread.finished.connect(self.cleanupDroppedPathScan)
+        self.path_scan_thread.start()
+
+    def _set_path_scan_state(self, active, found_count, recent_paths):
+        self.path_scan_active = bool(active)
+        self.path_scan_found_count = int(found_count)
+        self.path_scan_recent_paths = list(recent_paths)
+        self.pathScanChanged.emit()
+
+    @pyqtSlot(object, int)
+    def handleDroppedPathScanBatch(self, paths, found_count):
+        if self.cancel_requested or not self.path_scan_active:
+            return
+        recent = [os.path.basename(p) for p in paths[-PATH_SCAN_RECENT_LIMIT:]]
+        self._set_path_scan_state(True, found_count, recent)
+
+    @pyqtSlot(object)
+    def handleDroppedPathScanFinished(self, xml_paths):
+        if self.cancel_requested:
+            return
+        if xml_paths:
+            self.applySelectedPaths(xml_paths)
+            return
+        QMessageBox.warning(None, "Invalid Selection", "No XML files were found in the dropped item(s).")
+
+    @pyqtSlot(str)
+    def handleDroppedPathScanError(self, msg):
+        if msg == "Operation cancelled by user.":
+            return
+        QMessageBox.critical(None, "Error", msg)
+
+    def cleanupDroppedPathScan(self):
+        if QApplication.overrideCursor() is not None:
+            QApplication.restoreOverrideCursor()
+        self._stop_thread("path_scan_thread", "path_scan_worker")
+        self._set_path_scan_state(False, 0, [])
+
+    @pyqtSlot(str)
+    def setScanIncludeGlobs(self, patterns):
+        self.scan_include_globs = str(patterns or "").strip()
+        self.settings.setValue("scanIncludeGlobs", self.scan_include_globs)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(str)
+    def setScanExcludeGlobs(self, patterns):
+        self.scan_exclude_globs = str(patterns or "").strip()
+        self.settings.setValue("scanExcludeGlobs", self.scan_exclude_globs)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(int)
+    def setScanMaxDepth(self, depth):
+        self.scan_max_depth = max(-1, int(depth))
+        self.settings.setValue("scanMaxDepth", self.scan_max_depth)
+        self.exportSettingsChanged.emit()
+
+
+    @pyqtSlot()
+    def selectBatchFiles(self):
+        self.selectFile()
+
+    @pyqtSlot()
+    def confirmAndConvertBatch(self):
+        if not self.xml_type or not self.selected_files:
+            return
+        if self._custom_formats_pending():
+            return
+        self.cancel_requested = False
+        self.is_batch = True
+        self.selected_file = None
+        self._discard_batch_staging()
+        self._clear_conversion_metrics()
+        self.batch_results = []
+        self.batch_outputs = []
+        self.batch_file_statuses = ["Queued"] * len(self.selected_files)
+        if self.root:
+                                                                                         
+            self.root.setProperty("processState", "")
+            self.root.setProperty("isBatch", False)
+            self.root.setProperty("selectedFiles", [])
+            self.root.setProperty("selectedFile", "")
+            self.root.setProperty("currentBatchIndex", -1)
+            self.root.setProperty("totalBatchFiles", 0)
+            self.root.setProperty("currentFileName", "")
+            self.root.setProperty("batchFileStatuses", [])
+            self.root.setProperty("batchOutputs", [])
+            QApplication.processEvents()
+
+            self.root.setProperty("processState", "selecting")
+            QApplication.processEvents()
+            self.root.setProperty("isBatch", True)
+            self.root.setProperty("selectedFiles", list(self.selected_files))
+            self.root.setProperty("processState", "converting")
+            self.root.setProperty("currentBatchIndex", 0)
+            self.root.setProperty("totalBatchFiles", len(self.selected_files))
+            self.root.setProperty("currentFileName", os.path.basename(self.selected_files[0]))
+            self.refreshBatchFileStatusesProperty()
+        self.progress = 0
+        self.current_batch_index = 0
+        self.progressUpdated.emit(self.progress)
+        if self.fused_batch_save or self.chunk_rows or self.spill_batch_results or (self.batch_worker_count > 1 and len(self.selected_files) > 1):
+            self.startPooledBatchConversion()
+        else:
+            self.processNextBatchFile()
+
+    def startPooledBatchConversion(self):
+        self.is_batch = True
+        self._batch_result_slots = {}
+        self._stop_thread("batch_convert_thread", "batch_convert_worker")
+        self._discard_batch_staging()
+        low_memory, temp_dir = self._export_memory_options()
+        result_cache = self._result_cache()
+        stage_outputs = self.fused_batch_save or bool(self.chunk_rows)
+        if stage_outputs or self.spill_batch_results or result_cache is not None:
+            self._batch_stage_dir = tempfile.mkdtemp(prefix="cubeflow_batch_", dir=temp_dir)
+        selected_format = next((fmt for fmt in self.format_model if fmt.get("name", "") == self.xml_type), None)
+        self.batch_convert_thread = QThread()
+        self.batch_convert_worker = BatchConvertWorker(
+            self.selected_files,
+            self.xml_type,
+            selected_format,
+            self._format_plan_for(selected_format),
+            max_workers=min(self.batch_worker_count, len(self.selected_files)),
+            stage_dir=self._batch_stage_dir if stage_outputs else None,
+            low_memory=low_memory,
+            tmpdir=temp_dir,
+            cache_dir=self._batch_stage_dir if self.spill_batch_results and not stage_outputs else None,
+            result_cache=result_cache,
+            reuse_dir=self._batch_stage_dir,
+            formula_mode=self.formula_mode,
+            chunk_rows=self.chunk_rows
+        )
+        self.batch_convert_worker.moveToThread(self.batch_convert_thread)
+        self.batch_convert_worker.fileStarted.connect(self.handlePooledBatchFileStarted)
+        self.batch_convert_worker.fileFinished.connect(self.handlePooledBatchFileFinished)
+        self.batch_convert_worker.error.connect(self.handlePooledBatchError)
+        self.batch_convert_worker.finished.connect(self.handlePooledBatchFinished)
+        self.batch_convert_thread.started.connect(self.batch_convert_worker.process)
+        self.batch_convert_thread.start()
+
+    @pyqtSlot(int)
+    def handlePooledBatchFileStarted(self, index):
+        if self.cancel_requested or index >= len(self.batch_file_statuses):
+            return
+        self.batch_file_statuses[index] = "Processing"
+        self.refreshBatchFileStatusesProperty()
+        if self.root and index < len(self.selected_files):
+            self.root.setProperty("currentFileName", os.path.basename(self.selected_files[index]))
+
+    @pyqtSlot(int, object)
+    def handlePooledBatchFileFinished(self, index, result):
+        if self.cancel_requested or index >= len(self.batch_file_statuses):
+            return
+        if result.get("status") == "Done":
+            self.handleFileMetrics(result.get("metrics"))
+            self._batch_result_slots[index] = result
+            self._rebuild_pooled_batch_results()
+            self.batch_file_statuses[index] = "Done"
+        else:
+            self.batch_file_statuses[index] = "Failed"
+        self.refreshBatchFileStatusesProperty()
+        completed = sum(1 for status in self.batch_file_statuses if status in ("Done", "Failed"))
+        self.current_batch_index = completed
+        if self.root:
+            self.root.setProperty("currentBatchIndex", completed)
+        self.progressUpdated.emit(clamp_percent(int((completed / len(self.selected_files)) * 100)))
+        if result.get("status") != "Done":
+            QMessageBox.warning(None, "Batch Item Failed", result.get("error", "Unknown error"))
+
+    def _rebuild_pooled_batch_results(self):
+        default_dir_override = self.last_batch_dir if self.last_batch_dir and os.path.isdir(self.last_batch_dir) else ""
+        self.batch_results = []
+        self.batch_outputs = []
+        for index in sorted(self._batch_result_slots):
+            result = self._batch_result_slots[index]
+            xml_file = result["xml_file"]
+            default_output_path = build_default_batch_output_path(xml_file)
+            default_dir = default_dir_override or os.path.dirname(default_output_path)
+            batch_result = {"xml_type": result["xml_type"], "xml_file": xml_file}
+            for key in ("resultKey", "resultOptions", "resultCacheHit", "metrics"):
+                if key in result:
+                    batch_result[key] = result[key]
+            if "stagedPath" in result:
+                batch_result["stagedPath"] = result["stagedPath"]
+            elif "cachePath" in result:
+                batch_result["cachePath"] = result["cachePath"]
+            else:
+                batch_result["df"] = result["df"]
+            self.batch_results.append(batch_result)
+            self.batch_outputs.append({
+                "sourceFile": os.path.basename(xml_file),
+                "fileName": os.path.basename(default_output_path),
+                "saveDir": default_dir,
+                "savePath": os.path.join(default_dir, os.path.basename(default_output_path))
+            })
+        self.refreshBatchOutputsProperty()
+
+    def handlePooledBatchError(self, msg):
+        self._stop_thread("batch_convert_thread", "batch_convert_worker")
+        if msg != "Operation cancelled by user.":
+            QMessageBox.critical(None, "Error", msg)
+            for i, status in enumerate(self.batch_file_statuses):
+                if status in ("Queued", "Processing"):
+                    self.batch_file_statuses[i] = "Failed"
+            self.refreshBatchFileStatusesProperty()
+        if self.root:
+            self.root.setProperty("processState", "batchReview")
+
+    def handlePooledBatchFinished(self):
+        self._stop_thread("batch_convert_thread", "batch_convert_worker")
+        self._batch_result_slots = {}
+        if self.cancel_requested:
+            return
+        self.progressUpdated.emit(100)
+        if self.root:
+            self.root.setProperty("currentBatchIndex", len(self.selected_files))
+            self.root.setProperty("processState", "batchReview")
+
+    def processNextBatchFile(self):
+        if self.current_batch_index >= len(self.selected_files):
+            return
+        self.is_batch = len(self.selected_files) > 1
+        if self.current_batch_index < len(self.batch_file_statuses):
+            self.batch_file_statuses[self.current_batch_index] = "Processing"
+            self.refreshBatchFileStatusesProperty()
+        if self.root:
+            self.root.setProperty("currentBatchIndex", self.current_batch_index)
+            self.root.setProperty("totalBatchFiles", len(self.selected_files))
+            self.root.setProperty("currentFileName", os.path.basename(self.selected_files[self.current_batch_index]))
+        self._stop_thread("thread", "worker")
+        self.thread = QThread()
+        selected_format = next((fmt for fmt in self.format_model if fmt.get("name", "") == self.xml_type), None)
+        self.worker = Worker(
+            [self.selected_files[self.current_batch_index]],
+            self.xml_type,
+            selected_format,
+            self._format_plan_for(selected_format)
+        )
+        self.worker.moveToThread(self.thread)
+        self.worker.progress.connect(self.handleWorkerProgress)
+        self.worker.error.connect(self.handleError)
+        self.worker.metricsReady.connect(self.handleFileMetrics)
+        if self.is_batch:
+            self.worker.dataReady.connect(self.collectBatchResult)
+        else:
+            self.worker.dataReady.connect(self.saveFile)
+        self.thread.started.connect(self.worker.process)
+        self.thread.start()
+
+    @pyqtSlot(bool)
+    def setLowMemoryExport(self, enabled):
+        self.low_memory_export = bool(enabled)
+        self.settings.setValue("lowMemoryExport", self.low_memory_export)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(str)
+    def setFormulaMode(self, mode):
+        self.formula_mode = normalize_formula_mode(mode)
+        self.settings.setValue("formulaMode", self.formula_mode)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(int)
+    def setBatchWorkerCount(self, count):
+        self.batch_worker_count = max(1, min(int(count), os.cpu_count() or 1))
+        self.settings.setValue("batchWorkers", self.batch_worker_count)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(bool)
+    def setFusedBatchSave(self, enabled):
+        self.fused_batch_save = bool(enabled)
+        self.settings.setValue("fusedBatchSave", self.fused_batch_save)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(int)
+    def setChunkRows(self, rows):
+        self.chunk_rows = max(0, int(rows))
+        self.settings.setValue("chunkRows", self.chunk_rows)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(bool)
+    def setSpillBatchResults(self, enabled):
+        self.spill_batch_results = bool(enabled)
+        self.settings.setValue("spillBatchResults", self.spill_batch_results)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(bool)
+    def setResultCacheEnabled(self, enabled):
+        self.result_cache_enabled = bool(enabled)
+        self.settings.setValue("resultCacheEnabled", self.result_cache_enabled)
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot(int)
+    def setResultCacheMegabytes(self, megabytes):
+        self.result_cache_megabytes = max(0, int(megabytes))
+        self.settings.setValue("resultCacheMegabytes", self.result_cache_megabytes)
+        if self.result_cache is not None:
+            self.result_cache.max_bytes = self.result_cache_megabytes * 1024 * 1024
+            self.result_cache.evict()
+        self.exportSettingsChanged.emit()
+
+    @pyqtSlot()
+    def clearResultCache(self):
+        cache = self._result_cache(force=True)
+        if cache is not None:
+            cache.clear()
+
+    def _result_cache(self, force=False):
+        if not (self.result_cache_enabled and self.result_cache_megabytes) and not force:
+            return None
+        if self.result_cache is None:
+            cache_dir = os.path.join(user_data_dir(), "cache", "results")
+            self.result_cache = ResultCache(cache_dir, self.result_cache_megabytes * 1024 * 1024)
+        return self.result_cache
+
+    def _discard_batch_staging(self):
+        if self._batch_stage_dir:
+            shutil.rmtree(self._batch_stage_dir, ignore_errors=True)
+        self._batch_stage_dir = None
+
+    def _export_memory_options(self):
+        temp_dir = self.export_temp_dir if self.export_temp_dir and os.path.isdir(self.export_temp_dir) else None
+        return self.low_memory_export, temp_dir
+
+    @pyqtSlot(str)
+    def setSelectionType(self,type_str):
+        self.xml_type = type_str
+        self.settings.setValue("lastXmlType", type_str)
+        if self.root:
+            self.root.setProperty("selectionType",type_str)
+
+    @pyqtSlot('QVariantList', str, bool)
+    def syncSelectionContext(self, files, selected_file, is_batch):
+        normalized_files = [normalize_path(p) for p in files if normalize_path(p)]
+        normalized_selected_file = normalize_path(selected_file) if selected_file else ""
+                                                                                   
+        if len(normalized_files) > 1:
+            self.selected_files = normalized_files
+            self.selected_file = None
+            self.is_batch = True
+            return
+        if len(normalized_files) == 1:
+            self.selected_files = []
+            self.selected_file = normalized_files[0]
+            self.is_batch = False
+            return
+        if normalized_selected_file:
+            self.selected_files = []
+            self.selected_file = normalized_selected_file
+            self.is_batch = False
+            return
+        if not self.selected_files and not self.selected_file:
+            self.is_batch = bool(is_batch)
+
+    def _qml_list(self, value):
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        if hasattr(value, "toVariant"):
+            try:
+                variant = value.toVariant()
+                if isinstance(variant, (list, tuple)):
+                    return list(variant)
+            except Exception:
+                pass
+        return []
+
+    @pyqtSlot()
+    def confirmAndConvert(self):
+        self.cancel_requested = False
+        self._clear_conversion_metrics()
+                                                                                        
+        if self.root:
+            raw_files = self.root.property("selectedFiles")
+            ui_files = [normalize_path(p) for p in self._qml_list(raw_files) if normalize_path(p)]
+            raw_selected = self.root.property("selectedFile")
+            ui_selected = normalize_path(raw_selected) if isinstance(raw_selected, str) and raw_selected else ""
+
+            if len(ui_files) > 1:
+                self.selected_files = ui_files
+                self.selected_file = None
+                self.is_batch = True
+            elif len(ui_files) == 1:
+                self.selected_files = []
+                self.selected_file = ui_files[0]
+                self.is_batch = False
+            elif ui_selected:
+                self.selected_files = []
+                self.selected_file = ui_selected
+                self.is_batch = False
+                                                                                                                  
+
+            ui_type = self.root.property("selectionType")
+            if ui_type:
+                self.xml_type = ui_type
+
+                                                                                          
+        if len(self.selected_files) > 1:
+            self.is_batch = True
+            self.selected_file = None
+        elif self.selected_file:
+            self.is_batch = False
+
+        if not self.xml_type:
+            QMessageBox.information(None, "Info", "Please select XML type before converting.")
+            return
+        if self._custom_formats_pending():
+            return
+
+        if len(self.selected_files) > 1:
+            self.confirmAndConvertBatch()
+            return
+
+        if len(self.selected_files) == 1 and not self.selected_file:
+            self.selected_file = self.selected_files[0]
+            self.selected_files = []
+            self.is_batch = False
+
+        if not self.selected_file:
+            return
+
+        if self.chunk_rows:
+            self.convertSingleFileChunked()
+            return
+
+        if self.root:
+            self.root.setProperty("processState","converting")
+        self.progress=0
+        self.progressUpdated.emit(self.progress)
+        self._stop_thread("thread", "worker")
+        self.thread=QThread()
+        selected_format = next((fmt for fmt in self.format_model if fmt.get("name", "") == self.xml_type), None)
+        self.worker = Worker([self.selected_file], self.xml_type, selected_format, self._format_plan_for(selected_format))
+        self.worker.moveToThread(self.thread)
+        self.worker.progress.connect(self.handleWorkerProgress)
+        self.worker.error.connect(self.handleError)
+        self.worker.metricsReady.connect(self.handleFileMetrics)
+        self.worker.dataReady.connect(self.saveFile)
+        self.thread.started.connect(self.worker.process)
+        self.thread.start()
+
+    def convertSingleFileChunked(self):
+        save_path = self._prompt_single_save_path(self.selected_file)
+        if not save_path:
+            return
+        if self.root:
+            self.root.setProperty("processState","converting")
+        self.progress=0
+        self._last_save_payload = {
+            "df": None,
+            "xml_type": self.xml_type,
+            "xml_file": self.selected_file,
+            "save_path": save_path,
+        }
+        self._start_single_save_thread(None, self.xml_type, save_path, self.selected_file)
+
+    @pyqtSlot()
+    def selectDifferentFile(self):
+        self.resetProperties()
+
+    @pyqtSlot(str,result=str)
+    def getFileSize(self,file_path):
+        try:
+            size_bytes=os.path.getsize(file_path)
+            return f"{size_bytes/1024:.2f} KB" if size_bytes<1024*1024 else f"{size_bytes/(1024*1024):.2f} MB"
+        except OSError:
+            return "Unknown"
+
+    @pyqtSlot(int)
+    def removeSelectedFile(self, index):
+        if not self.is_batch:
+            return
+        if index < 0 or index >= len(self.selected_files):
+            return
+
+        self.selected_files.pop(index)
+        if index < len(self.batch_file_statuses):
+            self.batch_file_statuses.pop(index)
+
+        if not self.selected_files:
+            self.resetProperties()
+            return
+
+        if len(self.selected_files) == 1:
+            self.selected_file = self.selected_files[0]
+            self.selected_files = []
+            self.is_batch = False
+            self.current_batch_index = 0
+            if self.root:
+                self.root.setProperty("isBatch", False)
+                self.root.setProperty("selectedFiles", [])
+                self.root.setProperty("selectedFile", self.selected_file)
+                self.root.setProperty("totalBatchFiles", 0)
+                self.root.setProperty("currentBatchIndex", 0)
+                self.root.setProperty("currentFileName", "")
+                self.root.setProperty("fileSize", self.getFileSize(self.selected_file))
+                self.root.setProperty("batchFileStatuses", [])
+            return
+
+        if self.current_batch_index >= len(self.selected_files):
+            self.current_batch_index = len(self.selected_files) - 1
+        if self.root:
+            self.root.setProperty("isBatch", True)
+            self.root.setProperty("selectedFile", "")
+            self.root.setProperty("selectedFiles", self.selected_files)
+            self.root.setProperty("totalBatchFiles", len(self.selected_files))
+            self.root.setProperty("currentBatchIndex", self.current_batch_index)
+            self.root.setProperty("currentFileName", os.path.basename(self.selected_files[self.current_batch_index]))
+            self.refreshBatchFileStatusesProperty()
+
+    @pyqtSlot()
+    def convertAnotherFile(self):
+        self.cancel_requested = True
+        self._request_all_worker_cancels()
+        self._stop_all_background_threads()
+        self.resetProperties()
+
+    @pyqtSlot(str)
+    def setSelectedFile(self,file_path):
+        self.selected_file = file_path
+        self.selected_files = []
+        self.batch_file_statuses = []
+        self._discard_batch_staging()
+        self.batch_results = []
+        self.batch_outputs = []
+        self.is_batch = False
+        self.current_batch_index = 0
+        self.preview_selected_file = ""
+        self._clear_xml_preview()
+        if self.root:
+            self.root.setProperty("isBatch", False)
+            self.root.setProperty("selectedFiles", [])
+            self.root.setProperty("totalBatchFiles", 0)
+            self.root.setProperty("currentBatchIndex", 0)
+            self.root.setProperty("currentFileName", "")
+            self.root.setProperty("batchOutputs", [])
+            self.root.setProperty("batchFileStatuses", [])
+
+    def updateProgressInQML(self,value):
+        if self.root:
+            self.root.setProperty("progress",value)
+
+    @pyqtSlot(int)
+    def handleWorkerProgress(self, value):
+        safe_value = clamp_percent(value)
+        if self.is_batch and self.selected_files and self.root and self.root.property("processState") == "converting":
+            total_files = len(self.selected_files)
+            file_index = max(0, min(self.current_batch_index, total_files - 1))
+            overall = int(((file_index + (safe_value / 100.0)) / total_files) * 100)
+            self.progressUpdated.emit(clamp_percent(overall))
+            return
+        self.progressUpdated.emit(safe_value)
+
+    def handleError(self,msg):
+        if msg == "Operation cancelled by user.":
+            self._stop_thread("thread", "worker")
+            if self.root:
+                if self.is_batch:
+                    self.root.setProperty("processState", "batchReview")
+                else:
+                    self.root.setProperty("processState", "idle")
+            return
+        if self.is_batch and self.root and self.root.property("processState") == "converting":
+            QMessageBox.warning(None, "Batch Item Failed", msg)
+            if self.current_batch_index < len(self.batch_file_statuses):
+                self.batch_file_statuses[self.current_batch_index] = "Failed"
+                self.refreshBatchFileStatusesProperty()
+            self._stop_thread("thread", "worker")
+            self.current_batch_index += 1
+            if self.selected_files:
+                completed = min(self.current_batch_index, len(self.selected_files))
+                overall = int((completed / len(self.selected_files)) * 100)
+                self.progressUpdated.emit(clamp_percent(overall))
+            if self.root:
+                self.root.setProperty("currentBatchIndex", self.current_batch_index)
+            if self.current_batch_index < len(self.selected_files):
+                self.processNextBatchFile()
+            else:
+                if self.root:
+                    self.root.setProperty("processState", "batchReview")
+            return
+
+        QMessageBox.critical(None,"Error",msg)
+        if self.root:
+            self.root.setProperty("processState","idle")
+        self._stop_thread("thread", "worker")
+
+    @pyqtSlot(object, str, str)
+    def collectBatchResult(self, df, xml_type, xml_file):
+        if self.cancel_requested:
+            self._stop_thread("thread", "worker")
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+            return
+        default_output_path = build_default_batch_output_path(xml_file)
+        default_dir = self.last_batch_dir if self.last_batch_dir and os.path.isdir(self.last_batch_dir) else os.path.dirname(default_output_path)
+        self.batch_results.append({
+            "df": df,
+            "xml_type": xml_type,
+            "xml_file": xml_file
+        })
+        self.batch_outputs.append({
+            "sourceFile": os.path.basename(xml_file),
+            "fileName": os.path.basename(default_output_path),
+            "saveDir": default_dir,
+            "savePath": os.path.join(default_dir, os.path.basename(default_output_path))
+        })
+        self.refreshBatchOutputsProperty()
+        if self.current_batch_index < len(self.batch_file_statuses):
+            self.batch_file_statuses[self.current_batch_index] = "Done"
+            self.refreshBatchFileStatusesProperty()
+        self._stop_thread("thread", "worker")
+
+        self.current_batch_index += 1
+        if self.selected_files:
+            completed = min(self.current_batch_index, len(self.selected_files))
+            overall = int((completed / len(self.selected_files)) * 100)
+            self.progressUpdated.emit(clamp_percent(overall))
+        if self.root:
+            self.root.setProperty("currentBatchIndex", self.current_batch_index)
+        if self.current_batch_index < len(self.selected_files):
+            self.processNextBatchFile()
+        else:
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+
+    def refreshBatchOutputsProperty(self):
+        if self.root:
+            self.root.setProperty("batchOutputs", self.batch_outputs)
+
+    @pyqtSlot(str, result=str)
+    def validateOutputDirectory(self, directory):
+        return get_invalid_output_directory_message(directory)
+
+    @pyqtSlot('QVariantList', result='QVariantList')
+    def estimateBatchOutputConflicts(self, outputs):
+        entries = []
+        if isinstance(outputs, list):
+            entries = outputs
+        elif hasattr(outputs, "toVariant"):
+            try:
+                variant = outputs.toVariant()
+                entries = variant if isinstance(variant, list) else []
+            except Exception:
+                entries = []
+
+        by_path = {}
+        for i, item in enumerate(entries):
+            if not isinstance(item, dict):
+                continue
+            file_name = ensure_xlsx_extension(str(item.get("fileName", "")))
+            save_dir = str(item.get("saveDir", ""))
+            if not file_name or not save_dir:
+                continue
+            full_path = normalize_path(os.path.join(save_dir, file_name))
+            if not full_path:
+                continue
+            key = os.path.normcase(full_path)
+            by_path.setdefault(key, []).append((i, item, full_path))
+
+        conflicts = []
+        for _, group in by_path.items():
+            if len(group) <= 1:
+                continue
+            for idx, item, full_path in group:
+                conflicts.append({
+                    "index": idx,
+                    "sourceFile": str(item.get("sourceFile", f"Item {idx + 1}")),
+                    "path": full_path,
+                    "reason": "Duplicate output path in batch list."
+                })
+        return conflicts
+
+    @pyqtSlot(int, str)
+    def updateBatchOutputFileName(self, index, file_name):
+        if index < 0 or index >= len(self.batch_outputs):
+            return
+        safe_name = normalize_batch_output_name(file_name)
+        self.batch_outputs[index]["fileName"] = safe_name
+        self.batch_outputs[index]["savePath"] = os.path.join(self.batch_outputs[index]["saveDir"], safe_name)
+        self.refreshBatchOutputsProperty()
+
+    @pyqtSlot(int, str)
+    def updateBatchOutputDirectory(self, index, directory):
+        if index < 0 or index >= len(self.batch_outputs):
+            return
+        if not directory:
+            return
+        self.batch_outputs[index]["saveDir"] = directory
+        self.batch_outputs[index]["savePath"] = os.path.join(directory, self.batch_outputs[index]["fileName"])
+        self.rememberSaveDirectory(directory, batch=True)
+        self.refreshBatchOutputsProperty()
+
+    @pyqtSlot(str)
+    def applyBatchOutputDirectoryToAll(self, directory):
+        if not directory or not self.batch_outputs:
+            return
+        for i in range(len(self.batch_outputs)):
+            self.batch_outputs[i]["saveDir"] = directory
+            self.batch_outputs[i]["savePath"] = os.path.join(directory, self.batch_outputs[i]["fileName"])
+        self.rememberSaveDirectory(directory, batch=True)
+        self.refreshBatchOutputsProperty()
+
+    @pyqtSlot(int)
+    def browseBatchOutputDirectory(self, index):
+        if index < 0 or index >= len(self.batch_outputs):
+            return
+        start_dir = self.batch_outputs[index]["saveDir"] if self.batch_outputs[index]["saveDir"] else self.last_batch_dir
+        chosen_dir = QFileDialog.getExistingDirectory(None, "Select Save Folder", start_dir)
+        if not chosen_dir:
+            return
+        self.updateBatchOutputDirectory(index, chosen_dir)
+
+    @pyqtSlot()
+    def browseBatchOutputDirectoryForAll(self):
+        if not self.batch_outputs:
+            return
+        start_dir = self.batch_outputs[0]["saveDir"] if self.batch_outputs[0]["saveDir"] else self.last_batch_dir
+        chosen_dir = QFileDialog.getExistingDirectory(None, "Select Save Folder for All Files", start_dir)
+        if not chosen_dir:
+            return
+        self.applyBatchOutputDirectoryToAll(chosen_dir)
+
+    @pyqtSlot()
+    def saveAllBatchOutputs(self):
+        if not self.batch_results or not self.batch_outputs:
+            return
+        self.cancel_requested = False
+        dir_issues = []
+        for i, output in enumerate(self.batch_outputs):
+            reason = get_invalid_output_directory_message(output.get("saveDir", ""))
+            if reason:
+                src = output.get("sourceFile", f"Item {i + 1}")
+                dir_issues.append(f"{i + 1}. {src}: {reason}")
+        if dir_issues:
+            suffix = "" if len(dir_issues) <= 8 else f"\n...and {len(dir_issues) - 8} more issue(s)"
+            QMessageBox.warning(
+                None,
+                "Invalid Save Folder",
+                "Please fix these save folder issues before confirming:\n\n"
+                + "\n".join(dir_issues[:8])
+                + suffix
+            )
+            return
+        issues = []
+        for i, output in enumerate(self.batch_outputs):
+            reason = get_invalid_batch_name_message(output.get("fileName", ""))
+            if reason:
+                src = output.get("sourceFile", f"Item {i + 1}")
+                issues.append(f"{i + 1}. {src}: {reason}")
+        if issues:
+            suffix = "" if len(issues) <= 8 else f"\n...and {len(issues) - 8} more issue(s)"
+            QMessageBox.warning(
+                None,
+                "Invalid Output File Name",
+                "Please fix these file name issues before confirming:\n\n"
+                + "\n".join(issues[:8])
+                + suffix
+            )
+            return
+        conflicts = self.estimateBatchOutputConflicts(self.batch_outputs)
+        if conflicts:
+            lines = []
+            for i, conflict in enumerate(conflicts[:8]):
+                lines.append(
+                    f"{i + 1}. {conflict.get('sourceFile', 'Item')} -> {conflict.get('path', '')}"
+                )
+            suffix = "" if len(conflicts) <= 8 else f"\n...and {len(conflicts) - 8} more conflict(s)"
+            QMessageBox.warning(
+                None,
+                "Conflicting Output Paths",
+                "Please resolve duplicate output paths before confirming:\n\n"
+                + "\n".join(lines)
+                + suffix
+            )
+            return
+        target_paths = [
+            os.path.join(output["saveDir"], ensure_xlsx_extension(output["fileName"]))
+            for output in self.batch_outputs
+        ]
+        if not self._confirm_overwrite_paths(target_paths, "Confirm Batch Overwrite"):
+            return
+        self._start_batch_save_thread()
+
+    def _start_batch_save_thread(self):
+        if self.root:
+            self.root.setProperty("processState", "creating")
+            self.root.setProperty("currentBatchSaveCount", 0)
+        self.progressUpdated.emit(0)
+        self._stop_thread("batch_save_thread", "batch_save_worker")
+        self.batch_save_thread = QThread()
+        self.batch_save_worker = BatchSaveWorker(
+            self.batch_results,
+            self.batch_outputs,
+            *self._export_memory_options(),
+            max_workers=self.batch_worker_count,
+            result_cache=self._result_cache(),
+            formula_mode=self.formula_mode
+        )
+        self.batch_save_worker.moveToThread(self.batch_save_thread)
+        self.batch_save_worker.progress.connect(self.progressUpdated)
+        self.batch_save_worker.saveCountUpdated.connect(self.handleBatchSaveCountUpdated)
+        self.batch_save_worker.metricsReady.connect(self.handleFileMetrics)
+        self.batch_save_worker.error.connect(self.handleBatchSaveError)
+        self.batch_save_worker.finished.connect(self.handleBatchSaveFinished)
+        self.batch_save_thread.started.connect(self.batch_save_worker.save_all)
+        self.batch_save_thread.start()
+
+    @pyqtSlot(int)
+    def handleBatchSaveCountUpdated(self, count):
+        if self.root:
+            self.root.setProperty("currentBatchSaveCount", count)
+
+    def handleBatchSaveError(self, msg):
+        if msg == "Operation cancelled by user.":
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+            self._stop_thread("batch_save_thread", "batch_save_worker")
+            return
+        if str(msg).startswith("BATCH_PERMISSION_DENIED::"):
+            parts = str(msg).split("::", 3)
+            locked_path = parts[2] if len(parts) > 2 else ""
+            self._stop_thread("batch_save_thread", "batch_save_worker")
+            should_retry = self._confirm_in_app(
+                "File In Use",
+                "Cannot overwrite because the file is currently open or in use:\n\n"
+                f"{locked_path}\n\n"
+                "Close the file, then click Yes to retry."
+            )
+            if should_retry:
+                self._start_batch_save_thread()
+                return
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+            return
+        QMessageBox.critical(None, "Error", msg)
+        if self.root:
+            self.root.setProperty("processState", "batchReview")
+        self._stop_thread("batch_save_thread", "batch_save_worker")
+
+    @pyqtSlot(object)
+    def handleBatchSaveFinished(self, saved_outputs):
+        if self.cancel_requested:
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+            self._stop_thread("batch_save_thread", "batch_save_worker")
+            return
+        self.batch_outputs = saved_outputs
+        self.refreshBatchOutputsProperty()
+        self._discard_batch_staging()
+        self._publish_conversion_metrics()
+        self.progressUpdated.emit(100)
+        if self.root:
+            self.root.setProperty("currentBatchSaveCount", len(self.batch_outputs))
+            self.root.setProperty("completionDetailMessage", f"Processed Excel saved: {len(self.batch_outputs)} file(s).")
+            self.root.setProperty("processState", "complete")
+        self._stop_thread("batch_save_thread", "batch_save_worker")
+
+    @pyqtSlot(object,str,str)
+    def saveFile(self, df, xml_type, xml_file):
+        save_path = self._prompt_single_save_path(xml_file)
+        if not save_path:
+            self._stop_thread("thread", "worker")
+            self.resetProperties()
+            return
+
+        self._last_save_payload = {
+            "df": df,
+            "xml_type": xml_type,
+            "xml_file": xml_file,
+            "save_path": save_path,
+        }
+        self._start_single_save_thread(df, xml_type, save_path, xml_file)
+        self._stop_thread("thread", "worker")
+
+    def _prompt_single_save_path(self, xml_file):
+        start_dir = self.last_save_dir if self.last_save_dir and os.path.isdir(self.last_save_dir) else os.path.dirname(xml_file)
+        default_name = os.path.splitext(os.path.basename(xml_file))[0] + ".xlsx"
+        default_path = os.path.join(start_dir, default_name)
+        save_path, _ = QFileDialog.getSaveFileName(
+            None,
+            "Save Excel File",
+            default_path,
+            "Excel Files (*.xlsx)"
+        )
+        if save_path and not save_path.lower().endswith(".xlsx"): save_path += ".xlsx"
+        if not save_path:
+            return ""
+        self.rememberSaveDirectory(os.path.dirname(save_path), batch=False)
+        if not self._confirm_overwrite_paths([save_path], "Confirm Overwrite"):
+            return ""
+        return save_path
+
+    def _start_single_save_thread(self, df, xml_type, save_path, xml_file):
+        self.progressUpdated.emit(0 if df is None else 86)
+        self._stop_thread("save_thread", "save_worker")
+        self.save_thread = QThread()
+        if df is None:
+            selected_format = next((fmt for fmt in self.format_model if fmt.get("name", "") == xml_type), None)
+            self.save_worker = SaveWorker(None, xml_type, save_path, xml_file, *self._export_memory_options(), formula_mode=self.formula_mode, format_definition=selected_format, format_plan=self._format_plan_for(selected_format), chunk_rows=self.chunk_rows)
+        else:
+            self.save_worker = SaveWorker(df, xml_type, save_path, xml_file, *self._export_memory_options(), formula_mode=self.formula_mode)
+        self.save_worker.moveToThread(self.save_thread)
+        self.save_worker.progress.connect(self.progressUpdated)
+        self.save_worker.error.connect(self.handleSaveError)
+        self.save_worker.metricsReady.connect(self.handleFileMetrics)
+        self.save_worker.saved.connect(self.handleSaved)
+        self.save_thread.started.connect(self.save_worker.save)
+        self.save_thread.start()
+
+    def handleSaveError(self, msg):
+        if msg == "Operation cancelled by user.":
+            if self.root:
+                self.root.setProperty("processState", "idle")
+            self._stop_thread("save_thread", "save_worker")
+            return
+        if str(msg).startswith("PERMISSION_DENIED::"):
+            parts = str(msg).split("::", 2)
+            locked_path = parts[1] if len(parts) > 1 else ""
+            self._stop_thread("save_thread", "save_worker")
+            should_retry = self._confirm_in_app(
+                "File In Use",
+                "Cannot overwrite because the file is currently open or in use:\n\n"
+                f"{locked_path}\n\n"
+                "Close the file, then click Yes to retry."
+            )
+            if should_retry and self._last_save_payload:
+                payload = self._last_save_payload
+                self._start_single_save_thread(
+                    payload.get("df"),
+                    payload.get("xml_type", ""),
+                    payload.get("save_path", ""),
+                    payload.get("xml_file", "")
+                )
+                return
+            if self.root:
+                self.root.setProperty("processState", "idle")
+            return
+        QMessageBox.critical(None, "Error", msg)
+        if self.root:
+            self.root.setProperty("processState", "idle")
+        self._stop_thread("save_thread", "save_worker")
+
+    @pyqtSlot(str, str)
+    def handleSaved(self, save_path, xml_file):
+        if self.cancel_requested:
+            if self.root:
+                self.root.setProperty("processState", "idle")
+            self._stop_thread("save_thread", "save_worker")
+            return
+        self.progressUpdated.emit(100)
+        if self.root:
+            self.root.setProperty("completionDetailMessage", f"Processed Excel saved: {save_path}")
+        self.current_batch_index += 1
+        if self.root:
+            self.root.setProperty("currentBatchIndex", self.current_batch_index)
+        if self.current_batch_index < len(self.selected_files):
+            self.processNextBatchFile()
+        else:
+            self._publish_conversion_metrics()
+            if self.root:
+                self.root.setProperty("processState", "complete")
+            self._last_save_payload = None
+        self._stop_thread("save_thread", "save_worker")
+
+    @pyqtSlot()
+    def cancelCurrentOperation(self):
+        self.cancel_requested = True
+        self._request_all_worker_cancels()
+        self._stop_all_background_threads()
+
+        if self.is_batch:
+            for i, status in enumerate(self.batch_file_statuses):
+                if status in ("Queued", "Processing"):
+                    self.batch_file_statuses[i] = "Cancelled"
+            self.refreshBatchFileStatusesProperty()
+            if self.root:
+                self.root.setProperty("processState", "batchReview")
+            return
+
+        if self.root:
+            self.root.setProperty("processState", "idle")
+
+    def resetProperties(self):
+        self._stop_all_background_threads()
+        self.preview_selected_file = ""
+        self._clear_xml_preview()
+        if self.root:
+            self.root.setProperty("processState","idle")
+            self.root.setProperty("selectedFile","")
+            self.root.setProperty("selectedFiles", [])
+            self.root.setProperty("selectionType","")
+            self.root.setProperty("completionDetailMessage", "")
+            self.root.setProperty("fileSize","")
+            self.root.setProperty("progress",0)
+            self.root.setProperty("isBatch", False)
+            self.root.setProperty("totalBatchFiles", 0)
+            self.root.setProperty("currentBatchIndex", 0)
+            self.root.setProperty("currentFileName", "")
+            self.root.setProperty("batchOutputs", [])
+            self.root.setProperty("batchFileStatuses", [])
+            self.root.setProperty("currentBatchSaveCount", 0)
+        self.selected_file = None
+        self.selected_files = []
+        self.batch_file_statuses = []
+        self._discard_batch_staging()
+        self._clear_conversion_metrics()
+        self.batch_results = []
+        self.batch_outputs = []
+        self.is_batch = False
+        self.current_batch_index = 0
+        self.xml_type=""
+        self.progress=0
+        self.save_thread = None
+        self.save_worker = None
+        self.batch_save_thread = None
+        self.batch_save_worker = None
+
+
+def run(argv=None):
+    app=QApplication(sys.argv if argv is None else argv)
+    app.setFont(QFont("Segoe UI", 10))
+    app.setStyle("Fusion")
+    app_font_family = app.font().family()
+    font_path = os.path.join(RESOURCE_BASE_DIR, "fonts", "Minecraft.ttf")
+    if os.path.exists(font_path):
+        font_id = QFontDatabase.addApplicationFont(font_path)
+        if font_id != -1:
+            loaded_families = QFontDatabase.applicationFontFamilies(font_id)
+            if loaded_families:
+                app_font_family = loaded_families[0]
+                app.setFont(QFont(app_font_family))
+    icon_path=os.path.join(RESOURCE_BASE_DIR,"images","icon.png")
+    if os.path.exists(icon_path):
+        app.setWindowIcon(QIcon(icon_path))
+    engine=QQmlApplicationEngine()
+
+    backend=Backend(engine)
+    backend.recordStartupTiming("backend_init")
+    app.aboutToQuit.connect(backend._discard_batch_staging)
+    engine.rootContext().setContextProperty("backend",backend)
+    engine.rootContext().setContextProperty("appFontFamily", app_font_family)
+
+    qml_file=os.path.join(RESOURCE_BASE_DIR,"main.qml")
+    engine.load(QUrl.fromLocalFile(qml_file))
+    if not engine.rootObjects(): return -1
+
+    backend.root=engine.rootObjects()[0]
+    backend.recordStartupTiming("qml_loaded")
+    backend.root.frameSwapped.connect(backend.handleFirstFrame)
+    if os.path.exists(icon_path):
+        backend.root.setIcon(QIcon(icon_path))
+    backend.applyRememberedSettingsToUI()
+    QTimer.singleShot(0, backend.startFormatLoading)
+    QTimer.singleShot(0, backend.startEngineWarmUp)
+    return app.exec()
@@ -94,6 +94,7 @@ Window {
     property bool previewSelectMode: false
     property int previewSelectFormatIndex: -1
     property int previewSelectRowIndex: -1
+    property bool previewDialogPending: false
     property var backendSafe: (backend !== null && backend !== undefined) ? backend : backendNull
     property bool formatDragGhostVisible: false
     property real formatDragGhostY: 0
@@ -108,6 +109,24 @@ Window {
         property var xmlPreviewHeaders: []
         property var xmlPreviewRows: []
         property string xmlPreviewStatus: ""
+        property bool xmlPreviewLoading: false
+        property var conversionMetrics: []
+        property string conversionMetricsSummary: ""
+        property bool pathScanActive: false
+        property int pathScanFoundCount: 0
+        property var pathScanRecentPaths: []
+        property string scanIncludeGlobs: ""
+        property string scanExcludeGlobs: ""
+        property int scanMaxDepth: -1
+        property bool lowMemoryExport: false
+        property string formulaMode: "cells"
+        property var formulaModeOptions: []
+        property int batchWorkerCount: 1
+        property bool fusedBatchSave: false
+        property bool spillBatchResults: false
+        property int chunkRows: 0
+        property bool resultCacheEnabled: false
+        property int resultCacheMegabytes: 0
 
         function validateOutputDirectory(_path) { return "" }
         function estimateBatchOutputConflicts(_outputs) { return [] }
@@ -359,9 +378,16 @@ Window {
         previewSelectMode = false
         previewSelectFormatIndex = -1
         previewSelectRowIndex = -1
+        openPreviewDialogWhenReady()
+    }
+
+    function openPreviewDialogWhenReady() {
         if (backendSafe.xmlPreviewHeaders && backendSafe.xmlPreviewHeaders.length > 0) {
+            previewDialogPending = false
             xmlPreviewDialog.open()
+            return
         }
+        previewDialogPending = backendSafe.xmlPreviewLoading
     }
 
     function openPreviewDialogForIndex(formatIndex, rowIndex) {
@@ -371,9 +397,7 @@ Window {
         if (!backendSafe.xmlPreviewHeaders || backendSafe.xmlPreviewHeaders.length === 0) {
             backendSafe.selectPreviewXmlFile()
         }
-        if (backendSafe.xmlPreviewHeaders && backendSafe.xmlPreviewHeaders.length > 0) {
-            xmlPreviewDialog.open()
-        }
+        openPreviewDialogWhenReady()
     }
 
     function pickSourceIndexFromPreview(columnIndex) {
@@ -981,6 +1005,42 @@ Window {
         }
     }
 
+    Popup {
+        id: settingsDialog
+        modal: true
+        focus: true
+        closePolicy: Popup.CloseOnEscape | Popup.CloseOnPressOutside
+        anchors.centerIn: parent
+        width: Math.min(rootWindow.width - (32 * scaleFactor), 340 * scaleFactor)
+        height: rootWindow.height - (48 * scaleFactor)
+        padding: 0
+        z: 340
+        background: Item {}
+
+        Rectangle {
+            anchors.fill: parent
+            color: themePanel
+            border.color: themeLayer2
+            border.width: 1
+            radius: 6
+
+            SettingsView {
+                anchors.fill: parent
+                anchors.margins: 12 * scaleFactor
+                scaleFactor: rootWindow.scaleFactor
+                themeText: rootWindow.themeText
+                themeTextSecondary: rootWindow.themeTextSecondary
+                themeInset: rootWindow.themeInset
+                themePanel: rootWindow.themePanel
+                themeLayer3: rootWindow.themeLayer3
+                themeLayer2: rootWindow.themeLayer2
+                themeLayer1: rootWindow.themeLayer1
+                backendSafe: rootWindow.backendSafe
+                onCloseRequested: settingsDialog.close()
+            }
+        }
+    }
+
     Popup {
         id: xmlPreviewDialog
         modal: true
@@ -1345,11 +1405,27 @@ Window {
                 }
 
                 Text {
-                    text: "XML files only"
+                    text: backendSafe.pathScanActive
+                        ? "Scanning... " + backendSafe.pathScanFoundCount + " XML file(s) found"
+                        : "XML files only"
                     color: "white"
                     font.pixelSize: 12 * scaleFactor
                     Layout.alignment: Qt.AlignHCenter
                 }
+
+                Repeater {
+                    model: backendSafe.pathScanActive ? backendSafe.pathScanRecentPaths : []
+
+                    Text {
+                        text: modelData
+                        color: themeTextSecondary
+                        font.pixelSize: 10 * scaleFactor
+                        elide: Text.ElideMiddle
+                        horizontalAlignment: Text.AlignHCenter
+                        Layout.maximumWidth: 260 * scaleFactor
+                        Layout.alignment: Qt.AlignHCenter
+                    }
+                }
             }
         }
 
@@ -1375,6 +1451,28 @@ Window {
             onClicked: backendSafe.openFormatDesigner()
         }
 
+        PixelButton {
+            sliceLeft: 5
+            sliceRight: 5
+            sliceTop: 4
+            sliceBottom: 4
+            Layout.fillWidth: true
+            Layout.preferredHeight: 36 * scaleFactor
+            visible: processState === "idle"
+            text: "Settings"
+            textPixelSize: 12 * scaleFactor
+            normalSource: Qt.resolvedUrl("images/ui/button_normal.png")
+            hoverSource: Qt.resolvedUrl("images/ui/button_hover.png")
+            pressedSource: Qt.resolvedUrl("images/ui/button_pressed.png")
+            disabledSource: Qt.resolvedUrl("images/ui/button_disabled.png")
+            fallbackNormal: themeLayer3
+            fallbackHover: themeLayer2
+            fallbackPressed: themeLayer1
+            fallbackDisabled: "#9ca3af"
+            borderColor: themeLayer3
+            onClicked: settingsDialog.open()
+        }
+
 
         ColumnLayout {
             visible: processState === "selecting"
@@ -1860,7 +1958,7 @@ Window {
                     sliceBottom: 4
                     Layout.preferredWidth: 90 * scaleFactor
                     Layout.preferredHeight: 28 * scaleFactor
-                    text: "Load Preview"
+                    text: backendSafe.xmlPreviewLoading ? "Loading..." : "Load Preview"
                     textPixelSize: 10 * scaleFactor
                     fallbackNormal: themeLayer3
                     fallbackHover: themeLayer2
@@ -3497,6 +3595,7 @@ Window {
             totalBatchFiles: rootWindow.totalBatchFiles
             selectionType: rootWindow.selectionType
             completionDetailMessage: rootWindow.completionDetailMessage
+            metricsSummary: backendSafe.conversionMetricsSummary || ""
             themeText: rootWindow.themeText
             themeTextSecondary: rootWindow.themeTextSecondary
             themeLayer3: rootWindow.themeLayer3
@@ -3640,6 +3739,12 @@ Window {
         function onInAppConfirmRequested(token, title, message) {
             rootWindow.openBackendConfirmation(token, title, message)
         }
+        function onXmlPreviewChanged() {
+            if (!rootWindow.previewDialogPending || backendSafe.xmlPreviewLoading) {
+                return
+            }
+            rootWindow.openPreviewDialogWhenReady()
+        }
     }
 }
 
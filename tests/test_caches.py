@@ -0,0 +1,134 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from conversion import (
+    ParsedXmlCache,
+    ResultCache,
+    file_fingerprint,
+    load_cached_frame,
+    read_filtered_items,
+    spill_frame_to_cache,
+)
+
+XML_HEAD = """<?xml version="1.0" standalone="yes"?>
+<ArrayFieldDataSet xmlns="http://tempuri.org/ArrayFieldDataSet.xsd">
+  <Items><Name>/ArrayFieldDataSet/Items</Name><Clock>Clock</Clock></Items>
+"""
+XML_ROW = "  <Items><Name>row</Name><Clock>2024-01-01 00:{minute:02d}:00</Clock><Status>00000000</Status><R0>{value}</R0></Items>\n"
+
+
+def write_xml(path, values):
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(XML_HEAD)
+        for minute, value in enumerate(values):
+            fp.write(XML_ROW.format(minute=minute, value=value))
+        fp.write("</ArrayFieldDataSet>\n")
+
+
+class SpillRoundTripTest(unittest.TestCase):
+    def test_typed_and_mixed_columns_round_trip(self):
+        df = pd.DataFrame({
+            0: pd.to_datetime(["2024-01-01 00:15:00", None, "2024-01-01 00:45:00"]),
+            1: pd.Series(["00000000", "00000008", None], dtype="str"),
+            2: [1.5, np.nan, 3.0],
+            3: pd.Series([1, "a", True], dtype=object),
+            4: pd.Series([None, "x\ny", 2.5], dtype=object),
+        })
+        df.attrs.update({"column_count": 6, "formula_columns": [[5, "=C{r}*2"]], "data_start_row": 3})
+        with tempfile.TemporaryDirectory() as cache_dir:
+            spill_frame_to_cache(df, cache_dir)
+            loaded = load_cached_frame(cache_dir)
+        pd.testing.assert_frame_equal(loaded, df)
+        self.assertEqual(loaded.attrs, df.attrs)
+        self.assertEqual([type(value) for value in loaded[3]], [int, str, bool])
+
+
+class ParsedXmlCacheTest(unittest.TestCase):
+    def test_evicts_least_recently_used_by_bytes(self):
+        frames = {name: pd.DataFrame({"a": np.zeros(100)}) for name in "abc"}
+        size = int(frames["a"].memory_usage(index=True, deep=True).sum())
+        cache = ParsedXmlCache(max_bytes=size * 2)
+        cache.put("a", frames["a"])
+        cache.put("b", frames["b"])
+        self.assertIs(cache.get("a"), frames["a"])
+        cache.put("c", frames["c"])
+        self.assertIsNone(cache.get("b"))
+        self.assertIs(cache.get("a"), frames["a"])
+        self.assertIs(cache.get("c"), frames["c"])
+        self.assertEqual(cache.total_bytes, size * 2)
+        cache.put("big", pd.DataFrame({"a": np.zeros(1000)}))
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(len(cache), 2)
+
+    def test_file_change_invalidates_entry(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "meter.xml")
+            write_xml(path, [100, 200])
+            cache = ParsedXmlCache()
+            metrics = {}
+            first = read_filtered_items(path, cache=cache, metrics=metrics)
+            self.assertFalse(metrics["parse_cache_hit"])
+            self.assertIs(read_filtered_items(path, cache=cache, metrics=metrics), first)
+            self.assertTrue(metrics["parse_cache_hit"])
+            key = file_fingerprint(path)
+            write_xml(path, [300, 200])
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, key[2]))
+            self.assertNotEqual(file_fingerprint(path), key)
+            changed = read_filtered_items(path, cache=cache, metrics=metrics)
+            self.assertFalse(metrics["parse_cache_hit"])
+            self.assertEqual(changed["R0"].tolist(), [300.0, 200.0])
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, "results"), max_bytes=250)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _output(self, name):
+        path = os.path.join(self.tmp.name, name + ".xlsx")
+        with open(path, "wb") as fp:
+            fp.write(name.encode("ascii") * (100 // len(name)))
+        return path
+
+    def _age(self, key, seconds):
+        os.utime(os.path.join(self.cache.cache_dir, key + ".xlsx"), (seconds, seconds))
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        self.assertTrue(self.cache.store("a", self._output("a")))
+        self._age("a", 1000)
+        self.assertTrue(self.cache.store("b", self._output("b")))
+        self._age("b", 2000)
+        target = os.path.join(self.tmp.name, "fetched.xlsx")
+        self.assertEqual(self.cache.fetch("a", target), {})
+        self.assertTrue(self.cache.store("c", self._output("c")))
+        self.assertIsNone(self.cache.fetch("b", target))
+        self.assertIsNotNone(self.cache.fetch("a", target))
+        self.assertIsNotNone(self.cache.fetch("c", target))
+        self.assertEqual(self.cache.total_bytes(), 200)
+        self.assertFalse(os.path.exists(os.path.join(self.cache.cache_dir, "b.json")))
+
+    def test_key_changes_with_file_and_format(self):
+        path = os.path.join(self.tmp.name, "meter.xml")
+        write_xml(path, [100, 200])
+        key = self.cache.key_for(path, "format")
+        self.assertEqual(self.cache.key_for(path, "format"), key)
+        self.assertNotEqual(self.cache.key_for(path, "other"), key)
+        mtime_ns = os.stat(path).st_mtime_ns
+        write_xml(path, [101, 200])
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        self.assertNotEqual(self.cache.key_for(path, "format"), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+XML_TEXT = """<?xml version="1.0" standalone="yes"?>
+<ArrayFieldDataSet xmlns="http://tempuri.org/ArrayFieldDataSet.xsd">
+  <Items><Name>/ArrayFieldDataSet/Items</Name><Clock>Clock</Clock></Items>
+  <Items><Name>row0</Name><Clock>2024-01-01 00:15:00</Clock><Status>00000000</Status><Demand>1.5</Demand><R0>100</R0><R1>200</R1><R2>300</R2><R3>400</R3><R4>500</R4><R5>600</R5><R6>700</R6><R7>800</R7><R8>900</R8></Items>
+  <Items><Name>row1</Name><Clock>2024-01-01 00:30:07</Clock><Status>00000008</Status><Demand>2.5</Demand><R0>110</R0><R1>210</R1><R2>310</R2><R3>410</R3><R4>510</R4><R5>610</R5><R6>710</R6><R7>810</R7><R8>910</R8></Items>
+</ArrayFieldDataSet>
+"""
+
+CLI_RUN = """
+import sys
+sys.path.insert(0, {app_dir!r})
+import cli
+code = cli.main({argv!r})
+print("qt" if "PyQt6" in sys.modules else "no-qt")
+sys.exit(code)
+"""
+
+
+class HeadlessCliTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.home = os.path.join(self.tmp.name, "home")
+        os.makedirs(self.home)
+        self.xml_path = os.path.join(self.tmp.name, "meter.xml")
+        with open(self.xml_path, "w", encoding="utf-8") as fp:
+            fp.write(XML_TEXT)
+        self.output = os.path.join(self.tmp.name, "out")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, *args):
+        env = dict(os.environ, HOME=self.home, USERPROFILE=self.home, XDG_CONFIG_HOME=os.path.join(self.home, ".config"))
+        code = CLI_RUN.format(app_dir=APP_DIR, argv=[self.xml_path, "-o", self.output, "-j", "1", *args])
+        return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=120)
+
+    def test_builtin_format_runs_without_qt_or_data_dir(self):
+        result = self._run("-f", "Den")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "no-qt")
+        self.assertTrue(os.path.exists(os.path.join(self.output, "meter.xlsx")))
+        self.assertFalse(os.path.exists(os.path.join(self.home, "Documents")))
+
+    def test_unknown_custom_format_reads_default_formats_dir(self):
+        result = self._run("-f", "NoSuchFormat")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("Unknown format", result.stderr)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "no-qt")
+        self.assertTrue(os.path.isdir(os.path.join(self.home, "Documents", "CubeFlow")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from conversion import _is_irregular_clock, clock_off_minute_mask
+
+
+class ClockOffMinuteMaskTest(unittest.TestCase):
+    def test_canonical_text(self):
+        clock = pd.Series(["2024-01-01 00:15:00", "2024-01-01 00:30:05", "2024-01-01 00:45:00"], dtype=object)
+        self.assertEqual(clock_off_minute_mask(clock).tolist(), [False, True, False])
+
+    def test_datetime(self):
+        clock = pd.Series(pd.to_datetime(["2024-01-01 00:15:00", "2024-01-01 00:30:05", None]))
+        self.assertEqual(clock_off_minute_mask(clock).tolist(), [False, True, False])
+
+    def test_fallback_rows_match_per_row_check(self):
+        values = [
+            " 2024-01-01 00:15:07 ",
+            "2024-01-01  00:15:05",
+            "2024-01-01 0:1:+5",
+            "2024-01-01 00:15:-0",
+            "2024-01-01 00:15:1_0",
+            "2024-01-01 00:15",
+            "2024-01-01 00:15:05 extra",
+            "2024-01-01 00:15:05\n",
+            "2024-01-01T00:15:05",
+            "2024-01-01 00:15:00.5",
+            "x y:z:1",
+            "",
+            None,
+            np.nan,
+            0,
+        ]
+        expected = [_is_irregular_clock(value) for value in values]
+        self.assertEqual(expected[:5], [True, False, True, False, True])
+        self.assertEqual(clock_off_minute_mask(pd.Series(values, dtype=object)).tolist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
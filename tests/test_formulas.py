@@ -0,0 +1,113 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from conversion import (
+    FORMULA_VALUE_DIV0,
+    FORMULA_VALUE_NUM,
+    FORMULA_VALUE_OK,
+    FORMULA_VALUE_UNKNOWN,
+    _SheetFormulaEvaluator,
+    _cached_formula_reader,
+    _evaluate_row_formula,
+    _sheet_column_readers,
+    parse_row_formula,
+)
+
+
+def evaluate_constant(template):
+    node = parse_row_formula(template)
+    values, codes = _evaluate_row_formula(node, None, 1)
+    return float(values[0]), int(codes[0])
+
+
+def formula_frame(columns, formulas, header_row_2=None):
+    df = pd.DataFrame(columns)
+    df.attrs.update({
+        "data_start_row": 3,
+        "formula_columns": [[target, template] for target, template in formulas],
+        "formula_first_row": 0,
+        "header_row_1": [""] * 8,
+        "header_row_2": header_row_2 or [""] * 8,
+    })
+    return df
+
+
+class RowFormulaParserTest(unittest.TestCase):
+    def test_operator_precedence(self):
+        self.assertEqual(evaluate_constant("=1+2*3^2"), (19.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=(1+2)*3"), (9.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=10-4-3"), (3.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=8/4/2"), (1.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=2^3^2"), (64.0, FORMULA_VALUE_OK))
+
+    def test_unary_minus(self):
+        self.assertEqual(evaluate_constant("=-2^2"), (4.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=2^-1"), (0.5, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=3--2"), (5.0, FORMULA_VALUE_OK))
+        self.assertEqual(evaluate_constant("=-(1+2)*+4"), (-12.0, FORMULA_VALUE_OK))
+
+    def test_divide_by_zero(self):
+        self.assertEqual(evaluate_constant("=1/0")[1], FORMULA_VALUE_DIV0)
+        self.assertEqual(evaluate_constant("=0^-1")[1], FORMULA_VALUE_DIV0)
+        self.assertEqual(evaluate_constant("=0^0")[1], FORMULA_VALUE_NUM)
+
+    def test_unsupported_syntax_is_not_parsed(self):
+        for template in ("=SUM(C{r})", "=C{r}&D{r}", "=(C{r}", "=C{r}*", "C{r}*2"):
+            self.assertIsNone(parse_row_formula(template), template)
+
+
+class SheetFormulaEvaluatorTest(unittest.TestCase):
+    def test_divide_by_zero_column(self):
+        df = formula_frame({2: [4.0, 0.0, 2.0]}, [(3, "=8/C{r}")])
+        values, codes = _SheetFormulaEvaluator(df, 8).column(3)
+        self.assertEqual(codes.tolist(), [FORMULA_VALUE_OK, FORMULA_VALUE_DIV0, FORMULA_VALUE_OK])
+        self.assertEqual([values[0], values[2]], [2.0, 4.0])
+        self.assertEqual(_cached_formula_reader(values, codes)(0, 3), [2.0, "#DIV/0!", 4.0])
+
+    def test_blank_and_string_references(self):
+        df = formula_frame({2: pd.Series([1.5, np.nan, "abc", None], dtype=object)}, [(3, "=C{r}*2")])
+        values, codes = _SheetFormulaEvaluator(df, 8).column(3)
+        self.assertEqual(codes.tolist(), [FORMULA_VALUE_OK, FORMULA_VALUE_OK, FORMULA_VALUE_UNKNOWN, FORMULA_VALUE_OK])
+        self.assertEqual([values[0], values[1], values[3]], [3.0, 0.0, 0.0])
+
+    def test_previous_row_reference_to_header_text(self):
+        df = formula_frame({4: [10.0, 15.0]}, [(5, "=E{r}-E{r-1}")], header_row_2=["", "", "", "", "kWh", "", "", ""])
+        values, codes = _SheetFormulaEvaluator(df, 8).column(5)
+        self.assertEqual(codes.tolist(), [FORMULA_VALUE_UNKNOWN, FORMULA_VALUE_OK])
+        self.assertEqual(values[1], 5.0)
+
+    def test_previous_row_reference_continues_across_sheets(self):
+        formulas = [(3, "=C{r}*2"), (5, "=(E{r}-E{r-1})*D{r-1}")]
+        df = formula_frame({2: [1.0, 2.0, 3.0, 4.0, 5.0], 4: [10.0, 12.0, 15.0, 19.0, 24.0]}, formulas)
+        whole = _SheetFormulaEvaluator(df, 8)
+        first = _SheetFormulaEvaluator(df.iloc[:2], 8)
+        second = df.iloc[2:].reset_index(drop=True)
+        second.attrs = dict(df.attrs)
+        for target, _ in formulas:
+            first.column(target)
+        second_part = _SheetFormulaEvaluator(second, 8, first.last_row_state(), row_offset=2)
+        for target, _ in formulas:
+            values, codes = whole.column(target)
+            np.testing.assert_array_equal(second_part.column(target)[0], values[2:])
+            np.testing.assert_array_equal(second_part.column(target)[1], codes[2:])
+        self.assertEqual(second_part.column(5)[0][0], (15.0 - 12.0) * 4.0)
+
+    def test_unsupported_formula_falls_back_to_uncached_formula(self):
+        df = formula_frame({2: [1.0, 2.0]}, [(3, "=SUM(C{r})"), (5, "=C{r}*2")])
+        evaluator = _SheetFormulaEvaluator(df, 8)
+        values, codes = evaluator.column(3)
+        self.assertEqual(codes.tolist(), [FORMULA_VALUE_UNKNOWN] * 2)
+        self.assertEqual(_cached_formula_reader(values, codes)(0, 2), ["", ""])
+        readers, _, _ = _sheet_column_readers(df, 8, "values", evaluator=evaluator)
+        self.assertEqual(readers[3](0, 2), ["=SUM(C3)", "=SUM(C4)"])
+        self.assertEqual(readers[5](0, 2), [2.0, 4.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
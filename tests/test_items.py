@@ -0,0 +1,109 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import openpyxl
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+from conversion import (
+    convert_xml_file,
+    convert_xml_file_chunked,
+    export_dataframe_to_excel,
+    read_typed_items,
+    read_xml_items_head,
+)
+
+XML_HEAD = """<?xml version="1.0" standalone="yes"?>
+<ArrayFieldDataSet xmlns="http://tempuri.org/ArrayFieldDataSet.xsd">
+  <Items><Name>/ArrayFieldDataSet/Items</Name><Clock>Clock</Clock></Items>
+"""
+XML_ROW = (
+    "  <Items><Name>row{index}</Name><Clock>2024-01-01 {hour:02d}:{minute:02d}:{second:02d}</Clock>"
+    "<Status>{status}</Status><Demand>{demand}</Demand>"
+    + "".join(f"<R{register}>{{r{register}}}</R{register}>" for register in range(9))
+    + "</Items>\n"
+)
+
+
+def meter_xml(row_count, tail=""):
+    rows = []
+    for index in range(row_count):
+        minutes = 15 * (index + 1)
+        values = {f"r{register}": 1000 * register + 7 * index + register for register in range(9)}
+        rows.append(XML_ROW.format(
+            index=index,
+            hour=minutes // 60 % 24,
+            minute=minutes % 60,
+            second=7 if index % 5 == 3 else 0,
+            status="00000008" if index % 4 == 1 else "00000000",
+            demand=1.5 + index,
+            **values
+        ))
+    return XML_HEAD + "".join(rows) + tail + "</ArrayFieldDataSet>\n"
+
+
+class ItemTypingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, text):
+        path = os.path.join(self.tmp.name, "meter.xml")
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        return path
+
+    def test_status_keeps_leading_zeros(self):
+        items = read_typed_items(self._write(meter_xml(6)), chunk_rows=4)
+        self.assertEqual(items["Status"].tolist(), ["00000000", "00000008", "00000000", "00000000", "00000000", "00000008"])
+        self.assertEqual(items["Demand"].dtype.kind, "f")
+        self.assertEqual(items["R0"].dtype.kind, "f")
+        self.assertEqual(items["Clock"].dtype.kind, "M")
+
+    def test_head_preview_stops_before_broken_tail(self):
+        path = self._write(meter_xml(2000, tail="  <Items><Name>broken</Items>\n"))
+        with self.assertRaises(Exception):
+            read_typed_items(path)
+        head = read_xml_items_head(path, 3)
+        self.assertEqual(head["Name"].tolist(), ["row0", "row1", "row2"])
+        self.assertEqual(head["Status"].tolist(), ["00000000", "00000008", "00000000"])
+
+
+class ChunkedConversionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.xml_path = os.path.join(self.tmp.name, "meter.xml")
+        with open(self.xml_path, "w", encoding="utf-8") as fp:
+            fp.write(meter_xml(53))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cells(self, path):
+        workbook = openpyxl.load_workbook(path)
+        return [
+            (sheet.title, [
+                [(cell.value, cell.number_format, cell.fill.fgColor.rgb) for cell in row]
+                for row in sheet.iter_rows()
+            ])
+            for sheet in workbook.worksheets
+        ]
+
+    def test_chunked_output_matches_whole_frame(self):
+        for xml_type in ("Den", "Globe"):
+            for rows_per_sheet in (None, 20):
+                whole_path = os.path.join(self.tmp.name, f"{xml_type}_whole.xlsx")
+                chunked_path = os.path.join(self.tmp.name, f"{xml_type}_chunked.xlsx")
+                df = convert_xml_file(self.xml_path, xml_type)
+                export_dataframe_to_excel(df, xml_type, whole_path, self.xml_path, rows_per_sheet=rows_per_sheet)
+                convert_xml_file_chunked(self.xml_path, xml_type, chunked_path, chunk_rows=7, rows_per_sheet=rows_per_sheet)
+                with self.subTest(xml_type=xml_type, rows_per_sheet=rows_per_sheet):
+                    self.assertEqual(self._cells(chunked_path), self._cells(whole_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import unittest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+SPAWN_CHECK = """
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+sys.path.insert(0, {app_dir!r})
+sys.modules["__main__"].__file__ = {main_path!r}
+if __name__ == "__main__":
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        print(pool.submit(eval, "sorted(name for name in __import__('sys').modules if name.split('.')[0] in ('PyQt6', '__mp_main__', 'gui'))").result())
+"""
+
+
+class SpawnWorkerImportTest(unittest.TestCase):
+    def _run(self, code):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result.stdout.strip()
+
+    def test_conversion_does_not_import_qt(self):
+        code = f"import sys; sys.path.insert(0, {APP_DIR!r}); import conversion, cli; print('PyQt6' in sys.modules)"
+        self.assertEqual(self._run(code), "False")
+
+    def test_spawned_pool_worker_does_not_import_qt(self):
+        main_path = os.path.abspath(os.path.join(APP_DIR, "main.py"))
+        self.assertIn("spawn", multiprocessing.get_all_start_methods())
+        modules = self._run(SPAWN_CHECK.format(app_dir=APP_DIR, main_path=main_path))
+        self.assertEqual(modules, "['__mp_main__']")
+
+
+if __name__ == "__main__":
+    unittest.main()